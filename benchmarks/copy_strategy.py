@@ -0,0 +1,77 @@
+"""
+Copy a large synthetic template tree with every copy strategy.
+
+Reports the wall time, the strategy that was really used (reflink and hardlink fall back
+to copy where unsupported) and, on Unix, how much free space the copies consumed.
+Reflinks need a filesystem that supports them (Btrfs, XFS, ...), so point `--dir` there.
+
+Run with `python -m benchmarks.copy_strategy [--files N] [--size KiB] [--copies N] [--dir DIR]`.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+import shutil
+import argparse
+import tempfile
+from pathlib import Path
+from collections import Counter
+
+from pyproject_creator.copying import COPY_STRATEGIES, copy_file
+
+
+def _free_bytes(path: Path) -> int | None:
+    if not hasattr(os, "statvfs"):
+        return None
+    stat = os.statvfs(path)
+    return stat.f_bavail * stat.f_frsize
+
+
+def _make_tree(root: Path, files: int, size: int) -> list[Path]:
+    paths = []
+    for i in range(files):
+        path = root / f"pkg{i % 16}" / f"asset{i}.bin"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(os.urandom(size))
+        paths.append(path)
+    return paths
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--files", type=int, default=500)
+    parser.add_argument("--size", type=int, default=64, help="file size in KiB")
+    parser.add_argument("--copies", type=int, default=10, help="projects per strategy")
+    parser.add_argument("--dir", type=Path, default=None, help="where to create the trees")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        root = Path(tmp)
+        sources = _make_tree(root / "template", args.files, args.size * 1024)
+        print(f"{args.files} files x {args.size} KiB, {args.copies} copies per strategy\n")
+        print(f"{'strategy':<10}{'time (s)':>10}{'used':>22}{'disk (MiB)':>12}")
+        for strategy in COPY_STRATEGIES:
+            target_root = root / strategy
+            free = _free_bytes(root)
+            used: Counter[str] = Counter()
+            start = time.perf_counter()
+            for copy in range(args.copies):
+                for source in sources:
+                    target = target_root / str(copy) / source.relative_to(root / "template")
+                    target.parent.mkdir(parents=True, exist_ok=True)
+                    used[copy_file(source, target, strategy)] += 1
+            elapsed = time.perf_counter() - start
+            if hasattr(os, "sync"):
+                os.sync()
+            after = _free_bytes(root)
+            disk = "n/a"
+            if free is not None and after is not None:
+                disk = f"{(free - after) / 2**20:.1f}"
+            summary = ", ".join(f"{name} {count}" for name, count in used.items())
+            print(f"{strategy:<10}{elapsed:>10.3f}{summary:>22}{disk:>12}")
+            shutil.rmtree(target_root)
+
+
+if __name__ == "__main__":
+    main()
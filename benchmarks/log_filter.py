@@ -0,0 +1,81 @@
+"""
+Records per second through the generated `logs` package at suppressed and emitted levels.
+
+- filter: `default_filter` alone, on prepared records
+- logger: `logger.debug` / `logger.info` end to end, into a sink that discards the text
+- sampling: the same with a `RateLimiter` that suppresses nothing (its overhead) and one
+  keeping 1 record in 100 (a hot loop)
+
+Run with `python -m benchmarks.log_filter [--records N]`.
+"""
+
+from __future__ import annotations
+
+import time
+import argparse
+from typing import Any
+from collections.abc import Callable
+
+from pyproject_creator.template.logs._config import LogConfig
+from pyproject_creator.template.logs._default import (
+    logger,
+    setup_logging,
+    default_filter,
+    default_format,
+)
+
+
+MESSAGE = "GET /api/items?page=2 'Cookie': 'session=0123456789abcdef'; took 12ms"
+
+
+def _rate(func: Callable[[], object], records: int) -> float:
+    start = time.perf_counter()
+    for _ in range(records):
+        func()
+    return records / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--records", type=int, default=200_000)
+    records = parser.parse_args().records
+
+    site = {"name": __name__, "line": 1, "extra": {}}
+    debug: dict[str, Any] = {"message": MESSAGE, "level": logger.level("DEBUG"), **site}
+    info: dict[str, Any] = {"message": MESSAGE, "level": logger.level("INFO"), **site}
+
+    def fresh_info() -> dict[str, Any]:
+        # The limiter stores its decision in "extra", which must be new for every record
+        record = dict(info)
+        record["extra"] = {}
+        return record
+
+    config = LogConfig(stdout=False)
+    setup_logging(config)
+    handler_id = logger.add(
+        lambda _: None, level=0, filter=default_filter, format=default_format(config)
+    )
+    try:
+        results = {
+            "filter, suppressed DEBUG": _rate(lambda: default_filter(dict(debug)), records),
+            "filter, emitted INFO": _rate(lambda: default_filter(dict(info)), records),
+            "logger, suppressed DEBUG": _rate(lambda: logger.debug(MESSAGE), records),
+            "logger, emitted INFO": _rate(lambda: logger.info(MESSAGE), records // 10),
+        }
+        # Sampling with nothing to suppress, a rate no loop reaches: the bookkeeping alone
+        setup_logging(LogConfig(stdout=False, rate_limit=1e12))
+        results["filter, sampling 1/1"] = _rate(lambda: default_filter(fresh_info()), records)
+        results["logger, sampling 1/1"] = _rate(lambda: logger.info(MESSAGE), records // 10)
+        setup_logging(LogConfig(stdout=False, sample_every=100))
+        results["logger, sampling 1/100"] = _rate(lambda: logger.info(MESSAGE), records)
+    finally:
+        setup_logging(config)
+        logger.remove(handler_id)
+
+    print(f"{'case':<28}{'records/s':>14}")
+    for name, rate in results.items():
+        print(f"{name:<28}{rate:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
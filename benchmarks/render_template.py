@@ -0,0 +1,86 @@
+"""
+Render latency of `pyproject.toml.j2`:
+
+- cold: new environment, empty bytecode cache (parse + compile)
+- bytecode: new environment, populated bytecode cache (a fresh process on a warm cache)
+- memory: the same environment again (a loop or a long running service)
+
+Run with `python -m benchmarks.render_template [--rounds N]`.
+"""
+
+from __future__ import annotations
+
+import time
+import argparse
+import tempfile
+import statistics
+from collections.abc import Callable
+
+import jinja2
+
+from pyproject_creator.generator import TEMPLATE_PATH
+
+
+CONTEXT = {
+    "project_name": "benchmark",
+    "project_description": "",
+    "author": "Your Name <your.email@example.com>",
+    "is_pypi_package": "false",
+    "python_version": "3.11",
+    "project_license": "",
+    "need_tests": True,
+    "need_logs": True,
+    "project_src_name": "benchmark",
+}
+
+
+def _environment(cache_dir: str) -> jinja2.Environment:
+    return jinja2.Environment(
+        loader=jinja2.FileSystemLoader(TEMPLATE_PATH),
+        bytecode_cache=jinja2.FileSystemBytecodeCache(cache_dir),
+        auto_reload=False,
+        keep_trailing_newline=True,
+    )
+
+
+def _render(env: jinja2.Environment) -> str:
+    rendered: str = env.get_template("pyproject.toml.j2").render(**CONTEXT)
+    return rendered
+
+
+def _measure(func: Callable[[], object], rounds: int) -> list[float]:
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rounds", type=int, default=200)
+    rounds = parser.parse_args().rounds
+
+    with tempfile.TemporaryDirectory() as warm_dir:
+        _render(_environment(warm_dir))
+        shared = _environment(warm_dir)
+        _render(shared)
+
+        def cold() -> None:
+            with tempfile.TemporaryDirectory() as cold_dir:
+                _render(_environment(cold_dir))
+
+        results = {
+            "cold": _measure(cold, rounds),
+            "bytecode": _measure(lambda: _render(_environment(warm_dir)), rounds),
+            "memory": _measure(lambda: _render(shared), rounds),
+        }
+
+    print(f"{'case':<10}{'median (ms)':>14}{'min (ms)':>12}")
+    for name, timings in results.items():
+        print(f"{name:<10}{statistics.median(timings) * 1e3:>14.3f}{min(timings) * 1e3:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
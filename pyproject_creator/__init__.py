@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+
+if TYPE_CHECKING:
+    from .archive import write_archive
+    from .timings import Timings, StageCallback
+    from .bootstrap import BootstrapStep, bootstrap_project
+    from .generator import (
+        ProjectSpec,
+        ProjectEntry,
+        GenerationResult,
+        ProjectExistsError,
+        InvalidProjectNameError,
+        generate_project,
+        iter_project_entries,
+    )
+
+
+__all__ = [
+    "Timings",
+    "StageCallback",
+    "ProjectSpec",
+    "ProjectEntry",
+    "GenerationResult",
+    "ProjectExistsError",
+    "InvalidProjectNameError",
+    "generate_project",
+    "iter_project_entries",
+    "write_archive",
+    "BootstrapStep",
+    "bootstrap_project",
+]
+
+_LAZY_IMPORTS = {
+    "Timings": "timings",
+    "StageCallback": "timings",
+    "ProjectSpec": "generator",
+    "ProjectEntry": "generator",
+    "GenerationResult": "generator",
+    "ProjectExistsError": "generator",
+    "InvalidProjectNameError": "generator",
+    "generate_project": "generator",
+    "iter_project_entries": "generator",
+    "write_archive": "archive",
+    "BootstrapStep": "bootstrap",
+    "bootstrap_project": "bootstrap",
+}
+
+
+def __getattr__(name: str) -> Any:
+    """Import the public API on first access, so that `pypct` can start without it."""
+    if name not in _LAZY_IMPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+
+    value = getattr(importlib.import_module(f".{_LAZY_IMPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
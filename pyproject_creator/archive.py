@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import io
+import stat
+import time
+import tarfile
+import zipfile
+from typing import BinaryIO
+from collections.abc import Iterable
+
+from pyproject_creator.timings import Timings
+from pyproject_creator.generator import (
+    ProjectSpec,
+    ProjectEntry,
+    iter_project_entries,
+    validate_project_name,
+)
+
+
+OUTPUT_FORMATS = ("dir", "tar", "zip")
+ARCHIVE_SUFFIXES = {"tar": ".tar.gz", "zip": ".zip"}
+
+
+def _write_tar(fileobj: BinaryIO, root: str, entries: Iterable[ProjectEntry]) -> list[str]:
+    names = []
+    mtime = int(time.time())
+    # "w|gz" is the stream mode: no seeking, members are compressed as they are added
+    with tarfile.open(fileobj=fileobj, mode="w|gz") as tar:
+        for entry in entries:
+            info = tarfile.TarInfo(f"{root}/{entry.path}")
+            info.size = len(entry.data)
+            info.mode = entry.mode
+            info.mtime = mtime
+            tar.addfile(info, io.BytesIO(entry.data))
+            names.append(info.name)
+    return names
+
+
+def _write_zip(fileobj: BinaryIO, root: str, entries: Iterable[ProjectEntry]) -> list[str]:
+    names = []
+    date_time = time.localtime()[:6]
+    # zipfile falls back to data descriptors when `fileobj` can't seek
+    with zipfile.ZipFile(fileobj, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for entry in entries:
+            info = zipfile.ZipInfo(f"{root}/{entry.path}", date_time=date_time)
+            info.external_attr = (stat.S_IFREG | entry.mode) << 16
+            info.compress_type = zipfile.ZIP_DEFLATED
+            with archive.open(info, "w") as member:
+                member.write(entry.data)
+            names.append(info.filename)
+    return names
+
+
+def write_archive(
+    spec: ProjectSpec,
+    fileobj: BinaryIO,
+    output_format: str = "tar",
+    *,
+    timings: Timings | None = None,
+) -> list[str]:
+    """Write the project `spec` as a gzipped tarball or a zip file into `fileobj`.
+
+    Members are generated and written one by one, `fileobj` doesn't need to be seekable
+    (a socket, `sys.stdout.buffer`, an upload stream), and nothing touches the disk.
+    Every member is stored under a `<project name>/` directory. Returns the member names.
+
+    Raises:
+        InvalidProjectNameError: `spec.name` is not a valid project name.
+    """
+    validate_project_name(spec.name)
+    entries = iter_project_entries(spec, timings=timings)
+    if output_format == "tar":
+        return _write_tar(fileobj, spec.name, entries)
+    if output_format == "zip":
+        return _write_zip(fileobj, spec.name, entries)
+    raise ValueError(f"Unknown archive format {output_format!r}, expected 'tar' or 'zip'")
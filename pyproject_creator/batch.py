@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import os
+import time
+import tomllib
+from typing import Any, get_type_hints
+from pathlib import Path
+from dataclasses import fields, dataclass
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+
+from pyproject_creator.generator import (
+    ProjectSpec,
+    ProjectExistsError,
+    InvalidProjectNameError,
+    generate_project,
+)
+
+
+SPEC_FIELDS: frozenset[str] = frozenset(field.name for field in fields(ProjectSpec))
+SPEC_TYPES: dict[str, type] = {
+    name: hint for name, hint in get_type_hints(ProjectSpec).items() if name in SPEC_FIELDS
+}
+
+
+@dataclass(frozen=True)
+class BatchResult:
+    """Outcome of generating a single project of a batch."""
+
+    name: str
+    path: Path
+    error: str | None = None
+    duration: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _to_spec(entry: dict[str, Any], defaults: dict[str, Any]) -> ProjectSpec:
+    """Build a `ProjectSpec`, accepting option names as well (`python-version`, `need-logs`)."""
+    values: dict[str, Any] = {}
+    for key, value in {**defaults, **entry}.items():
+        key = key.replace("-", "_").removeprefix("need_")
+        if key not in SPEC_FIELDS:
+            raise ValueError(
+                f"Unknown project field {key!r}, expected one of {sorted(SPEC_FIELDS)}"
+            )
+        expected = SPEC_TYPES[key]
+        if not isinstance(value, expected):
+            # e.g. `python-version = 3.12` is a TOML float, `logs = "false"` a string
+            raise ValueError(
+                f"Project field {key!r} must be a {expected.__name__}, "
+                f"got {type(value).__name__} {value!r}"
+            )
+        values[key] = value
+    if "name" not in values:
+        raise ValueError("Every project in the manifest needs a `name`")
+    return ProjectSpec(**values)
+
+
+def load_manifest(manifest: Path | str) -> list[ProjectSpec]:
+    """Read project specs from a TOML manifest.
+
+    ```toml
+    [defaults]
+    author = "Your Name <your.email@example.com>"
+
+    [[project]]
+    name = "service-a"
+    github-action = true
+    ```
+    """
+    with open(manifest, "rb") as _file:
+        data = tomllib.load(_file)
+    defaults: dict[str, Any] = data.get("defaults", {})
+    specs = [_to_spec(entry, defaults) for entry in data.get("project", [])]
+    names = [spec.name for spec in specs]
+    duplicated = sorted({name for name in names if names.count(name) > 1})
+    if duplicated:
+        raise ValueError(f"Duplicated project names in manifest: {', '.join(duplicated)}")
+    return specs
+
+
+def _create_one(spec: ProjectSpec, dest: Path, copy_strategy: str) -> BatchResult:
+    """Create one project under `dest`; errors are reported, never raised."""
+    start = time.perf_counter()
+    try:
+        generate_project(spec, dest, copy_strategy=copy_strategy)
+    except (ProjectExistsError, InvalidProjectNameError) as e:
+        error: str | None = str(e)
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    else:
+        error = None
+    return BatchResult(spec.name, dest / spec.name, error, time.perf_counter() - start)
+
+
+def run_batch(
+    specs: list[ProjectSpec],
+    dest: Path | str = ".",
+    jobs: int | None = None,
+    executor: str = "process",
+    copy_strategy: str = "copy",
+) -> list[BatchResult]:
+    """Generate all `specs` under `dest` concurrently, at most `jobs` at a time.
+
+    The results keep the order of `specs`. `copy_strategy` is passed to `generate_project`.
+    """
+    dest = Path(dest).resolve()
+    dest.mkdir(parents=True, exist_ok=True)
+    jobs = jobs or os.cpu_count() or 1
+    pool: Executor
+    if executor == "process":
+        pool = ProcessPoolExecutor(max_workers=min(jobs, len(specs) or 1))
+    elif executor == "thread":
+        pool = ThreadPoolExecutor(max_workers=jobs)
+    else:
+        raise ValueError(f"Unknown executor {executor!r}, expected 'process' or 'thread'")
+    with pool:
+        count = len(specs)
+        return list(pool.map(_create_one, specs, [dest] * count, [copy_strategy] * count))
@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import time
+import asyncio
+from typing import TYPE_CHECKING
+from pathlib import Path
+from dataclasses import dataclass
+from collections.abc import Callable, Sequence
+
+from pyproject_creator.process import run_command
+
+
+if TYPE_CHECKING:
+    from pyproject_creator.envcache import EnvCache
+
+
+Echo = Callable[[str], None]
+"""Receives every output line of the steps, already prefixed with the step name."""
+
+
+@dataclass(frozen=True)
+class BootstrapStep:
+    """A command run in the new project once its dependencies succeeded."""
+
+    name: str
+    command: tuple[str, ...] = ()
+    needs: tuple[str, ...] = ()
+    """Names of the steps that must succeed first, the other steps run concurrently."""
+    action: Callable[[Path, Echo], int] | None = None
+    """Run in a thread instead of `command`, with the project path and an `echo` for its
+    output; returns an exit code."""
+    timeout: float | None = None
+    """Seconds before `command` and everything it started are killed, see `run_command`."""
+
+
+@dataclass(frozen=True)
+class StepResult:
+    name: str
+    returncode: int | None
+    """None when the step was skipped because a dependency failed."""
+    duration: float
+
+    @property
+    def ok(self) -> bool:
+        return self.returncode == 0
+
+
+INSTALL_TIMEOUT: float = 30 * 60
+"""Seconds `poetry install` may take, a stalled resolution or download is killed after."""
+
+DEFAULT_STEPS: tuple[BootstrapStep, ...] = (
+    BootstrapStep("git", ("git", "init"), timeout=60),
+    BootstrapStep("poetry", ("poetry", "install"), timeout=INSTALL_TIMEOUT),
+    # pre-commit is a dev dependency and installs its hooks into the git repository
+    BootstrapStep(
+        "pre-commit",
+        ("poetry", "run", "pre-commit", "install"),
+        needs=("git", "poetry"),
+        timeout=5 * 60,
+    ),
+)
+
+
+def default_steps(env_cache: EnvCache | None = None) -> tuple[BootstrapStep, ...]:
+    """`DEFAULT_STEPS`, with `poetry install` served from `env_cache` when given."""
+    if env_cache is None:
+        return DEFAULT_STEPS
+    from pyproject_creator.envcache import install_environment
+
+    def install(project_path: Path, echo: Echo) -> int:
+        return install_environment(project_path, echo, env_cache, timeout=INSTALL_TIMEOUT)
+
+    return tuple(
+        (
+            BootstrapStep(step.name, needs=step.needs, action=install, timeout=step.timeout)
+            if step.name == "poetry"
+            else step
+        )
+        for step in DEFAULT_STEPS
+    )
+
+
+async def _run_step(step: BootstrapStep, cwd: Path, echo: Echo) -> int:
+    def prefixed(line: str) -> None:
+        echo(f"[{step.name}] {line}")
+
+    if step.action is not None:
+        return await asyncio.to_thread(step.action, cwd, prefixed)
+    result = await asyncio.to_thread(
+        run_command, step.command, cwd=cwd, timeout=step.timeout, echo=prefixed
+    )
+    if result.timed_out:
+        prefixed(f"timed out after {step.timeout}s, killed")
+    return 124 if result.timed_out else result.returncode
+
+
+async def run_steps(
+    steps: Sequence[BootstrapStep], cwd: Path, echo: Echo = print
+) -> list[StepResult]:
+    """Run `steps` in `cwd`, each as soon as the steps it needs have succeeded.
+
+    The output of each step is streamed line by line as it comes. A step that timed out
+    fails with exit code 124, like `timeout(1)`. Returns one result per step, in the order
+    of `steps`.
+
+    Raises:
+        ValueError: a step needs an unknown step, or the steps depend on each other in a
+            cycle.
+    """
+    names = {step.name for step in steps}
+    for step in steps:
+        unknown = set(step.needs) - names
+        if unknown:
+            raise ValueError(f"Step {step.name!r} needs unknown steps: {sorted(unknown)}")
+    _check_acyclic(steps)
+
+    tasks: dict[str, asyncio.Task[StepResult]] = {}
+
+    async def run(step: BootstrapStep) -> StepResult:
+        dependencies = [await tasks[name] for name in step.needs]
+        if not all(result.ok for result in dependencies):
+            echo(f"[{step.name}] skipped, a step it needs failed")
+            return StepResult(step.name, None, 0.0)
+        start = time.perf_counter()
+        returncode = await _run_step(step, cwd, echo)
+        return StepResult(step.name, returncode, time.perf_counter() - start)
+
+    for step in steps:
+        tasks[step.name] = asyncio.ensure_future(run(step))
+    return list(await asyncio.gather(*tasks.values()))
+
+
+def _check_acyclic(steps: Sequence[BootstrapStep]) -> None:
+    needs = {step.name: step.needs for step in steps}
+    done: set[str] = set()
+
+    def visit(name: str, path: tuple[str, ...]) -> None:
+        if name in path:
+            cycle = " -> ".join((*path, name))
+            raise ValueError(f"Bootstrap steps depend on each other: {cycle}")
+        if name not in done:
+            for need in needs[name]:
+                visit(need, (*path, name))
+            done.add(name)
+
+    for name in needs:
+        visit(name, ())
+
+
+def bootstrap_project(
+    project_path: Path | str, steps: Sequence[BootstrapStep] = DEFAULT_STEPS, echo: Echo = print
+) -> list[StepResult]:
+    """Run the bootstrap `steps` (by default `git init`, `poetry install` then
+    `pre-commit install`) in a generated project, concurrently where possible."""
+    return asyncio.run(run_steps(steps, Path(project_path), echo))
@@ -1,35 +1,93 @@
 from __future__ import annotations
 
-import os
-import re
-import shutil
-import subprocess
+import sys
+import contextlib
+from typing import TYPE_CHECKING, Any
 from pathlib import Path
 
 import click
-import jinja2
 
+from pyproject_creator.utils import BASE_PATH
 
-BASE_PATH: Path = Path(__file__).parent.resolve()
+
+if TYPE_CHECKING:
+    from pyproject_creator.process import CommandResult
+    from pyproject_creator.timings import Timings
+    from pyproject_creator.generator import ProjectSpec
+    from pyproject_creator.lockcache import LockCache
+    from pyproject_creator.poetry_check import PoetryCheck
+
+# `pypct --help` and argument errors must stay fast, so everything heavier than click
+# (jinja2, subprocess, the generator and the batch pool) is imported where it is used.
+
+
+__all__ = ["BASE_PATH", "main", "batch", "cache", "create_project"]
+
+
+class DefaultCommandGroup(click.Group):
+    """A group that runs `default_command` when no known subcommand is given,
+    so that the plain `pypct [OPTIONS]` form keeps working."""
+
+    def __init__(self, *args: Any, default_command: str, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.default_command = default_command
+
+    def parse_args(self, ctx: click.Context, args: list[str]) -> list[str]:
+        if not args or (args[0] not in self.commands and args[0] not in ctx.help_option_names):
+            args = [self.default_command, *args]
+        return super().parse_args(ctx, args)
+
+
+class StreamSafeOption(click.Option):
+    """An option that prompts on stderr when the archive is written to stdout (`--output -`).
+
+    Options given on the command line are processed first, so `output` is known by then.
+    """
+
+    def prompt_for_value(self, ctx: click.Context) -> Any:
+        if str(ctx.params.get("output")) != "-":
+            return super().prompt_for_value(ctx)
+        # click echoes the prompt and `input` writes to stdout, which holds the archive
+        with contextlib.redirect_stdout(sys.stderr):
+            return super().prompt_for_value(ctx)
 
 
 def validate_project_name(value: str) -> str:
     """Validate the project name to ensure it meets the required criteria."""
-    if not re.match(r"^[a-zA-Z0-9][a-zA-Z0-9_-]*$", value):
-        raise click.BadParameter(
-            "Project name should start with a letter or number and contain only letters, numbers, "
-            "underscores, and hyphens, but not start with underscores or hyphens."
-        )
-    if value.endswith("-") or value.endswith("_"):
-        raise click.BadParameter("Project name should not end with a hyphen or underscore.")
-    return value
-
+    from pyproject_creator import generator
+    from pyproject_creator.generator import InvalidProjectNameError
 
-def check_poetry_installed() -> None:
-    """Check if Poetry is installed, otherwise prompt the user to install it."""
     try:
-        subprocess.run(["poetry", "--version"], check=True, capture_output=True)
-    except subprocess.CalledProcessError:
+        return generator.validate_project_name(value)
+    except InvalidProjectNameError as e:
+        raise click.BadParameter(str(e)) from e
+
+
+def _poetry_check() -> PoetryCheck:
+    """The background Poetry check of this invocation, started on first use.
+
+    Only the commands that need Poetry call this, so `pypct cache ...` never probes it.
+    """
+    from pyproject_creator.poetry_check import start_poetry_check
+
+    ctx = click.get_current_context(silent=True)
+    if ctx is None:
+        return start_poetry_check()
+    if "poetry_check" not in ctx.meta:
+        ctx.meta["poetry_check"] = start_poetry_check()
+    return ctx.meta["poetry_check"]  # type: ignore[no-any-return]
+
+
+def check_poetry_installed(check: PoetryCheck | None = None) -> None:
+    """Check if Poetry is installed, otherwise prompt the user to install it.
+
+    `check` is a check started earlier with `start_poetry_check`, by default the result
+    comes from the cache or a new `poetry --version` run.
+    """
+    from pyproject_creator.poetry_check import is_poetry_installed
+
+    installed = check.result() if check is not None else is_poetry_installed()
+    if not installed:
         click.echo("Poetry is not installed.")
         click.echo(
             "Please install Poetry by following the instructions at https://python-poetry.org/docs/#installation"
@@ -40,21 +98,14 @@ def check_poetry_installed() -> None:
         exit(1)
 
 
-def run_command(command: str) -> None:
-    """Run a shell command and handle any errors."""
-    try:
-        result = subprocess.run(
-            command,
-            shell=True,
-            check=True,
-            capture_output=True,
-            text=True,
-        )
-        click.echo(result.stdout)
-    except subprocess.CalledProcessError as e:
-        if e.stderr:
-            click.echo(f"Error: {e.stderr}")
-        exit(1)
+def run_command(command: str, timeout: float | None = None) -> CommandResult:
+    """Run a shell command, streaming its output, and return its result.
+
+    See `pyproject_creator.process.run_command`; failures are for the caller to report.
+    """
+    from pyproject_creator import process
+
+    return process.run_command(command, timeout=timeout, echo=click.echo)
 
 
 def create_file(file_path: Path | str, content: str | None = None) -> None:
@@ -65,51 +116,102 @@ def create_file(file_path: Path | str, content: str | None = None) -> None:
         f.write(content)
 
 
-def prompt_project_details(value: str) -> tuple[Path, Path]:
-    """Prompt the user for project details and create the project directory structure."""
-    validate_project_name(value)
-    project_path: Path = Path(value).resolve()
-    if project_path.exists():
-        click.echo(f"Error: {value} directory already exists.")
-        exit(1)
+def _echo_timings(stage_timings: Timings, output_format: str | None) -> None:
+    if output_format == "json":
+        click.echo(stage_timings.to_json(), err=True)
+    elif output_format:
+        click.echo(stage_timings.format_table(), err=True)
+
+
+def _create_archive(
+    spec: ProjectSpec, output_format: str, output: Path | None, stage_timings: Timings
+) -> None:
+    """Stream the project into an archive file or, for `-`, into stdout."""
+    from pyproject_creator.archive import ARCHIVE_SUFFIXES, write_archive
+    from pyproject_creator.generator import InvalidProjectNameError
+
+    if output is None:
+        output = Path(f"{spec.name}{ARCHIVE_SUFFIXES[output_format]}")
+    try:
+        if str(output) == "-":
+            write_archive(spec, sys.stdout.buffer, output_format, timings=stage_timings)
+            return
+        try:
+            with open(output, "xb") as file:
+                write_archive(spec, file, output_format, timings=stage_timings)
+        except FileExistsError:
+            click.echo(f"Error: {output} already exists.")
+            exit(1)
+        except BaseException:
+            output.unlink(missing_ok=True)
+            raise
+    except InvalidProjectNameError as e:
+        raise click.BadParameter(str(e), param_hint="'--name'") from e
+    click.echo(f"Project archive created: {output}")
+
 
-    project_path.mkdir()
-    os.chdir(project_path)
+def _lock_cache() -> LockCache:
+    from pyproject_creator.lockcache import LockCache
 
-    src_path: Path = project_path / value.replace("-", "_")
-    src_path.mkdir()
-    create_file(src_path / "__init__.py")
-    return project_path, src_path
+    return LockCache()
+
+
+def _bootstrap(project_path: Path, env_cache: bool = True) -> list[str]:
+    """Run the bootstrap steps with prefixed output, returning the names of failed steps."""
+    from pyproject_creator.envcache import EnvCache
+    from pyproject_creator.bootstrap import default_steps, bootstrap_project
+
+    steps = default_steps(EnvCache() if env_cache else None)
+    results = bootstrap_project(project_path, steps, echo=click.echo)
+    for result in results:
+        if result.ok:
+            click.echo(f"  ok    {result.name} ({result.duration:.2f}s)")
+        elif result.returncode is None:
+            click.echo(f"  skip  {result.name}")
+        else:
+            click.echo(f"  fail  {result.name} (exit code {result.returncode})")
+    return [result.name for result in results if not result.ok]
 
 
 @click.command()  # type: ignore
-@click.option("--name", prompt="Project name", required=True, help="Enter the project name.")
+@click.option(
+    "--name",
+    cls=StreamSafeOption,
+    prompt="Project name",
+    required=True,
+    help="Enter the project name.",
+)
 @click.option(
     "--description",
+    cls=StreamSafeOption,
     prompt="Project description",
     default="",
     help="Provide a brief description of the project.",
 )
 @click.option(
     "--author",
+    cls=StreamSafeOption,
     prompt="Author name",
     default="Your Name <your.email@example.com>",
     help="Enter the author's name and email.",
 )
 @click.option(
     "--python-version",
+    cls=StreamSafeOption,
     prompt="Python version",
     default="3.11",
     help="Specify the Python version to use.",
 )
 @click.option(
     "--project-license",
+    cls=StreamSafeOption,
     prompt="Project license",
     default="",
     help="Specify the license for the project.",
 )
 @click.option(
     "--pypi-package",
+    cls=StreamSafeOption,
     prompt="Create pypi package?",
     type=bool,
     is_flag=True,
@@ -119,6 +221,7 @@ def prompt_project_details(value: str) -> tuple[Path, Path]:
 @click.option(
     "--logs",
     "--need-logs",
+    cls=StreamSafeOption,
     prompt="Create logs package?",
     type=bool,
     is_flag=True,
@@ -128,6 +231,7 @@ def prompt_project_details(value: str) -> tuple[Path, Path]:
 @click.option(
     "--tests",
     "--need-tests",
+    cls=StreamSafeOption,
     prompt="Create tests(pytest) directory?",
     type=bool,
     is_flag=True,
@@ -136,12 +240,73 @@ def prompt_project_details(value: str) -> tuple[Path, Path]:
 )
 @click.option(
     "--github-action",
+    cls=StreamSafeOption,
     prompt="Create github action for project(master branch)?",
     type=bool,
     is_flag=True,
     default=False,
     help="Do you want to create a GitHub action for the master branch? Enter 'y' or 'N'.",
 )
+@click.option(
+    "--timings",
+    type=click.Choice(["table", "json"]),
+    is_flag=False,
+    flag_value="table",
+    default=None,
+    envvar="PYPCT_TIMINGS",
+    help="Print the duration of each stage to stderr, as a table (default) or as JSON.",
+)
+@click.option(
+    "--output-format",
+    type=click.Choice(["dir", "tar", "zip"]),
+    default="dir",
+    show_default=True,
+    help="Create a directory, or a .tar.gz / .zip archive of the project.",
+)
+@click.option(
+    "--output",
+    type=click.Path(dir_okay=False, allow_dash=True, path_type=Path),
+    default=None,
+    help="Archive path, `-` writes it to stdout. Defaults to <name>.tar.gz or <name>.zip.",
+)
+@click.option(
+    "--copy-strategy",
+    type=click.Choice(["copy", "reflink", "hardlink"]),
+    default="copy",
+    show_default=True,
+    help="How template files that aren't rendered are copied; reflink and hardlink fall back "
+    "to copy where unsupported, hardlinked files must not be edited.",
+)
+@click.option(
+    "--bootstrap",
+    is_flag=True,
+    default=False,
+    help="Then run `git init`, `poetry install` and `pre-commit install` in the project, "
+    "concurrently where possible.",
+)
+@click.option(
+    "--env-cache/--no-env-cache",
+    default=True,
+    show_default=True,
+    envvar="PYPCT_ENV_CACHE",
+    help="With --bootstrap, reuse a cached environment of the same dependencies and Python "
+    "instead of resolving and downloading them.",
+)
+@click.option(
+    "--lock-cache/--no-lock-cache",
+    default=True,
+    show_default=True,
+    envvar="PYPCT_LOCK_CACHE",
+    help="Add the cached poetry.lock of the same dependencies to the project.",
+)
+@click.option(
+    "--refresh-locks/--no-refresh-locks",
+    default=False,
+    show_default=True,
+    envvar="PYPCT_REFRESH_LOCKS",
+    help="Resolve new or stale cached locks with a detached `pypct cache refresh`, for the "
+    "next projects.",
+)
 def create_project(
     name: str,
     description,
@@ -152,71 +317,202 @@ def create_project(
     tests,
     github_action,
     pypi_package,
+    timings: str | None = None,
+    output_format: str = "dir",
+    output: Path | None = None,
+    copy_strategy: str = "copy",
+    bootstrap: bool = False,
+    env_cache: bool = True,
+    lock_cache: bool = True,
+    refresh_locks: bool = False,
 ) -> None:
     """Create a new Python project with Poetry, pre-commit, logs, tests."""
-
-    # Prompt for project details
-    project_path, src_path = prompt_project_details(name)
-
-    # Copy template files
-    template_path: Path = BASE_PATH / "template"
-    shutil.copy(template_path / ".gitignore", project_path / ".gitignore")
-    shutil.copy(
-        template_path / ".pre-commit-config.yaml",
-        project_path / ".pre-commit-config.yaml",
+    from pyproject_creator.timings import Timings
+    from pyproject_creator.generator import (
+        ProjectSpec,
+        ProjectExistsError,
+        InvalidProjectNameError,
+        generate_project,
     )
-    shutil.copy(template_path / ".cz.toml", project_path / ".cz.toml")
-    shutil.copytree(template_path / "scripts", project_path / "scripts")
-    if logs:
-        shutil.copytree(template_path / "logs", project_path / src_path / "logs")
-    if logs:
-        shutil.copytree(template_path / "tests", project_path / "tests")
-    if github_action:
-        _github_action_path = project_path / ".github"
-        _github_action_path.mkdir(exist_ok=True, parents=True)
-        shutil.copy(
-            template_path / "github_action" / "workflows" / "test.yml",
-            _github_action_path / "test.yml",
-        )
-        shutil.copy(
-            template_path / "github_action" / "workflows" / "bumpversion.yml",
-            _github_action_path / "bumpversion.yml",
-        )
-        if pypi_package:
-            shutil.copy(
-                template_path / "github_action" / "workflows" / "pythonpublish.yml",
-                _github_action_path / "pythonpublish.yml",
-            )
 
-    # create pyproject.toml
-    shutil.copy(template_path / "pyproject.template", project_path / "pyproject.toml")
-    with open(project_path / "pyproject.toml") as _file:
-        poetry_config = _file.read()
-    template = jinja2.Template(poetry_config)
-    rendered_toml = template.render(
-        project_name=project_path.name,
-        project_description=description,
+    spec = ProjectSpec(
+        name=name,
+        description=description,
         author=author,
-        is_pypi_package="true" if pypi_package else "false",
-        python_version=python_version.strip("^"),
+        python_version=python_version,
         project_license=project_license,
-        need_tests=tests,
-        need_logs=tests,
-        project_src_name=src_path.name,
+        pypi_package=pypi_package,
+        logs=logs,
+        tests=tests,
+        github_action=github_action,
     )
+    stage_timings = Timings()
+    if output_format != "dir":
+        if bootstrap:
+            raise click.BadParameter(
+                "can't bootstrap an archive, use --output-format dir.", param_hint="'--bootstrap'"
+            )
+        _create_archive(spec, output_format, output, stage_timings)
+        _echo_timings(stage_timings, timings)
+        return
 
-    with open("pyproject.toml", "w") as file:
-        file.write(rendered_toml)
-
-    # Create README.md
-    create_file("README.md", f"# {project_path.name}\n")
+    poetry_check = _poetry_check()
+    try:
+        result = generate_project(
+            spec,
+            timings=stage_timings,
+            copy_strategy=copy_strategy,
+            lock_cache=_lock_cache() if lock_cache else None,
+        )
+    except InvalidProjectNameError as e:
+        raise click.BadParameter(str(e), param_hint="'--name'") from e
+    except ProjectExistsError as e:
+        click.echo(f"Error: {e}")
+        exit(1)
 
     # Check if Poetry is installed
-    check_poetry_installed()
+    with stage_timings.stage("poetry_check"):
+        check_poetry_installed(poetry_check)
+    if refresh_locks and result.lock in ("stale", "miss"):
+        from pyproject_creator.lockcache import start_background_refresh
+
+        start_background_refresh()
+    if bootstrap:
+        with stage_timings.stage("bootstrap"):
+            failed = _bootstrap(result.project_path, env_cache)
+    _echo_timings(stage_timings, timings)
     click.echo("\n")
     click.echo("Project created successfully!")
-    click.echo(f"Next steps: `cd {project_path.name}` and `poetry install`, then start coding!")
+    if not bootstrap:
+        click.echo(
+            f"Next steps: `cd {result.project_path.name}` and `poetry install`, then start coding!"
+        )
+    elif failed:
+        click.echo(f"Bootstrap failed: {', '.join(failed)}. Run the failed steps by hand.")
+        exit(1)
+    else:
+        click.echo(f"Next steps: `cd {result.project_path.name}`, then start coding!")
+
+
+@click.command()
+@click.argument(
+    "manifest",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+)
+@click.option(
+    "--dest",
+    type=click.Path(file_okay=False, path_type=Path),
+    default=".",
+    show_default=True,
+    help="Directory in which the projects are created.",
+)
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Maximum number of projects generated at once, defaults to the CPU count.",
+)
+@click.option(
+    "--executor",
+    type=click.Choice(["process", "thread"]),
+    default="process",
+    show_default=True,
+    help="Run the generation on a process pool or a thread pool.",
+)
+@click.option(
+    "--copy-strategy",
+    type=click.Choice(["copy", "reflink", "hardlink"]),
+    default="copy",
+    show_default=True,
+    help="How template files that aren't rendered are copied; reflink and hardlink fall back "
+    "to copy where unsupported, hardlinked files must not be edited.",
+)
+def batch(manifest: Path, dest: Path, jobs: int | None, executor: str, copy_strategy: str) -> None:
+    """Create every project listed in a TOML manifest concurrently."""
+    from pyproject_creator.batch import run_batch, load_manifest
+
+    poetry_check = _poetry_check()
+    try:
+        specs = load_manifest(manifest)
+    except (ValueError, TypeError) as e:
+        raise click.BadParameter(str(e), param_hint="MANIFEST") from e
+
+    results = run_batch(specs, dest, jobs=jobs, executor=executor, copy_strategy=copy_strategy)
+    for result in results:
+        if result.ok:
+            click.echo(f"  ok    {result.name} ({result.duration:.2f}s)")
+        else:
+            click.echo(f"  fail  {result.name}: {result.error}")
+    failed = sum(not result.ok for result in results)
+    click.echo(f"\n{len(results) - failed} created, {failed} failed.")
+
+    # Check if Poetry is installed, once for the whole batch
+    check_poetry_installed(poetry_check)
+    if failed:
+        exit(1)
+
+
+@click.group()
+def cache() -> None:
+    """Inspect and maintain the poetry.lock and environment caches."""
+
+
+@cache.command("list")
+def cache_list() -> None:
+    """List the cached locks and environments."""
+    from datetime import datetime
+
+    from pyproject_creator.envcache import EnvCache
+
+    for lock in _lock_cache().entries():
+        if lock.resolved_at is None:
+            state = "unresolved"
+        else:
+            resolved = datetime.fromtimestamp(lock.resolved_at).isoformat(" ", "seconds")
+            state = f"resolved {resolved}{', stale' if lock.is_stale() else ''}"
+        click.echo(f"  lock  {lock.key[:12]}  {state}")
+    for env in EnvCache().entries():
+        used = datetime.fromtimestamp(env.last_used).isoformat(" ", "seconds")
+        click.echo(f"  env   {env.key[:12]}  {env.size / 1024 / 1024:.1f} MiB, used {used}")
+
+
+@cache.command("refresh")
+@click.option("--all", "everything", is_flag=True, help="Resolve the fresh locks as well.")
+def cache_refresh(everything: bool) -> None:
+    """Resolve the new and stale locks with `poetry lock`."""
+    results = _lock_cache().refresh(everything, echo=click.echo)
+    if results is None:
+        click.echo("Another refresh is running.")
+        return
+    for key, returncode in results:
+        if returncode == 0:
+            click.echo(f"  ok    {key[:12]}")
+        else:
+            click.echo(f"  fail  {key[:12]} (exit code {returncode})")
+    if any(returncode != 0 for _, returncode in results):
+        exit(1)
+
+
+@cache.command("clear")
+def cache_clear() -> None:
+    """Remove every cached lock and environment."""
+    from pyproject_creator.envcache import EnvCache
+
+    locks = _lock_cache().clear()
+    envs = len(EnvCache().evict(max_bytes=0))
+    click.echo(f"Removed {locks} locks and {envs} environments.")
+
+
+@click.group(cls=DefaultCommandGroup, default_command="create")
+def main() -> None:
+    """Create new Python projects with Poetry, pre-commit, logs, tests."""
+
+
+main.add_command(create_project, "create")
+main.add_command(batch, "batch")
+main.add_command(cache, "cache")
 
 
 if __name__ == "__main__":
-    create_project()
+    main()
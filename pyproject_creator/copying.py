@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import os
+import sys
+import shutil
+from pathlib import Path
+
+
+COPY_STRATEGIES = ("copy", "reflink", "hardlink")
+"""How template files that aren't rendered get into a project:
+
+- `copy`: a regular byte-for-byte copy.
+- `reflink`: a copy-on-write clone (Linux `FICLONE`, e.g. on Btrfs or XFS), the data
+  blocks are shared until either file changes. Falls back to `copy` when unsupported.
+- `hardlink`: the project file *is* the template file, only for read-only use such as
+  throwaway CI sandboxes, since editing it edits the installed template. Falls back to
+  `copy` across filesystems.
+"""
+
+FICLONE = 0x40049409
+"""`_IOW(0x94, 9, int)` from `linux/fs.h`."""
+
+_no_reflink_devices: set[tuple[int, int]] = set()
+"""`(source, target)` device pairs that already refused a reflink."""
+
+
+def _reflink(src: Path, dst: Path) -> bool:
+    if sys.platform != "linux":
+        return False
+    import fcntl
+
+    devices = (os.stat(src).st_dev, os.stat(dst.parent).st_dev)
+    if devices in _no_reflink_devices:
+        return False
+    with open(src, "rb") as src_file, open(dst, "wb") as dst_file:
+        try:
+            fcntl.ioctl(dst_file.fileno(), FICLONE, src_file.fileno())
+        except OSError:
+            _no_reflink_devices.add(devices)
+            return False
+    shutil.copymode(src, dst)
+    return True
+
+
+def _hardlink(src: Path, dst: Path) -> bool:
+    try:
+        os.link(src, dst)
+    except OSError:
+        return False
+    return True
+
+
+def copy_file(src: Path, dst: Path, strategy: str = "copy") -> str:
+    """Copy `src` to `dst` with `strategy`, see `COPY_STRATEGIES`.
+
+    Returns the strategy that was actually used, `copy` when the requested one is not
+    supported here.
+    """
+    if strategy == "reflink" and _reflink(src, dst):
+        return "reflink"
+    if strategy == "hardlink" and _hardlink(src, dst):
+        return "hardlink"
+    if strategy not in COPY_STRATEGIES:
+        raise ValueError(f"Unknown copy strategy {strategy!r}, expected one of {COPY_STRATEGIES}")
+    shutil.copy(src, dst)
+    return "copy"
@@ -0,0 +1,272 @@
+from __future__ import annotations
+
+import os
+import sys
+import json
+import time
+import errno
+import shutil
+import hashlib
+import secrets
+import subprocess
+from typing import Any
+from pathlib import Path
+from dataclasses import dataclass
+from collections.abc import Callable
+
+from pyproject_creator.utils import user_cache_dir
+from pyproject_creator.copying import copy_file
+from pyproject_creator.process import run_command
+
+
+Echo = Callable[[str], None]
+
+ENV_CACHE_MAX_MB = 4096
+"""Default size cap of the environment cache, overridable with `PYPCT_ENV_CACHE_MAX_MB`."""
+CACHE_FORMAT = "1"
+"""Part of every key, bumped when the layout of an entry changes."""
+RELEVANT_KEYS = ("dependencies", "dev-dependencies", "group", "source", "extras")
+"""The `[tool.poetry]` keys that decide what gets installed, as in Poetry's content-hash."""
+
+
+def _max_bytes() -> int:
+    try:
+        return int(float(os.environ["PYPCT_ENV_CACHE_MAX_MB"]) * 1024 * 1024)
+    except (KeyError, ValueError):
+        return ENV_CACHE_MAX_MB * 1024 * 1024
+
+
+def _load_pyproject(pyproject: Path) -> dict[str, Any]:
+    import tomllib
+
+    with open(pyproject, "rb") as file:
+        return tomllib.load(file)
+
+
+def dependency_digest(pyproject: Path) -> str:
+    """Digest of the dependency spec of a `pyproject.toml`, ignoring its name, description...
+
+    Projects rendered with the same options share it, whatever their name.
+    """
+    poetry = _load_pyproject(pyproject).get("tool", {}).get("poetry", {})
+    relevant = {key: poetry[key] for key in RELEVANT_KEYS if key in poetry}
+    return hashlib.sha256(json.dumps(relevant, sort_keys=True).encode()).hexdigest()
+
+
+def find_python(pyproject: Path) -> str | None:
+    """An interpreter satisfying the project's `python = "^X.Y"`, this one when it does."""
+    requirement = _load_pyproject(pyproject)["tool"]["poetry"]["dependencies"]["python"]
+    try:
+        major, minor = (int(part) for part in requirement.strip("^~=>< ").split(".")[:2])
+    except ValueError:
+        return None
+    if sys.version_info[0] == major and sys.version_info[1] >= minor:
+        return sys.executable
+    return shutil.which(f"python{major}.{minor}")
+
+
+def interpreter_identity(python: str) -> str:
+    """What a virtual environment depends on: the interpreter, its version and platform."""
+    if python == sys.executable:
+        version = f"{sys.version} {sys.platform} {os.uname().machine}"
+    else:
+        code = "import os, sys; print(sys.version, sys.platform, os.uname().machine)"
+        version = subprocess.run(
+            [python, "-c", code],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+    return f"{os.path.realpath(python)} {version}"
+
+
+@dataclass(frozen=True)
+class CacheEntry:
+    key: str
+    path: Path
+    size: int
+    """Bytes on disk, before any sharing through reflinks."""
+    last_used: float
+
+
+class EnvCache:
+    """Ready-to-use virtual environments keyed by dependency spec and interpreter.
+
+    Each entry holds a `venv` installed without the project itself and the `poetry.lock`
+    it was installed from. Once the cache exceeds its size cap, the least recently used
+    entries are evicted first. Only POSIX environments are relocatable, see `restore`.
+    """
+
+    def __init__(self, root: Path | None = None, max_bytes: int | None = None) -> None:
+        self.root = root or user_cache_dir() / "envs"
+        self.max_bytes = _max_bytes() if max_bytes is None else max_bytes
+
+    def key(self, pyproject: Path, python: str) -> str:
+        raw = "\0".join([CACHE_FORMAT, dependency_digest(pyproject), interpreter_identity(python)])
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def _meta(self, entry: Path) -> dict[str, Any]:
+        return json.loads((entry / "meta.json").read_text())  # type: ignore[no-any-return]
+
+    def _write_meta(self, entry: Path, meta: dict[str, Any]) -> None:
+        tmp = entry / f"meta.json.{secrets.token_hex(4)}"
+        tmp.write_text(json.dumps(meta))
+        os.replace(tmp, entry / "meta.json")
+
+    def entries(self) -> list[CacheEntry]:
+        """Every complete entry, least recently used first."""
+        entries = []
+        for path in self.root.glob("[!.]*"):
+            try:
+                meta = self._meta(path)
+                entries.append(CacheEntry(path.name, path, meta["size"], meta["last_used"]))
+            except (OSError, ValueError, KeyError, TypeError):
+                continue
+        return sorted(entries, key=lambda entry: entry.last_used)
+
+    def restore(self, key: str, venv: Path, lock_file: Path, strategy: str = "reflink") -> bool:
+        """Clone the environment of `key` into `venv` and its lock into `lock_file`.
+
+        Absolute paths of the original environment (script shebangs, `activate`,
+        `pyvenv.cfg`) are rewritten, always into new files so that hardlinked entries stay
+        intact. Returns False on a miss, or when the entry vanished while being cloned.
+        """
+        if os.name != "posix" or venv.exists():
+            return False
+        entry = self.root / key
+        try:
+            meta = self._meta(entry)
+            origin = meta["origin"]
+            _clone_tree(entry / "venv", venv, strategy)
+            copy_file(entry / "poetry.lock", lock_file)
+        except (OSError, ValueError, KeyError, TypeError):
+            shutil.rmtree(venv, ignore_errors=True)
+            return False
+        _relocate(venv, origin, str(venv.resolve()))
+        meta["last_used"] = time.time()
+        try:
+            self._write_meta(entry, meta)
+        except OSError:
+            pass
+        return True
+
+    def store(self, key: str, venv: Path, lock_file: Path) -> bool:
+        """Add `venv`, installed from `lock_file`, as the entry of `key`, then evict.
+
+        Returns False when another process stored the same entry first.
+        """
+        self.root.mkdir(parents=True, exist_ok=True)
+        staging = self.root / f".{key}.{secrets.token_hex(4)}.tmp"
+        try:
+            _clone_tree(venv, staging / "venv", "reflink")
+            copy_file(lock_file, staging / "poetry.lock")
+            size = sum(
+                (Path(root) / name).lstat().st_size
+                for root, _, files in os.walk(staging)
+                for name in files
+            )
+            now = time.time()
+            meta = {"origin": str(venv.resolve()), "size": size, "created": now, "last_used": now}
+            self._write_meta(staging, meta)
+            staging.rename(self.root / key)
+        except OSError as e:
+            shutil.rmtree(staging, ignore_errors=True)
+            if isinstance(e, FileExistsError) or e.errno in (errno.EEXIST, errno.ENOTEMPTY):
+                return False
+            raise
+        self.evict()
+        return True
+
+    def evict(self, max_bytes: int | None = None) -> list[str]:
+        """Remove the least recently used entries until the cache fits, return their keys."""
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        entries = self.entries()
+        total = sum(entry.size for entry in entries)
+        evicted = []
+        for entry in entries:
+            if total <= max_bytes:
+                break
+            shutil.rmtree(entry.path, ignore_errors=True)
+            total -= entry.size
+            evicted.append(entry.key)
+        return evicted
+
+
+def _clone_tree(src: Path, dst: Path, strategy: str) -> None:
+    """Copy a directory tree with `copy_file`, keeping symlinks as symlinks."""
+    dst.mkdir(parents=True)
+    for root, dirs, files in os.walk(src):
+        target = dst / Path(root).relative_to(src)
+        for name in dirs + files:
+            source = Path(root) / name
+            if source.is_symlink():
+                os.symlink(os.readlink(source), target / name)
+            elif name in dirs:
+                (target / name).mkdir()
+            else:
+                copy_file(source, target / name, strategy)
+        # Symlinked directories were recreated above, don't copy their content again
+        dirs[:] = [name for name in dirs if not (Path(root) / name).is_symlink()]
+
+
+def _relocate(venv: Path, origin: str, destination: str) -> None:
+    old, new = origin.encode(), destination.encode()
+    candidates = [venv / "pyvenv.cfg", *(venv / "bin").iterdir()]
+    for path in candidates:
+        if path.is_symlink() or not path.is_file() or path.stat().st_size > 1024 * 1024:
+            continue
+        data = path.read_bytes()
+        if old not in data or b"\0" in data:
+            continue
+        mode = path.stat().st_mode
+        path.unlink()
+        path.write_bytes(data.replace(old, new))
+        path.chmod(mode)
+
+
+def _run(command: list[str], cwd: Path, echo: Echo, timeout: float | None = None) -> int:
+    result = run_command(command, cwd=cwd, timeout=timeout, echo=echo)
+    if result.timed_out:
+        echo(f"`{' '.join(command)}` timed out after {timeout}s, killed")
+        return 124
+    return result.returncode
+
+
+def install_environment(
+    project_path: Path, echo: Echo, cache: EnvCache | None = None, timeout: float | None = None
+) -> int:
+    """`poetry install` for a new project, served from `cache` when possible.
+
+    On a hit the cached environment and lock are cloned into `.venv` and only the project
+    itself is installed, without resolving or downloading anything. On a miss the
+    dependencies are installed into a new `.venv` and added to the cache first. Each
+    command is killed after `timeout` seconds, which fails with exit code 124.
+    """
+    cache = cache or EnvCache()
+    pyproject = project_path / "pyproject.toml"
+    python = find_python(pyproject) if os.name == "posix" else None
+    if python is None:
+        echo("no cacheable interpreter, running a plain `poetry install`")
+        return _run(["poetry", "install"], project_path, echo, timeout)
+
+    key = cache.key(pyproject, python)
+    venv, lock_file = project_path / ".venv", project_path / "poetry.lock"
+    if cache.restore(key, venv, lock_file):
+        echo(f"environment {key[:12]} restored from the cache")
+    else:
+        echo(f"environment {key[:12]} not cached, installing it")
+        returncode = _run([python, "-m", "venv", str(venv)], project_path, echo, timeout)
+        if returncode == 0:
+            # Poetry picks up an existing in-project `.venv`
+            returncode = _run(["poetry", "install", "--no-root"], project_path, echo, timeout)
+        if returncode != 0:
+            return returncode
+        try:
+            cache.store(key, venv, lock_file)
+        except OSError as e:
+            echo(f"could not cache the environment: {e}")
+
+    package_mode = _load_pyproject(pyproject)["tool"]["poetry"].get("package-mode", True)
+    if not package_mode:
+        return 0
+    return _run(["poetry", "install", "--only-root"], project_path, echo, timeout)
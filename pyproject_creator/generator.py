@@ -0,0 +1,319 @@
+from __future__ import annotations
+
+import os
+import re
+import stat
+import errno
+import shutil
+import secrets
+import functools
+from typing import TYPE_CHECKING, Any, NamedTuple
+from pathlib import Path
+from dataclasses import field, dataclass
+from collections.abc import Callable, Iterator
+
+from pyproject_creator.utils import BASE_PATH, user_cache_dir
+from pyproject_creator.copying import copy_file
+from pyproject_creator.timings import Timings
+
+
+if TYPE_CHECKING:
+    import jinja2
+
+    from pyproject_creator.lockcache import LockCache, LockStatus
+
+
+TEMPLATE_PATH: Path = BASE_PATH / "template"
+TEMPLATE_SUFFIX = ".j2"
+PROJECT_NAME_PATTERN = re.compile(r"^[a-zA-Z0-9][a-zA-Z0-9_-]*$")
+
+
+class InvalidProjectNameError(ValueError):
+    """The project name can't be used as a directory and package name."""
+
+
+class ProjectExistsError(FileExistsError):
+    """The project directory already exists."""
+
+
+@dataclass(frozen=True)
+class ProjectSpec:
+    """Everything needed to generate one project, mirroring the `pypct` options."""
+
+    name: str
+    description: str = ""
+    author: str = "Your Name <your.email@example.com>"
+    python_version: str = "3.11"
+    project_license: str = ""
+    pypi_package: bool = False
+    logs: bool = True
+    tests: bool = True
+    github_action: bool = False
+
+    @property
+    def src_name(self) -> str:
+        """Importable package name of the project."""
+        return self.name.replace("-", "_")
+
+
+class ProjectEntry(NamedTuple):
+    """One file of a generated project."""
+
+    path: str
+    """Relative to the project root, with `/` separators."""
+    data: bytes
+    mode: int
+    """Permission bits, e.g. `0o644`."""
+
+
+@dataclass(frozen=True)
+class TemplateRule:
+    """Where a template file or directory goes, and for which projects."""
+
+    source: str
+    """Path relative to `TEMPLATE_PATH`, a file or a directory."""
+    target: str
+    """Path relative to the project root, `{src_name}` is replaced by the package name."""
+    when: Callable[[ProjectSpec], bool] = field(default=lambda spec: True)
+
+
+TEMPLATE_RULES: tuple[TemplateRule, ...] = (
+    TemplateRule("pyproject.toml.j2", "pyproject.toml.j2"),
+    TemplateRule("README.md.j2", "README.md.j2"),
+    TemplateRule(".gitignore", ".gitignore"),
+    TemplateRule(".pre-commit-config.yaml", ".pre-commit-config.yaml"),
+    TemplateRule(".cz.toml", ".cz.toml"),
+    # Called by the publish workflow
+    TemplateRule(
+        "scripts/publishpypi.py",
+        "scripts/publishpypi.py",
+        lambda spec: spec.github_action and spec.pypi_package,
+    ),
+    TemplateRule("scripts", "scripts"),
+    TemplateRule("logs", "{src_name}/logs", lambda spec: spec.logs),
+    TemplateRule("tests", "tests", lambda spec: spec.tests),
+    TemplateRule(
+        "github_action/workflows/pythonpublish.yml.j2",
+        ".github/pythonpublish.yml.j2",
+        lambda spec: spec.github_action and spec.pypi_package,
+    ),
+    TemplateRule("github_action/workflows", ".github", lambda spec: spec.github_action),
+)
+"""Checked in order, the first rule matching a template file decides; unmatched files are
+never part of a project."""
+
+
+def _bytecode_cache() -> jinja2.BytecodeCache | None:
+    """Compiled templates persist across runs; without a writable cache dir they don't."""
+    import jinja2
+
+    directory = user_cache_dir() / "jinja2"
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+    except OSError:
+        return None
+    return jinja2.FileSystemBytecodeCache(str(directory))
+
+
+@functools.cache
+def get_environment() -> jinja2.Environment:
+    """The shared environment every template is loaded from.
+
+    Loaded templates are kept in memory and their compiled code in the bytecode cache, so
+    each template is parsed at most once per process and usually not at all.
+    """
+    import jinja2
+
+    return jinja2.Environment(
+        loader=jinja2.FileSystemLoader(TEMPLATE_PATH),
+        bytecode_cache=_bytecode_cache(),
+        auto_reload=False,
+        keep_trailing_newline=True,
+    )
+
+
+@dataclass(frozen=True)
+class GenerationResult:
+    """What `generate_project` created."""
+
+    spec: ProjectSpec
+    project_path: Path
+    files: tuple[Path, ...]
+    """Created files, relative to `project_path`."""
+    lock: LockStatus | None = None
+    """How `poetry.lock` was served by the lock cache, None without one."""
+
+
+def validate_project_name(value: str) -> str:
+    """Validate the project name to ensure it meets the required criteria."""
+    if not PROJECT_NAME_PATTERN.match(value):
+        raise InvalidProjectNameError(
+            "Project name should start with a letter or number and contain only letters, numbers, "
+            "underscores, and hyphens, but not start with underscores or hyphens."
+        )
+    if value.endswith("-") or value.endswith("_"):
+        raise InvalidProjectNameError("Project name should not end with a hyphen or underscore.")
+    return value
+
+
+def generate_project(
+    spec: ProjectSpec,
+    dest: Path | str = ".",
+    *,
+    timings: Timings | None = None,
+    copy_strategy: str = "copy",
+    lock_cache: LockCache | None = None,
+) -> GenerationResult:
+    """Create the project described by `spec` in the `dest` directory.
+
+    The project is written through absolute paths only, without changing the working
+    directory or exiting the process, so it is safe to call from multiple threads at once.
+
+    The tree is built in a hidden sibling directory and published with a single `rename`,
+    so `dest` never contains a half-written project: on failure the staging directory is
+    removed and a retry starts from scratch. Concurrent calls for the same directory are
+    resolved by that rename, exactly one of them succeeds.
+
+    Pass `timings` to record the `validate`, `mkdir`, `copy`, `render` and `publish` stages.
+    `copy_strategy` is how the files that aren't rendered are copied, see `COPY_STRATEGIES`.
+    With `lock_cache`, the cached `poetry.lock` of the rendered dependencies is added in the
+    `lock` stage, see `LockCache.apply`.
+
+    Raises:
+        InvalidProjectNameError: `spec.name` is not a valid project name.
+        ProjectExistsError: the project directory already exists.
+    """
+    timings = timings or Timings()
+    with timings.stage("validate"):
+        validate_project_name(spec.name)
+    project_path = Path(dest).resolve() / spec.name
+    if project_path.exists():
+        raise ProjectExistsError(f"{spec.name} directory already exists.")
+
+    # Same directory as the project, hence the same filesystem, so the rename is atomic
+    staging_path = project_path.with_name(f".{spec.name}.{secrets.token_hex(4)}.tmp")
+    with timings.stage("mkdir"):
+        staging_path.mkdir()
+    try:
+        files = write_project(spec, staging_path, timings=timings, copy_strategy=copy_strategy)
+        lock = None
+        if lock_cache is not None:
+            with timings.stage("lock"):
+                lock = lock_cache.apply(staging_path)
+            if lock != "miss":
+                files.append(Path("poetry.lock"))
+        with timings.stage("publish"):
+            _publish(staging_path, project_path)
+    except BaseException:
+        shutil.rmtree(staging_path, ignore_errors=True)
+        raise
+    return GenerationResult(spec, project_path, tuple(sorted(files)), lock)
+
+
+def _publish(staging_path: Path, project_path: Path) -> None:
+    try:
+        staging_path.rename(project_path)
+    except OSError as e:
+        # POSIX reports a non-empty target with ENOTEMPTY or EEXIST, Windows any target
+        if isinstance(e, FileExistsError) or e.errno in (errno.EEXIST, errno.ENOTEMPTY):
+            raise ProjectExistsError(f"{project_path.name} directory already exists.") from e
+        raise
+
+
+def template_context(spec: ProjectSpec) -> dict[str, Any]:
+    """Variables available to every `.j2` template."""
+    return {
+        "project_name": spec.name,
+        "project_description": spec.description,
+        "author": spec.author,
+        "is_pypi_package": "true" if spec.pypi_package else "false",
+        "python_version": spec.python_version.strip("^"),
+        "project_license": spec.project_license,
+        "need_tests": spec.tests,
+        "need_logs": spec.logs,
+        "project_src_name": spec.src_name,
+    }
+
+
+def iter_template_files(spec: ProjectSpec) -> Iterator[tuple[str, str]]:
+    """Walk the template tree once and yield `(source, target)` for every file `spec` needs.
+
+    Both paths are relative and use `/`; `source` is relative to `TEMPLATE_PATH`, `target`
+    to the project root and already has its `.j2` suffix removed.
+    """
+    for root, dirs, files in os.walk(TEMPLATE_PATH):
+        dirs[:] = sorted(d for d in dirs if d != "__pycache__")
+        base = Path(root).relative_to(TEMPLATE_PATH).as_posix()
+        for name in sorted(files):
+            source = name if base == "." else f"{base}/{name}"
+            for rule in TEMPLATE_RULES:
+                if source == rule.source or source.startswith(f"{rule.source}/"):
+                    break
+            else:
+                continue
+            if not rule.when(spec):
+                continue
+            target = rule.target.format(src_name=spec.src_name) + source[len(rule.source) :]
+            yield source, target.removesuffix(TEMPLATE_SUFFIX)
+
+
+def write_project(
+    spec: ProjectSpec,
+    project_path: Path,
+    *,
+    timings: Timings | None = None,
+    copy_strategy: str = "copy",
+) -> list[Path]:
+    """Populate the empty `project_path` directory from the templates.
+
+    Files ending with `.j2` are rendered and streamed into their target, the others are
+    copied as they are with `copy_strategy`. Every path is absolute, so this never depends
+    on the process working directory. Returns the created files, relative to `project_path`.
+    """
+    src_path: Path = project_path / spec.src_name
+    src_path.mkdir()
+    (src_path / "__init__.py").touch()
+    created = [Path(spec.src_name) / "__init__.py"]
+
+    timings = timings or Timings()
+    environment = get_environment()
+    context = template_context(spec)
+    for source, target in iter_template_files(spec):
+        target_path = project_path / target
+        target_path.parent.mkdir(parents=True, exist_ok=True)
+        if source.endswith(TEMPLATE_SUFFIX):
+            with timings.stage("render"):
+                template = environment.get_template(source)
+                with open(target_path, "w", encoding="utf-8") as file:
+                    file.writelines(template.generate(context))
+        else:
+            with timings.stage("copy"):
+                copy_file(TEMPLATE_PATH / source, target_path, copy_strategy)
+        created.append(Path(target))
+    return created
+
+
+def iter_project_entries(
+    spec: ProjectSpec, *, timings: Timings | None = None
+) -> Iterator[ProjectEntry]:
+    """Lazily yield the files of the project `spec`, without writing anything to disk.
+
+    Each file is rendered or read only when it is requested, so only one file is held
+    in memory at a time.
+    """
+    timings = timings or Timings()
+    yield ProjectEntry(f"{spec.src_name}/__init__.py", b"", 0o644)
+
+    environment = get_environment()
+    context = template_context(spec)
+    for source, target in iter_template_files(spec):
+        source_path = TEMPLATE_PATH / source
+        mode = stat.S_IMODE(source_path.stat().st_mode)
+        if source.endswith(TEMPLATE_SUFFIX):
+            with timings.stage("render"):
+                template = environment.get_template(source)
+                data = "".join(template.generate(context)).encode("utf-8")
+        else:
+            with timings.stage("copy"):
+                data = source_path.read_bytes()
+        yield ProjectEntry(target, data, mode)
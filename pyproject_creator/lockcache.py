@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import os
+import sys
+import json
+import time
+import shutil
+import secrets
+import tempfile
+import subprocess
+from typing import Any, Literal
+from pathlib import Path
+from dataclasses import dataclass
+from collections.abc import Callable
+
+from pyproject_creator.utils import user_cache_dir
+from pyproject_creator.copying import copy_file
+from pyproject_creator.process import run_command
+from pyproject_creator.envcache import dependency_digest
+
+
+Echo = Callable[[str], None]
+LockStatus = Literal["hit", "stale", "miss"]
+
+LOCK_CACHE_TTL: float = 7 * 24 * 60 * 60
+"""Seconds before a resolved lock is refreshed, overridable with `PYPCT_LOCK_CACHE_TTL`."""
+RESOLVE_TIMEOUT: float = 10 * 60
+"""Seconds a single `poetry lock` may take before it is killed."""
+REFRESH_TIMEOUT: float = 60 * 60
+"""A refresh holding the cache longer than this is assumed to have died."""
+
+
+def _ttl() -> float:
+    try:
+        return float(os.environ["PYPCT_LOCK_CACHE_TTL"])
+    except (KeyError, ValueError):
+        return LOCK_CACHE_TTL
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    tmp = path.with_name(f"{path.name}.{secrets.token_hex(4)}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+@dataclass(frozen=True)
+class LockEntry:
+    key: str
+    path: Path
+    pyproject: str
+    """The `pyproject.toml` the lock is resolved from."""
+    resolved_at: float | None
+    """None until the first resolution finished."""
+
+    @property
+    def lock_file(self) -> Path:
+        return self.path / "poetry.lock"
+
+    def is_stale(self, ttl: float | None = None) -> bool:
+        ttl = _ttl() if ttl is None else ttl
+        return self.resolved_at is None or time.time() - self.resolved_at > ttl
+
+
+class LockCache:
+    """Resolved `poetry.lock` files, keyed by the dependency spec of `pyproject.toml`.
+
+    The templates only render a handful of dependency variants, and Poetry's lock is
+    valid for any project with the same dependency tables, whatever its name. Entries
+    are never resolved while a project is created: a miss registers the variant and
+    `refresh` resolves it later, so the next project with the same spec gets its lock.
+    """
+
+    def __init__(self, root: Path | None = None) -> None:
+        self.root = root or user_cache_dir() / "locks"
+
+    def get(self, key: str) -> LockEntry | None:
+        path = self.root / key
+        try:
+            meta = json.loads((path / "meta.json").read_text())
+            return LockEntry(key, path, meta["pyproject"], meta["resolved_at"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def entries(self) -> list[LockEntry]:
+        entries = (self.get(path.name) for path in sorted(self.root.glob("[!.]*")))
+        return [entry for entry in entries if entry is not None]
+
+    def register(self, key: str, pyproject: str) -> LockEntry:
+        """The entry of `key`, added without a lock when it is new."""
+        entry = self.get(key)
+        if entry is not None:
+            return entry
+        path = self.root / key
+        path.mkdir(parents=True, exist_ok=True)
+        meta = {"pyproject": pyproject, "resolved_at": None}
+        _write_atomic(path / "meta.json", json.dumps(meta).encode())
+        return LockEntry(key, path, pyproject, None)
+
+    def apply(self, project_path: Path) -> LockStatus:
+        """Copy the cached lock of the project's dependency spec next to its `pyproject.toml`.
+
+        Returns "hit", "stale" when the lock was copied but is due for a refresh, or
+        "miss" when there is no lock yet and the spec was registered for the next refresh.
+        The cache is optional: when it can't be read or written, that is a miss as well.
+        """
+        pyproject = project_path / "pyproject.toml"
+        key, text = dependency_digest(pyproject), pyproject.read_text("utf-8")
+        lock_file = project_path / "poetry.lock"
+        try:
+            entry = self.register(key, text)
+            copy_file(entry.lock_file, lock_file)
+        except OSError:
+            lock_file.unlink(missing_ok=True)
+            return "miss"
+        return "stale" if entry.is_stale() else "hit"
+
+    def resolve(self, key: str, echo: Echo = print) -> int:
+        """Run `poetry lock` for the entry of `key` and store the result, return its exit code."""
+        entry = self.get(key)
+        if entry is None:
+            raise KeyError(key)
+        with tempfile.TemporaryDirectory(prefix="pypct-lock-") as tmp:
+            project_path = Path(tmp)
+            (project_path / "pyproject.toml").write_text(entry.pyproject, "utf-8")
+            (project_path / "README.md").touch()
+            result = run_command(
+                ["poetry", "lock", "--no-interaction"],
+                cwd=project_path,
+                timeout=RESOLVE_TIMEOUT,
+                tail_lines=20,
+            )
+            if not result.ok:
+                for line in result.tail:
+                    echo(line)
+                if result.timed_out:
+                    echo(f"`poetry lock` timed out after {RESOLVE_TIMEOUT:.0f}s")
+                    return 124
+                return result.returncode
+            _write_atomic(entry.lock_file, (project_path / "poetry.lock").read_bytes())
+        meta = {"pyproject": entry.pyproject, "resolved_at": time.time()}
+        _write_atomic(entry.path / "meta.json", json.dumps(meta).encode())
+        return 0
+
+    def refresh(
+        self, everything: bool = False, echo: Echo = print
+    ) -> list[tuple[str, int]] | None:
+        """Resolve every stale or unresolved entry, or all of them with `everything`.
+
+        Returns the exit code of each resolution, or None when another refresh is running.
+        """
+        marker = self.root / ".refresh"
+        if not self._acquire(marker):
+            return None
+        try:
+            return [
+                (entry.key, self.resolve(entry.key, echo))
+                for entry in self.entries()
+                if everything or entry.is_stale()
+            ]
+        finally:
+            marker.unlink(missing_ok=True)
+
+    def _acquire(self, marker: Path) -> bool:
+        self.root.mkdir(parents=True, exist_ok=True)
+        for _ in range(2):
+            try:
+                os.close(os.open(marker, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                return True
+            except FileExistsError:
+                try:
+                    if time.time() - marker.stat().st_mtime < REFRESH_TIMEOUT:
+                        return False
+                    marker.unlink()
+                except FileNotFoundError:
+                    pass
+        return False
+
+    def clear(self) -> int:
+        """Remove every entry, return how many there were."""
+        entries = self.entries()
+        for entry in entries:
+            shutil.rmtree(entry.path, ignore_errors=True)
+        return len(entries)
+
+
+def start_background_refresh() -> subprocess.Popen[bytes]:
+    """Run `pypct cache refresh` in a detached process, which outlives this one."""
+    options: dict[str, Any] = {}
+    if sys.platform == "win32":
+        flags = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+        options["creationflags"] = flags
+    else:
+        options["start_new_session"] = True
+    return subprocess.Popen(
+        [sys.executable, "-m", "pyproject_creator.cli", "cache", "refresh"],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        **options,
+    )
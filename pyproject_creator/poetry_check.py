@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import os
+import time
+import threading
+
+from pyproject_creator.utils import user_cache_dir
+
+
+POETRY_CHECK_TTL: float = 24 * 60 * 60
+"""Seconds a successful check stays valid, overridable with `PYPCT_POETRY_CHECK_TTL`."""
+
+
+def _ttl() -> float:
+    try:
+        return float(os.environ["PYPCT_POETRY_CHECK_TTL"])
+    except (KeyError, ValueError):
+        return POETRY_CHECK_TTL
+
+
+def _cache_key() -> str | None:
+    """Identify the `poetry` that would run: its resolved path, its mtime and `PATH`."""
+    import shutil
+    import hashlib
+
+    executable = shutil.which("poetry")
+    if executable is None:
+        return None
+    try:
+        resolved = os.path.realpath(executable)
+        mtime = os.stat(resolved).st_mtime_ns
+    except OSError:
+        return None
+    raw = "\0".join([resolved, str(mtime), os.environ.get("PATH", "")])
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def _probe() -> bool:
+    import subprocess
+
+    try:
+        subprocess.run(["poetry", "--version"], check=True, capture_output=True)
+    except (subprocess.CalledProcessError, OSError):
+        return False
+    return True
+
+
+def is_poetry_installed() -> bool:
+    """Whether `poetry --version` succeeds, served from the user cache when possible.
+
+    Only successes are cached: a missing Poetry is re-probed on every call, which is
+    cheap and lets a fresh installation be picked up at once.
+    """
+    import json
+
+    ttl = _ttl()
+    key = _cache_key() if ttl > 0 else None
+    cache_file = user_cache_dir() / "poetry-check.json"
+    if key is not None:
+        try:
+            cached = json.loads(cache_file.read_text())
+            if cached["key"] == key and time.time() - cached["checked_at"] < ttl:
+                return True
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+    installed = _probe()
+    if installed and key is not None:
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+            tmp_file.write_text(json.dumps({"key": key, "checked_at": time.time()}))
+            os.replace(tmp_file, cache_file)
+        except OSError:
+            pass
+    return installed
+
+
+class PoetryCheck(threading.Thread):
+    """`is_poetry_installed` running in a background thread."""
+
+    def __init__(self) -> None:
+        super().__init__(name="poetry-check", daemon=True)
+        self._installed = False
+        self._error: BaseException | None = None
+
+    def run(self) -> None:
+        try:
+            self._installed = is_poetry_installed()
+        except BaseException as e:
+            self._error = e
+
+    def result(self, timeout: float | None = None) -> bool:
+        """Wait for the check and return its result, re-raising its error."""
+        self.join(timeout)
+        if self.is_alive():
+            raise TimeoutError("The Poetry check did not finish in time")
+        if self._error is not None:
+            raise self._error
+        return self._installed
+
+
+def start_poetry_check() -> PoetryCheck:
+    """Start `is_poetry_installed` in the background, overlapping the generation.
+
+    All the expensive imports of the check happen in that thread as well.
+    """
+    check = PoetryCheck()
+    check.start()
+    return check
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import os
+import sys
+import time
+import signal
+import threading
+import subprocess
+from typing import IO, Any
+from pathlib import Path
+from collections import deque
+from dataclasses import dataclass
+from collections.abc import Callable, Sequence
+
+
+Echo = Callable[[str], None]
+
+TAIL_LINES = 50
+"""Output lines kept in memory for error reports, the others are only streamed."""
+KILL_GRACE: float = 5.0
+"""Seconds a timed out command gets to exit after SIGTERM, before SIGKILL."""
+
+
+@dataclass(frozen=True)
+class CommandResult:
+    command: str | tuple[str, ...]
+    returncode: int
+    """127 when the command could not be started, negative when killed by a signal."""
+    duration: float
+    tail: tuple[str, ...]
+    """The last output lines, stdout and stderr interleaved as they arrived."""
+    timed_out: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.returncode == 0 and not self.timed_out
+
+    @property
+    def output(self) -> str:
+        return "\n".join(self.tail)
+
+
+def _read(stream: IO[str], emit: Echo) -> None:
+    with stream:
+        for line in stream:
+            emit(line.rstrip())
+
+
+def _kill_group(process: subprocess.Popen[str]) -> None:
+    """Terminate the command and every process it started, then kill what is left."""
+    if sys.platform == "win32":
+        subprocess.run(
+            ["taskkill", "/F", "/T", "/PID", str(process.pid)],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        process.kill()
+        return
+    for sig in (signal.SIGTERM, signal.SIGKILL):
+        try:
+            os.killpg(process.pid, sig)
+        except ProcessLookupError:
+            return
+        if sig == signal.SIGTERM:
+            try:
+                process.wait(KILL_GRACE)
+            except subprocess.TimeoutExpired:
+                pass
+
+
+def run_command(
+    command: str | Sequence[str],
+    *,
+    cwd: Path | str | None = None,
+    timeout: float | None = None,
+    echo: Echo | None = None,
+    tail_lines: int = TAIL_LINES,
+) -> CommandResult:
+    """Run `command`, streaming every output line to `echo` as it comes.
+
+    A string is run by the shell, a sequence directly. stdout and stderr are read
+    concurrently, so neither pipe can fill up and block the command, and only the last
+    `tail_lines` lines are kept in memory. Past `timeout` seconds the command and every
+    process it started are terminated, then killed. Failures are reported in the result,
+    never raised.
+    """
+    display: str | tuple[str, ...] = command if isinstance(command, str) else tuple(command)
+    tail: deque[str] = deque(maxlen=tail_lines)
+    lock = threading.Lock()
+
+    def emit(line: str) -> None:
+        with lock:
+            tail.append(line)
+            if echo is not None:
+                echo(line)
+
+    options: dict[str, Any] = {}
+    if sys.platform == "win32":
+        options["creationflags"] = subprocess.CREATE_NEW_PROCESS_GROUP
+    else:
+        # Its own process group, so that a timeout can kill everything it started
+        options["start_new_session"] = True
+    start = time.perf_counter()
+    try:
+        process = subprocess.Popen(
+            command,
+            shell=isinstance(command, str),
+            cwd=cwd,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            errors="replace",
+            **options,
+        )
+    except OSError as e:
+        emit(str(e))
+        return CommandResult(display, 127, time.perf_counter() - start, tuple(tail))
+
+    readers = [
+        threading.Thread(target=_read, args=(stream, emit), daemon=True)
+        for stream in (process.stdout, process.stderr)
+    ]
+    for reader in readers:
+        reader.start()
+    deadline = None if timeout is None else start + timeout
+    timed_out = False
+    try:
+        process.wait(None if deadline is None else max(deadline - time.perf_counter(), 0))
+        # Processes it left behind may still write to the pipes
+        for reader in readers:
+            reader.join(None if deadline is None else max(deadline - time.perf_counter(), 0))
+        timed_out = any(reader.is_alive() for reader in readers)
+    except subprocess.TimeoutExpired:
+        timed_out = True
+    if timed_out:
+        _kill_group(process)
+        for reader in readers:
+            reader.join(KILL_GRACE)
+    returncode = process.wait()
+    with lock:
+        return CommandResult(
+            display, returncode, time.perf_counter() - start, tuple(tail), timed_out
+        )
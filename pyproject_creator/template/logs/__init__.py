@@ -1,6 +1,79 @@
-from __future__ import annotations
-
-from ._default import logger
-
-
-__all__ = ["logger"]
+"""
+`logger` 首次使用时才导入 loguru 并配置日志, 导入本包本身几乎没有开销;
+需要自定义配置时, 在使用前调用 `setup_logging(LogConfig(...))`
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, cast
+from collections.abc import Callable
+
+
+if TYPE_CHECKING:
+    from loguru import Logger
+
+    from ._json import add_json_sink
+    from ._async import BatchingSink
+    from ._config import LogConfig, load_config
+    from ._default import set_level, setup_logging
+    from ._sampling import RateLimiter
+    from ._multiprocess import LogListener, init_worker_logging
+
+
+__all__ = [
+    "BatchingSink",
+    "LogConfig",
+    "LogListener",
+    "RateLimiter",
+    "add_json_sink",
+    "init_worker_logging",
+    "load_config",
+    "logger",
+    "set_level",
+    "setup_logging",
+]
+
+_LAZY_IMPORTS = {
+    "BatchingSink": "_async",
+    "LogConfig": "_config",
+    "LogListener": "_multiprocess",
+    "RateLimiter": "_sampling",
+    "add_json_sink": "_json",
+    "init_worker_logging": "_multiprocess",
+    "load_config": "_config",
+    "set_level": "_default",
+    "setup_logging": "_default",
+}
+
+
+_get_logger: Callable[[], Logger] | None = None
+
+
+class _LazyLogger:
+    """代理 loguru 的 logger, 首次访问属性时完成配置"""
+
+    __slots__ = ()
+
+    def __getattr__(self, name: str) -> Any:
+        global _get_logger
+        if _get_logger is None:
+            from ._default import get_logger
+
+            _get_logger = get_logger
+        return getattr(_get_logger(), name)
+
+    def __repr__(self) -> str:
+        return f"<lazy logger of {__name__!r}>"
+
+
+logger = cast("Logger", _LazyLogger())
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _LAZY_IMPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+
+    value = getattr(importlib.import_module(f".{_LAZY_IMPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,132 @@
+"""
+异步批量写入的日志输出:
+
+- 日志先进入有界内存队列, 由后台线程按批量大小或时间间隔合并写入
+- 队列满时按 `overflow` 策略处理: `block` 等待, `drop-oldest` 丢弃最旧, `drop-new` 丢弃最新
+- 进程退出时自动写完队列中剩余的日志
+"""
+
+from __future__ import annotations
+
+import sys
+import atexit
+import threading
+from typing import TextIO
+from collections import deque
+
+
+OVERFLOW_POLICIES = ("block", "drop-oldest", "drop-new")
+
+
+class BatchingSink:
+    """loguru 的非阻塞输出, `logger.add(BatchingSink(sys.stdout), ...)`"""
+
+    def __init__(
+        self,
+        stream: TextIO | None = None,
+        *,
+        max_queue: int = 10_000,
+        batch_size: int = 256,
+        flush_interval: float = 0.2,
+        overflow: str = "block",
+    ) -> None:
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"overflow should be one of {OVERFLOW_POLICIES}, got {overflow!r}")
+        self.stream: TextIO = stream or sys.stdout
+        self.max_queue = max(max_queue, 1)
+        self.batch_size = max(batch_size, 1)
+        self.flush_interval = flush_interval
+        self.overflow = overflow
+        self.dropped = 0
+        """因队列已满被丢弃的日志数"""
+
+        self._queue: deque[str] = deque()
+        self._in_flight = 0
+        self._closed = False
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+        self._drained = threading.Condition(self._lock)
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def isatty(self) -> bool:
+        # loguru 据此决定是否输出颜色
+        isatty = getattr(self.stream, "isatty", None)
+        return bool(isatty and isatty())
+
+    def write(self, message: str) -> None:
+        with self._lock:
+            if self._closed:
+                self._write_batch([message])
+                return
+            if len(self._queue) >= self.max_queue:
+                if self.overflow == "drop-new":
+                    self.dropped += 1
+                    return
+                if self.overflow == "drop-oldest":
+                    self._queue.popleft()
+                    self.dropped += 1
+                else:
+                    while len(self._queue) >= self.max_queue and not self._closed:
+                        self._not_full.wait()
+                    if self._closed:
+                        self._write_batch([message])
+                        return
+            self._queue.append(message)
+            if len(self._queue) == 1 or len(self._queue) >= self.batch_size:
+                self._not_empty.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                while not self._queue and not self._closed:
+                    self._not_empty.wait()
+                if len(self._queue) < self.batch_size and not self._closed:
+                    # 等待凑满一批, 最多等 flush_interval 秒
+                    self._not_empty.wait(self.flush_interval)
+                batch = list(self._queue)
+                self._queue.clear()
+                self._in_flight = len(batch)
+                closed = self._closed
+                self._not_full.notify_all()
+            if batch:
+                self._write_batch(batch)
+            with self._lock:
+                self._in_flight = 0
+                self._drained.notify_all()
+            if closed and not batch:
+                return
+
+    def _write_batch(self, batch: list[str]) -> None:
+        """写出一批日志, 子类可重写以写到别处"""
+        try:
+            self.stream.write("".join(batch))
+            flush = getattr(self.stream, "flush", None)
+            if flush is not None:
+                flush()
+        except Exception as e:  # 写入失败不能让后台线程退出
+            if sys.__stderr__ is not None:
+                sys.__stderr__.write(f"Failed to write {len(batch)} log records: {e!r}\n")
+
+    def wait_flushed(self, timeout: float | None = None) -> bool:
+        """等待队列中的日志全部写出, 超时返回 False"""
+        with self._lock:
+            self._not_empty.notify()
+            return self._drained.wait_for(
+                lambda: not self._queue and not self._in_flight, timeout=timeout
+            )
+
+    def stop(self, timeout: float | None = 5) -> None:
+        """写完剩余日志并停止后台线程, 之后的日志直接同步写入; 可重复调用"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._not_empty.notify_all()
+            self._not_full.notify_all()
+        self._thread.join(timeout)
+        atexit.unregister(self.stop)
+        if self.dropped:
+            self.stream.write(f"{self.dropped} log records dropped, the log queue was full\n")
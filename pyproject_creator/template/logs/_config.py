@@ -0,0 +1,108 @@
+"""
+日志配置, 依次读取:
+
+1. 默认值, 见 `LogConfig`
+2. 项目 `pyproject.toml` 中的 `[tool.pypct.logs]`, 生成项目时已写入
+3. 环境变量 `<包名大写>_LOG_<配置名大写>`, 如 `MY_PROJECT_LOG_LEVEL=DEBUG`
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Any
+from pathlib import Path
+from dataclasses import fields, replace, dataclass
+from collections.abc import Mapping
+
+
+PACKAGE = __name__.split(".")[0]
+"""项目包名, 即 `logs` 所在的顶层包"""
+PYPROJECT_PATH = Path(__file__).resolve().parents[2] / "pyproject.toml"
+"""以源码运行时项目的 `pyproject.toml`; 安装后的包中不存在, 此时只读取环境变量"""
+PYPROJECT_TABLE = "pypct"
+"""`[tool.pypct.logs]` 以生成器命名; 用包名时, 与 black, ruff 等工具同名的包会写入其配置表"""
+
+
+@dataclass(frozen=True)
+class LogConfig:
+    """`setup_logging` 的配置, `pyproject.toml` 中的键名使用 `-` 代替 `_`"""
+
+    project_name: str = PACKAGE
+    """显示在日志中的项目名"""
+    level: str | int = "INFO"
+    sensitive_keys: tuple[str, ...] = ("Cookie",)
+    """需要脱敏的关键字, 环境变量中以逗号分隔"""
+    stdout: bool = True
+    """是否输出至 stdout"""
+    async_stdout: bool = False
+    """为 True 时由后台线程批量写入 stdout, 见 `BatchingSink`"""
+    queue_size: int = 10_000
+    overflow: str = "block"
+    """队列满时的策略: `block`, `drop-oldest` 或 `drop-new`"""
+    json_file: str | None = None
+    """设置后额外以 JSON Lines 格式写入该文件, 如 `"logs/app.jsonl"`"""
+    rotation: str = "100 MB"
+    retention: int = 10
+    sample_every: int = 1
+    """同一调用位置每 N 条日志只保留 1 条, 1 为不采样"""
+    rate_limit: float = 0.0
+    """同一调用位置每秒最多输出的日志条数, 0 为不限流"""
+    rate_burst: int = 10
+    """限流时允许的突发条数"""
+    summary_interval: float = 60.0
+    """输出被丢弃条数汇总的间隔秒数"""
+
+
+def _read_pyproject(path: Path) -> dict[str, Any]:
+    try:
+        import tomllib
+    except ModuleNotFoundError:  # Python < 3.11
+        return {}
+    try:
+        with open(path, "rb") as file:
+            data = tomllib.load(file)
+    except FileNotFoundError:
+        return {}
+    section: dict[str, Any] = data.get("tool", {}).get(PYPROJECT_TABLE, {}).get("logs", {})
+    return {key.replace("-", "_"): value for key, value in section.items()}
+
+
+def _parse_env(name: str, value: str) -> Any:
+    if name == "sensitive_keys":
+        return tuple(key.strip() for key in value.split(",") if key.strip())
+    if name in ("stdout", "async_stdout"):
+        return value.lower() in ("1", "true", "yes", "on")
+    if name in ("queue_size", "retention", "sample_every", "rate_burst") or (
+        name == "level" and value.isdigit()
+    ):
+        return int(value)
+    if name in ("rate_limit", "summary_interval"):
+        return float(value)
+    if name == "json_file":
+        return value or None
+    return value
+
+
+def load_config(
+    pyproject: Path | str | None = PYPROJECT_PATH, environ: Mapping[str, str] | None = None
+) -> LogConfig:
+    """读取配置, `pyproject` 为 None 时只读取环境变量
+
+    Raises:
+        ValueError: `pyproject.toml` 中有未知的配置
+    """
+    values = _read_pyproject(Path(pyproject)) if pyproject is not None else {}
+    names = {field.name for field in fields(LogConfig)}
+    unknown = values.keys() - names
+    if unknown:
+        raise ValueError(f"Unknown log config keys: {', '.join(sorted(unknown))}")
+    if "sensitive_keys" in values:
+        values["sensitive_keys"] = tuple(values["sensitive_keys"])
+
+    environ = os.environ if environ is None else environ
+    prefix = f"{PACKAGE.upper()}_LOG_"
+    for name in names:
+        value = environ.get(prefix + name.upper())
+        if value is not None:
+            values[name] = _parse_env(name, value)
+    return replace(LogConfig(), **values)
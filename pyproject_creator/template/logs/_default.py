@@ -2,29 +2,36 @@
 默认信息:
 
 - 格式: `[%(asctime)s %(name)s] %(levelname)s: %(message)s`
-- 等级: `INFO` ，根据 `settings.log_level` 配置改变
-- 输出: 输出至 stdout
+- 等级: `INFO` ，根据 `LogConfig.level` 配置改变
+- 输出: 输出至 stdout, `async_stdout` 时由后台线程批量写入;
+  设置 `json_file` 后同时写入轮转、压缩的 JSON Lines 文件
+
+导入时不做任何配置, 首次使用 `logger` 或调用 `setup_logging` 时才添加日志处理器
 """
 
 from __future__ import annotations
 
 import re
 import sys
+import functools
+import threading
 from re import Match
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, NamedTuple
+from dataclasses import replace
 
 import loguru
 
+from ._json import JSON_KEY, add_json_sink
+from ._async import BatchingSink
+from ._config import LogConfig, load_config
+from ._sampling import RateLimiter
+
 
 if TYPE_CHECKING:
     from loguru import Logger, Record
 
 logger: Logger = loguru.logger
-
-
-LOG_LEVEL = "INFO"
-LOG_SENSITIZE_KEYS = ["Cookie"]
-PROJECT_NAME = "<set project name>"
+"""未经配置的 loguru logger, 应使用 `logs.logger`"""
 
 
 def desensitize_value(value: str) -> str:
@@ -36,66 +43,213 @@ def desensitize_value(value: str) -> str:
         return value
 
 
-def desensitize_data(message: str, keywords: list[str]) -> str:
-    def header_replacer(match: Match[str]) -> str:
-        key = match.group(1)
-        quotes1 = match.group(2)
-        value = match.group(3)
-        if value and key:
-            return key + quotes1 + desensitize_value(value)
-        else:
-            return match.group(0)
-
-    for keyword in keywords:
-        message = re.sub(
-            rf"(['\"]?{keyword}['\"]?[=:]\s?)(['\"]?)(.*?['\"]?[^;,]+)",
-            header_replacer,
-            message,
-            flags=re.IGNORECASE,
-        )
-    return message
+_REGEX_CHARS = frozenset("\\.^$*+?{}[]|()")
 
 
-def default_filter(record: Record | dict[str, Any]) -> bool:
-    log_level = LOG_LEVEL
-    levelno = logger.level(log_level).no if isinstance(log_level, str) else log_level
-    if LOG_SENSITIZE_KEYS:
-        record["message"] = desensitize_data(record["message"], LOG_SENSITIZE_KEYS)
-    return int(record["level"].no) >= int(levelno)
+class _Desensitizer(NamedTuple):
+    pattern: re.Pattern[str]
+    """所有关键字合并成的单个正则"""
+    literals: tuple[str, ...] | None
+    """小写关键字, 用于预过滤; 有关键字本身是正则时为 None"""
 
 
-logger.remove()
-
-if LOG_LEVEL == "DEBUG":
-    diagnose = True
-    backtrace = True
-    default_format: str = (
-        "<g>{time:MM-DD HH:mm:ss}</g> "
-        "[<lvl>{level}</lvl>] "
-        "<c><u>{name}</u></c> | "
-        "<c>{function}:{line}</c> | "
-        "{message}"
+@functools.lru_cache(maxsize=32)
+def _compile_keywords(keywords: tuple[str, ...]) -> _Desensitizer:
+    """编译关键字列表, 关键字不变时直接复用缓存"""
+    alternation = "|".join(f"(?:{keyword})" for keyword in keywords)
+    pattern = re.compile(
+        rf"(['\"]?(?:{alternation})['\"]?[=:]\s?)(['\"]?)(.*?['\"]?[^;,]+)",
+        flags=re.IGNORECASE,
     )
-    """默认日志格式"""
-else:
-    diagnose = False
-    backtrace = False
-    default_format = (
+    if any(_REGEX_CHARS.intersection(keyword) for keyword in keywords):
+        return _Desensitizer(pattern, None)
+    return _Desensitizer(pattern, tuple(keyword.lower() for keyword in keywords))
+
+
+def _header_replacer(match: Match[str]) -> str:
+    key = match.group(1)
+    quotes1 = match.group(2)
+    value = match.group(3)
+    if value and key:
+        return key + quotes1 + desensitize_value(value)
+    else:
+        return match.group(0)
+
+
+def desensitize_data(message: str, keywords: list[str] | tuple[str, ...]) -> str:
+    if not keywords:
+        return message
+    desensitizer = _compile_keywords(tuple(keywords))
+    # 非 ASCII 文本的大小写折叠与正则不完全一致, 只对 ASCII 文本预过滤
+    if desensitizer.literals is not None and message.isascii():
+        lowered = message.lower()
+        if not any(keyword in lowered for keyword in desensitizer.literals):
+            return message
+    return desensitizer.pattern.sub(_header_replacer, message)
+
+
+def desensitize_extra(extra: dict[str, Any], keywords: list[str] | tuple[str, ...]) -> None:
+    """对结构化字段 (`logger.bind(...)` 的 extra) 原地脱敏
+
+    键名是关键字时直接脱敏它的值, 其余字符串值按 `desensitize_data` 处理. `extra` 是每条日志
+    自己的字典, 但嵌套的字典属于调用方, 替换为脱敏后的副本而不修改它们
+    """
+    lowered = {keyword.lower() for keyword in keywords}
+    for key, value in extra.items():
+        if key == JSON_KEY:
+            continue
+        if isinstance(value, dict):
+            extra[key] = _desensitized_copy(value, keywords)
+        elif key.lower() in lowered:
+            extra[key] = desensitize_value(str(value))
+        elif isinstance(value, str):
+            extra[key] = desensitize_data(value, keywords)
+
+
+def _desensitized_copy(
+    value: dict[str, Any], keywords: list[str] | tuple[str, ...]
+) -> dict[str, Any]:
+    copy = dict(value)
+    desensitize_extra(copy, keywords)
+    return copy
+
+
+def _resolve_level(level: str | int) -> int:
+    if isinstance(level, str):
+        levelno: int = logger.level(level).no
+        return levelno
+    return int(level)
+
+
+_config: LogConfig | None = None
+"""当前配置, 尚未配置时为 None"""
+_levelno = _resolve_level(LogConfig.level)
+"""日志等级数值, 只在 `_configure` 中重新计算; 处理器也以它为等级"""
+_sensitive_keys: tuple[str, ...] = LogConfig.sensitive_keys
+_limiter: RateLimiter | None = None
+"""未启用采样和限流时为 None, 过滤时只多一次判断"""
+_handler_ids: list[int] = []
+_batching_sinks: list[BatchingSink] = []
+_setup_lock = threading.Lock()
+
+
+def set_level(level: str | int) -> None:
+    """修改日志等级, 如 `set_level("DEBUG")` 或 `set_level(10)`
+
+    本模块的处理器以新等级重新添加, 低于等级的日志在 loguru 构造记录前就被丢弃
+    """
+    get_logger()
+    with _setup_lock:
+        assert _config is not None
+        _configure(replace(_config, level=level))
+
+
+def default_filter(record: Record | dict[str, Any]) -> bool:
+    # 先比较等级, 被丢弃的日志不做脱敏
+    if record["level"].no < _levelno:
+        return False
+    if _limiter is not None and not _limiter.allow(record):
+        return False
+    if _sensitive_keys:
+        record["message"] = desensitize_data(record["message"], _sensitive_keys)
+        extra = record.get("extra")
+        if extra:
+            desensitize_extra(extra, _sensitive_keys)
+    return True
+
+
+def default_format(config: LogConfig) -> str:
+    """默认日志格式, DEBUG 等级时额外显示模块、函数和行号"""
+    if config.level == "DEBUG":
+        return (
+            "<g>{time:MM-DD HH:mm:ss}</g> "
+            "[<lvl>{level}</lvl>] "
+            "<c><u>{name}</u></c> | "
+            "<c>{function}:{line}</c> | "
+            "{message}"
+        )
+    return (
         "<g>{time:MM-DD HH:mm:ss}</g> "
         "[<lvl>{level}</lvl>] "
-        f"<c><u>{PROJECT_NAME}</u></c> | "
+        f"<c><u>{config.project_name}</u></c> | "
         "{message}"
     )
-    """默认日志格式"""
-
-logger_id = logger.add(
-    sys.stdout,
-    level=0,
-    diagnose=diagnose,
-    filter=default_filter,
-    format=default_format,
-    backtrace=backtrace,
-)
-"""默认日志处理器 id"""
-
-__autodoc__ = {"logger_id": False}
+
+
+def setup_logging(config: LogConfig | None = None) -> LogConfig:
+    """按 `config` 配置日志, 默认由 `load_config` 读取; 可重复调用以重新配置
+
+    只移除本模块添加的处理器 (以及 loguru 自带的 stderr 处理器), 用户自行添加的不受影响
+    """
+    config = config or load_config()
+    with _setup_lock:
+        _configure(config)
+    return config
+
+
+def get_logger() -> Logger:
+    """返回 loguru logger, 尚未配置时先以 `load_config()` 的配置调用 `setup_logging`"""
+    if _config is None:
+        with _setup_lock:
+            # 其他线程可能已在等待锁期间完成配置
+            if _config is None:
+                _configure(load_config())
+    return logger
+
+
+def _configure(config: LogConfig) -> None:
+    global _config, _levelno, _sensitive_keys, _limiter
+    # 先解析等级, 未知等级不会移除现有的处理器
+    levelno = _resolve_level(config.level)
+    if _limiter is not None:
+        _limiter.stop(logger)
+        _limiter = None
+    if _config is None:
+        try:
+            logger.remove(0)
+        except ValueError:
+            pass
+    for handler_id in _handler_ids:
+        logger.remove(handler_id)
+    for batching_sink in _batching_sinks:
+        batching_sink.stop()
+    _handler_ids.clear()
+    _batching_sinks.clear()
+
+    _levelno = levelno
+    _sensitive_keys = tuple(config.sensitive_keys)
+    if config.sample_every > 1 or config.rate_limit > 0:
+        _limiter = RateLimiter(
+            sample_every=config.sample_every,
+            rate=config.rate_limit,
+            burst=config.rate_burst,
+            summary_interval=config.summary_interval,
+        )
+        _limiter.start(logger)
+    debug = config.level == "DEBUG"
+    if config.stdout:
+        sink: Any = sys.stdout
+        if config.async_stdout:
+            sink = BatchingSink(sys.stdout, max_queue=config.queue_size, overflow=config.overflow)
+            _batching_sinks.append(sink)
+        _handler_ids.append(
+            logger.add(
+                sink,
+                level=_levelno,
+                diagnose=debug,
+                filter=default_filter,
+                format=default_format(config),
+                backtrace=debug,
+            )
+        )
+    if config.json_file:
+        _handler_ids.append(
+            add_json_sink(
+                config.json_file,
+                level=_levelno,
+                filter=default_filter,
+                rotation=config.rotation,
+                retention=config.retention,
+            )
+        )
+    _config = config
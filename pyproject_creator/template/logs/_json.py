@@ -0,0 +1,117 @@
+"""
+JSON Lines 格式的文件日志:
+
+- 每条日志一行 JSON, 安装了 `orjson` 时使用它编码, 否则使用标准库 `json`
+- 按大小或时间轮转 (`rotation`), 轮转出的文件由后台线程压缩为 `.gz`
+"""
+
+from __future__ import annotations
+
+import os
+import gzip
+import shutil
+import threading
+import traceback
+from typing import TYPE_CHECKING, Any
+from pathlib import Path
+from collections.abc import Callable
+
+import loguru
+
+from ._sampling import DECISION_KEY
+
+
+if TYPE_CHECKING:
+    from loguru import Record
+
+
+JSON_KEY = "_json"
+"""序列化结果暂存在 `record["extra"]` 中的键名"""
+_INTERNAL_KEYS = frozenset((JSON_KEY, DECISION_KEY))
+
+
+def _stdlib_dumps(obj: dict[str, Any]) -> str:
+    import json
+
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def _load_encoder() -> Callable[[dict[str, Any]], str]:
+    try:
+        import orjson
+    except ImportError:
+        return _stdlib_dumps
+
+    def _orjson_dumps(obj: dict[str, Any]) -> str:
+        line: str = orjson.dumps(obj, default=str).decode()
+        return line
+
+    return _orjson_dumps
+
+
+dumps = _load_encoder()
+"""将一条日志编码为 JSON 字符串"""
+
+
+def serialize_record(record: Record) -> str:
+    extra = record["extra"]
+    entry: dict[str, Any] = {
+        "time": record["time"].isoformat(),
+        "level": record["level"].name,
+        "name": record["name"],
+        "function": record["function"],
+        "line": record["line"],
+        "message": record["message"],
+    }
+    if extra:
+        entry["extra"] = {key: value for key, value in extra.items() if key not in _INTERNAL_KEYS}
+    exception = record["exception"]
+    if exception is not None:
+        entry["exception"] = "".join(
+            traceback.format_exception(exception.type, exception.value, exception.traceback)
+        )
+    return dumps(entry)
+
+
+def json_formatter(record: Record) -> str:
+    """loguru 的 `format` 函数, 输出一行 JSON"""
+    record["extra"][JSON_KEY] = serialize_record(record)
+    return f"{{extra[{JSON_KEY}]}}\n"
+
+
+def _gzip_file(path: str) -> None:
+    with open(path, "rb") as src, gzip.open(f"{path}.gz", "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    os.remove(path)
+
+
+def compress_in_background(path: str) -> None:
+    """loguru 的 `compression` 函数, 在后台线程中压缩轮转出的文件, 不阻塞写日志"""
+    # 非守护线程, 进程退出前会等待压缩完成
+    threading.Thread(target=_gzip_file, args=(path,), name="log-compress").start()
+
+
+def add_json_sink(
+    path: str | Path,
+    *,
+    level: str | int = 0,
+    filter: Callable[[Record], bool] | None = None,
+    rotation: str | int | None = "100 MB",
+    retention: str | int | None = 10,
+    compression: bool = True,
+) -> int:
+    """添加 JSON Lines 文件输出, 返回处理器 id
+
+    `rotation` 如 `"100 MB"`, `"00:00"`, `"1 week"`; `retention` 为保留的文件数或时长
+    """
+    handler_id: int = loguru.logger.add(
+        path,
+        level=level,
+        filter=filter,
+        format=json_formatter,
+        rotation=rotation,
+        retention=retention,
+        compression=compress_in_background if compression else None,
+        encoding="utf-8",
+    )
+    return handler_id
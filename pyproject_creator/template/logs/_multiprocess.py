@@ -0,0 +1,146 @@
+"""
+多进程日志汇总:
+
+- 子进程不直接写 stdout, 而是把日志记录成批放入 `multiprocessing` 队列
+- 父进程的 `LogListener` 线程逐条交给父进程配置好的处理器, 所有输出只有一个写入者
+- 同一子进程的日志保持原有顺序; 脱敏、采样和等级过滤都在父进程中进行
+
+    with LogListener() as listener:
+        with ProcessPoolExecutor(**listener.pool_options()) as pool:
+            ...
+"""
+
+from __future__ import annotations
+
+import threading
+import traceback
+import multiprocessing
+import multiprocessing.util
+from typing import TYPE_CHECKING, Any
+from dataclasses import replace
+
+from . import _default
+from ._async import BatchingSink
+from ._config import load_config
+
+
+if TYPE_CHECKING:
+    from types import TracebackType
+    from typing import Self
+    from multiprocessing.queues import Queue
+    from multiprocessing.context import BaseContext
+
+    from loguru import Logger, Record
+
+
+# 父进程补回的字段, 其余字段 (如 `elapsed`) 以父进程为准
+_RECORD_FIELDS = ("time", "name", "module", "function", "line", "file", "process", "thread")
+
+
+class QueueSink(BatchingSink):
+    """子进程的日志输出, 成批把日志记录放入队列"""
+
+    def __init__(
+        self,
+        queue: Queue[list[Record] | None],
+        *,
+        batch_size: int = 256,
+        flush_interval: float = 0.2,
+    ) -> None:
+        self.queue = queue
+        super().__init__(batch_size=batch_size, flush_interval=flush_interval)
+
+    def isatty(self) -> bool:
+        return False
+
+    def _write_batch(self, batch: list[str]) -> None:
+        records = [_picklable(message.record) for message in batch]  # type: ignore[attr-defined]
+        try:
+            self.queue.put(records)
+        except Exception as e:  # 记录中有无法序列化的 extra 等
+            super()._write_batch([f"Failed to send {len(records)} log records: {e!r}\n"])
+
+
+def _picklable(record: Record) -> Record:
+    """traceback 无法跨进程传递, 提前格式化并附加在消息之后"""
+    exception = record["exception"]
+    if exception is not None and exception.traceback is not None:
+        text = "".join(traceback.format_exception(*exception)).rstrip()
+        record = record.copy()
+        record["message"] = f"{record['message']}\n{text}"
+        record["exception"] = None
+    return record
+
+
+def init_worker_logging(
+    queue: Queue[list[Record] | None], batch_size: int = 256, flush_interval: float = 0.2
+) -> None:
+    """在子进程中调用 (如进程池的 `initializer`), 把日志改为发往父进程的 `LogListener`"""
+    # 子进程自身不输出, 也不采样; fork 时会继承父进程的处理器, 一并移除
+    config = _default._config or load_config()
+    _default.setup_logging(
+        replace(config, stdout=False, json_file=None, sample_every=1, rate_limit=0)
+    )
+    sink = QueueSink(queue, batch_size=batch_size, flush_interval=flush_interval)
+    with _default._setup_lock:
+        _default._batching_sinks.append(sink)
+        _default._handler_ids.append(
+            _default.logger.add(sink, level=_default._levelno, format="{message}")
+        )
+    # 进程池的子进程退出时不执行 atexit, multiprocessing 的 finalizer 会执行
+    multiprocessing.util.Finalize(sink, sink.stop, exitpriority=10)
+
+
+class LogListener:
+    """父进程中接收子进程日志的线程, 创建后即开始接收"""
+
+    def __init__(self, context: BaseContext | None = None) -> None:
+        context = context or multiprocessing.get_context()
+        self.queue: Queue[list[Record] | None] = context.Queue()
+        self._thread = threading.Thread(target=self._run, name="log-listener", daemon=True)
+        self._thread.start()
+
+    def pool_options(self) -> dict[str, Any]:
+        """`ProcessPoolExecutor` 或 `multiprocessing.Pool` 的 `initializer` 参数"""
+        return {"initializer": init_worker_logging, "initargs": (self.queue,)}
+
+    def _run(self) -> None:
+        logger = _default.get_logger()
+        while True:
+            records = self.queue.get()
+            if records is None:
+                return
+            for record in records:
+                self._emit(logger, record)
+
+    @staticmethod
+    def _emit(logger: Logger, record: Record) -> None:
+        def patcher(new: Record) -> None:
+            for field in _RECORD_FIELDS:
+                new[field] = record[field]  # type: ignore[literal-required, unused-ignore]
+            new["extra"].update(record["extra"])
+
+        level = record["level"]
+        try:
+            logger.level(level.name)
+        except ValueError:  # 子进程中注册的自定义等级
+            level_id: str | int = level.no
+        else:
+            level_id = level.name
+        logger.patch(patcher).opt(exception=record["exception"]).log(level_id, record["message"])
+
+    def stop(self, timeout: float | None = 5) -> None:
+        """处理完队列中的日志后停止, 应在所有子进程退出后调用"""
+        self.queue.put(None)
+        self._thread.join(timeout)
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.stop()
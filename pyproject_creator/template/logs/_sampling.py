@@ -0,0 +1,154 @@
+"""
+日志采样与限流, 防止热循环中同一条日志刷屏:
+
+- 采样: 每个键每 `sample_every` 条只保留 1 条
+- 限流: 每个键一个令牌桶, 每秒补充 `rate` 个令牌, 最多积攒 `burst` 个
+- 键默认为调用位置 (模块名与行号), `logger.bind(log_key="...")` 可指定自定义键
+- 被丢弃的条数由后台线程每隔 `summary_interval` 秒汇总输出一次
+- 最多跟踪 `max_keys` 个键, 超出时淘汰最久未使用的键, 其丢弃条数计入 `EVICTED_KEY`
+"""
+
+from __future__ import annotations
+
+import time
+import atexit
+import threading
+from typing import TYPE_CHECKING, Any
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+
+
+if TYPE_CHECKING:
+    from loguru import Logger, Record
+
+
+KEY_FIELD = "log_key"
+"""`extra` 中自定义限流键的字段名"""
+DECISION_KEY = "_sampled"
+"""同一条日志会经过每个处理器的过滤器, 判定结果暂存在 `extra` 中以免重复计数"""
+EVICTED_KEY = "<evicted>"
+"""汇总中已淘汰的键的名称"""
+
+
+class _KeyState:
+    __slots__ = ("count", "tokens", "updated_at", "suppressed")
+
+    def __init__(self, tokens: float, now: float) -> None:
+        self.count = 0
+        self.tokens = tokens
+        self.updated_at = now
+        self.suppressed = 0
+
+
+class RateLimiter:
+    """按键采样和限流, 由 `default_filter` 调用 `allow`"""
+
+    def __init__(
+        self,
+        *,
+        sample_every: int = 1,
+        rate: float = 0.0,
+        burst: int = 10,
+        summary_interval: float = 60.0,
+        max_keys: int = 10_000,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.sample_every = max(sample_every, 1)
+        self.rate = rate
+        """每秒补充的令牌数, 为 0 时不限流"""
+        self.burst = max(burst, 1)
+        self.summary_interval = summary_interval
+        self.clock = clock
+        self.max_keys = max(max_keys, 1)
+        """自定义键可能无穷多, 如 `log_key=user_id`, 超出时淘汰最久未使用的键"""
+        self._states: OrderedDict[Hashable, _KeyState] = OrderedDict()
+        self._evicted_suppressed = 0
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def allow(self, record: Record | dict[str, Any]) -> bool:
+        extra = record["extra"]
+        decision: bool | None = extra.get(DECISION_KEY)
+        if decision is not None:
+            return decision
+        key = extra.get(KEY_FIELD) or (record["name"], record["line"])
+        with self._lock:
+            state = self._states.get(key)
+            if state is None:
+                if len(self._states) >= self.max_keys:
+                    _, evicted = self._states.popitem(last=False)
+                    self._evicted_suppressed += evicted.suppressed
+                state = self._states[key] = _KeyState(self.burst, self.clock())
+            else:
+                self._states.move_to_end(key)
+            decision = self._take(state)
+            if not decision:
+                state.suppressed += 1
+        extra[DECISION_KEY] = decision
+        return decision
+
+    def _take(self, state: _KeyState) -> bool:
+        state.count += 1
+        if (state.count - 1) % self.sample_every:
+            return False
+        if not self.rate:
+            return True
+        now = self.clock()
+        state.tokens = min(self.burst, state.tokens + (now - state.updated_at) * self.rate)
+        state.updated_at = now
+        if state.tokens < 1:
+            return False
+        state.tokens -= 1
+        return True
+
+    def take_suppressed(self) -> dict[Hashable, int]:
+        """返回并清零各键被丢弃的条数, 只包含有丢弃的键"""
+        with self._lock:
+            suppressed = {key: s.suppressed for key, s in self._states.items() if s.suppressed}
+            for key in suppressed:
+                self._states[key].suppressed = 0
+            if self._evicted_suppressed:
+                suppressed[EVICTED_KEY] = self._evicted_suppressed
+                self._evicted_suppressed = 0
+        return suppressed
+
+    def summary(self) -> str | None:
+        """被丢弃日志的汇总, 没有丢弃时为 None"""
+        suppressed = self.take_suppressed()
+        if not suppressed:
+            return None
+        total = sum(suppressed.values())
+        details = ", ".join(
+            f"{':'.join(map(str, key)) if isinstance(key, tuple) else key} x{count}"
+            for key, count in sorted(suppressed.items(), key=lambda item: -item[1])
+        )
+        return f"{total} log records suppressed by sampling or rate limiting: {details}"
+
+    def _emit_summary(self, logger: Logger) -> None:
+        message = self.summary()
+        if message is not None:
+            # 预置判定结果, 汇总本身不受采样和限流影响
+            logger.bind(**{DECISION_KEY: True}).warning(message)
+
+    def _run(self, logger: Logger) -> None:
+        while not self._stopped.wait(self.summary_interval):
+            self._emit_summary(logger)
+
+    def start(self, logger: Logger) -> None:
+        """启动定期输出汇总的后台线程"""
+        self._thread = threading.Thread(
+            target=self._run, args=(logger,), name="log-sampling-summary", daemon=True
+        )
+        self._thread.start()
+        atexit.register(self.stop, logger)
+
+    def stop(self, logger: Logger | None = None) -> None:
+        """停止后台线程, 传入 `logger` 时输出最后一次汇总; 可重复调用"""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+            atexit.unregister(self.stop)
+        if logger is not None:
+            self._emit_summary(logger)
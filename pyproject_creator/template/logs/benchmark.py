@@ -0,0 +1,239 @@
+"""
+日志热路径的基准测试, 使用项目自己的日志配置 (`load_config()`):
+
+- `desensitize_value`, `desensitize_data`: 消息长度与关键字个数的组合, 命中与未命中
+- `default_filter`: 被等级过滤与通过的日志
+- `logger`: 经配置的输出端到端写出 (stdout 重定向到 devnull, JSON 文件写入临时目录)
+
+每个用例的结果为每次调用的纳秒数, 保存为 JSON 基线后可与之后的结果比较:
+
+    python -m <包名>.logs.benchmark run --output baseline.json
+    python -m <包名>.logs.benchmark run --compare baseline.json
+    python -m <包名>.logs.benchmark compare baseline.json current.json --threshold 0.1
+
+有用例变慢超过阈值时退出码为 1
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import json
+import timeit
+import argparse
+import platform
+import tempfile
+import functools
+import contextlib
+from typing import Any, NamedTuple
+from pathlib import Path
+from dataclasses import replace
+from collections.abc import Callable, Iterator
+
+from ._config import LogConfig, load_config
+from ._default import logger, setup_logging, default_filter, desensitize_data, desensitize_value
+
+
+MESSAGE_SIZES = (64, 512, 4096)
+KEYWORD_COUNTS = (1, 8, 32)
+BASELINE_VERSION = 1
+DEFAULT_THRESHOLD = 0.1
+"""比基线慢 10% 以上视为退化"""
+
+
+class Regression(NamedTuple):
+    case: str
+    baseline: float
+    current: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current / self.baseline
+
+
+def make_message(size: int, hit: bool) -> str:
+    """约 `size` 个字符的消息, `hit` 时包含关键字 `key0` 的值"""
+    parts = ["'key0': 1234567890abcdef; "] if hit else []
+    i = 0
+    while sum(map(len, parts)) < size:
+        parts.append(f"'field{i}': value{i}; ")
+        i += 1
+    return "".join(parts)[:size]
+
+
+def _measure(func: Callable[[], object], number: int | None, repeat: int) -> float:
+    timer = timeit.Timer(func)
+    if number is None:
+        number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1e9
+
+
+def _record(message: str, level: str) -> dict[str, Any]:
+    return {
+        "message": message,
+        "level": logger.level(level),
+        "name": __name__,
+        "line": 0,
+        "extra": {},
+    }
+
+
+def desensitize_cases() -> dict[str, Callable[[], object]]:
+    cases: dict[str, Callable[[], object]] = {
+        "desensitize_value/short": lambda: desensitize_value("12345"),
+        "desensitize_value/long": lambda: desensitize_value("session=0123456789abcdef"),
+    }
+    for size in MESSAGE_SIZES:
+        for count in KEYWORD_COUNTS:
+            keywords = [f"key{i}" for i in range(count)]
+            for hit in (True, False):
+                message = make_message(size, hit)
+                name = f"desensitize_data/{size}B/{count}kw/{'hit' if hit else 'miss'}"
+                cases[name] = functools.partial(desensitize_data, message, keywords)
+    return cases
+
+
+def filter_cases(message: str) -> dict[str, Callable[[], object]]:
+    # 每次调用都使用新的 record, 与 loguru 一致
+    return {
+        "default_filter/suppressed": lambda: default_filter(_record(message, "TRACE")),
+        "default_filter/emitted": lambda: default_filter(_record(message, "CRITICAL")),
+    }
+
+
+def logger_cases(message: str) -> dict[str, Callable[[], object]]:
+    return {
+        "logger/suppressed": lambda: logger.trace(message),
+        "logger/emitted": lambda: logger.critical(message),
+    }
+
+
+@contextlib.contextmanager
+def _benchmark_logging(config: LogConfig) -> Iterator[None]:
+    """以 `config` 配置日志, 但不写 stdout 和项目的日志文件, 结束后恢复 `config`"""
+    with tempfile.TemporaryDirectory() as tmp, open(os.devnull, "w") as devnull:
+        json_file = str(Path(tmp) / "benchmark.jsonl") if config.json_file else None
+        with contextlib.redirect_stdout(devnull):
+            setup_logging(replace(config, json_file=json_file))
+        try:
+            yield
+        finally:
+            # 在删除临时目录前关闭 JSON 文件
+            setup_logging(config)
+
+
+def run_suite(
+    config: LogConfig | None = None,
+    *,
+    number: int | None = None,
+    repeat: int = 3,
+    only: str | None = None,
+) -> dict[str, Any]:
+    """运行所有用例, 返回可保存为基线的结果
+
+    `number` 为每轮调用次数, 默认自动选择使每轮约 0.2 秒; `only` 只运行名称包含它的用例
+    """
+    config = config or load_config()
+    # 包含第一个脱敏关键字, 过滤和写出的用例都会实际脱敏
+    keyword = config.sensitive_keys[0] if config.sensitive_keys else "key0"
+    message = make_message(256, hit=True).replace("key0", keyword, 1)
+    results: dict[str, float] = {}
+    with _benchmark_logging(config):
+        cases = {**desensitize_cases(), **filter_cases(message), **logger_cases(message)}
+        for name, func in cases.items():
+            if only is None or only in name:
+                results[name] = round(_measure(func, number, repeat), 1)
+    return {
+        "version": BASELINE_VERSION,
+        # 只记录 Python 的主次版本, 基线中不保存主机相关的信息
+        "python": ".".join(platform.python_version_tuple()[:2]),
+        "unit": "ns/call",
+        "cases": results,
+    }
+
+
+def compare_results(
+    baseline: dict[str, Any], current: dict[str, Any], threshold: float = DEFAULT_THRESHOLD
+) -> list[Regression]:
+    """返回比基线慢超过 `threshold` (比例) 的用例, 只比较两边都有的用例"""
+    regressions = []
+    for case, before in baseline["cases"].items():
+        after = current["cases"].get(case)
+        if after is not None and before > 0 and after > before * (1 + threshold):
+            regressions.append(Regression(case, before, after))
+    return regressions
+
+
+def format_results(current: dict[str, Any], baseline: dict[str, Any] | None = None) -> str:
+    width = max(map(len, current["cases"]), default=0)
+    header = f"{'case':<{width}}  {'ns/call':>12}"
+    lines = [header + f"  {'change':>8}" if baseline else header]
+    for case, value in current["cases"].items():
+        line = f"{case:<{width}}  {value:>12,.0f}"
+        before = baseline["cases"].get(case) if baseline else None
+        if before:
+            line += f"  {(value / before - 1) * 100:>+7.1f}%"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def _load(path: str) -> dict[str, Any]:
+    with open(path, encoding="utf-8") as file:
+        results: dict[str, Any] = json.load(file)
+    if results.get("version") != BASELINE_VERSION:
+        raise SystemExit(f"{path} is not a version {BASELINE_VERSION} benchmark baseline")
+    return results
+
+
+def _report(baseline: dict[str, Any], current: dict[str, Any], threshold: float) -> int:
+    print(format_results(current, baseline))
+    regressions = compare_results(baseline, current, threshold)
+    for regression in regressions:
+        print(
+            f"REGRESSION {regression.case}: {regression.baseline:,.0f} -> "
+            f"{regression.current:,.0f} ns/call (x{regression.ratio:.2f})",
+            file=sys.stderr,
+        )
+    return 1 if regressions else 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the logging hot path.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run = subparsers.add_parser("run", help="run the benchmarks")
+    run.add_argument("--output", help="save the results as a JSON baseline")
+    run.add_argument("--compare", metavar="BASELINE", help="compare with a saved baseline")
+    run.add_argument("--number", type=int, help="calls per round, automatic by default")
+    run.add_argument("--repeat", type=int, default=3, help="rounds, the fastest is kept")
+    run.add_argument("--only", help="only run the cases whose name contains this")
+
+    compare = subparsers.add_parser("compare", help="compare two saved results")
+    compare.add_argument("baseline")
+    compare.add_argument("current")
+
+    for subparser in (run, compare):
+        subparser.add_argument(
+            "--threshold",
+            type=float,
+            default=DEFAULT_THRESHOLD,
+            help="slowdown ratio reported as a regression (default: %(default)s)",
+        )
+
+    args = parser.parse_args(argv)
+    if args.command == "compare":
+        return _report(_load(args.baseline), _load(args.current), args.threshold)
+
+    current = run_suite(number=args.number, repeat=args.repeat, only=args.only)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(current, file, indent=4, ensure_ascii=False)
+            file.write("\n")
+    if args.compare:
+        return _report(_load(args.compare), current, args.threshold)
+    print(format_results(current))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from collections.abc import Callable, Iterator
+
+
+StageCallback = Callable[[str, float], None]
+"""Called with the stage name and its duration in seconds each time a stage ends."""
+
+
+class Timings:
+    """Monotonic durations of the stages of a project creation.
+
+    A stage entered several times (e.g. `render`, once per template) accumulates its
+    durations. Pass `callback` to forward each measurement to your own tracing.
+    """
+
+    def __init__(self, callback: StageCallback | None = None) -> None:
+        self.callback = callback
+        self.stages: dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            self.stages[name] = self.stages.get(name, 0.0) + duration
+            if self.callback is not None:
+                self.callback(name, duration)
+
+    @property
+    def total(self) -> float:
+        return sum(self.stages.values())
+
+    def to_json(self) -> str:
+        import json
+
+        return json.dumps({"stages": self.stages, "total": self.total})
+
+    def format_table(self) -> str:
+        width = max((len(name) for name in self.stages), default=0)
+        width = max(width, len("total"))
+        lines = [f"{'stage':<{width}}  {'ms':>10}"]
+        lines += [
+            f"{name:<{width}}  {seconds * 1e3:>10.3f}" for name, seconds in self.stages.items()
+        ]
+        lines.append(f"{'total':<{width}}  {self.total * 1e3:>10.3f}")
+        return "\n".join(lines)
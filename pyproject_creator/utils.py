@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+import os
+import sys
+from pathlib import Path
+
+
+BASE_PATH: Path = Path(__file__).parent.resolve()
+
+
+def user_cache_dir() -> Path:
+    """Per-user cache directory of pyproject-creator, overridable with `PYPCT_CACHE_DIR`."""
+    if custom := os.environ.get("PYPCT_CACHE_DIR"):
+        return Path(custom)
+    if sys.platform == "win32":
+        base = Path(os.environ.get("LOCALAPPDATA") or Path.home() / "AppData" / "Local")
+    elif sys.platform == "darwin":
+        base = Path.home() / "Library" / "Caches"
+    else:
+        base = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache")
+    return base / "pyproject-creator"
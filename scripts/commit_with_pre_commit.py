@@ -1,16 +1,107 @@
 from __future__ import annotations
 
+import sys
+import json
+import hashlib
+import argparse
 import subprocess
+from pathlib import Path
 
 
-def run_pre_commit() -> int:
-    """Run pre-commit checks and return the result."""
-    result = subprocess.run(
-        ["pre-commit", "run", "--all-files", "-vvv"], capture_output=True, text=True
-    )
-    print(result.stdout)
-    return result.returncode
+CONFIG_FILE = ".pre-commit-config.yaml"
+CACHE_NAME = "pre-commit-passed.json"
+MAX_CACHE_ENTRIES = 10_000
+
+
+def _git(*args: str) -> str:
+    return subprocess.run(["git", *args], check=True, capture_output=True, text=True).stdout
+
+
+def staged_files() -> list[str]:
+    """Added, copied, modified and renamed files of the index, relative to the repository."""
+    output = _git("diff", "--cached", "--name-only", "--diff-filter=ACMR", "-z")
+    return [name for name in output.split("\0") if name]
+
+
+def file_hashes(files: list[str]) -> list[str]:
+    """Git blob ids of the working tree content, which is what the hooks check."""
+    if not files:
+        return []
+    return _git("hash-object", "--", *files).split()
+
+
+def config_digest() -> str:
+    """Passing results are only reused with the same hook configuration."""
+    try:
+        return hashlib.sha256(Path(CONFIG_FILE).read_bytes()).hexdigest()
+    except FileNotFoundError:
+        return ""
+
+
+def _cache_path() -> Path:
+    return Path(_git("rev-parse", "--git-path", CACHE_NAME).strip())
+
+
+def load_cache(config: str) -> dict[str, None]:
+    try:
+        cache = json.loads(_cache_path().read_text())
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(cache, dict) or cache.get("config") != config:
+        return {}
+    return dict.fromkeys(cache.get("passed", []))
+
+
+def save_cache(config: str, passed: dict[str, None]) -> None:
+    # Most recent entries last, the oldest are dropped first
+    entries = list(passed)[-MAX_CACHE_ENTRIES:]
+    try:
+        _cache_path().write_text(json.dumps({"config": config, "passed": entries}))
+    except OSError:
+        pass
+
+
+def run_pre_commit(all_files: bool = False, use_cache: bool = True) -> int:
+    """Run pre-commit checks and return the result.
+
+    By default only the staged files are checked, skipping those whose content already
+    passed with the same `.pre-commit-config.yaml`. The output is streamed as it comes.
+    """
+    if all_files:
+        return subprocess.run(["pre-commit", "run", "--all-files", "-vvv"]).returncode
+
+    # A staged file deleted from the working tree (or a submodule) has no content to check
+    files = [name for name in staged_files() if Path(name).is_file()]
+    config = config_digest()
+    passed = load_cache(config) if use_cache else {}
+    keys = [f"{name}:{blob}" for name, blob in zip(files, file_hashes(files))]
+    pending = [(name, key) for name, key in zip(files, keys) if key not in passed]
+    if not pending:
+        print(f"pre-commit: {len(files)} staged files already passed, nothing to check.")
+        return 0
+    if len(pending) < len(files):
+        print(f"pre-commit: {len(files) - len(pending)} staged files already passed, skipped.")
+
+    returncode = subprocess.run(
+        ["pre-commit", "run", "-vvv", "--files", *(name for name, _ in pending)]
+    ).returncode
+    if returncode == 0 and use_cache:
+        for _, key in pending:
+            passed.pop(key, None)
+            passed[key] = None
+        save_cache(config, passed)
+    return returncode
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Run pre-commit on the staged files.")
+    # The commit-msg stage passes the message file, it isn't needed here
+    parser.add_argument("commit_msg_file", nargs="?", help=argparse.SUPPRESS)
+    parser.add_argument("--all-files", action="store_true", help="check every file")
+    parser.add_argument("--no-cache", action="store_true", help="ignore previous results")
+    args = parser.parse_args(argv)
+    return run_pre_commit(all_files=args.all_files, use_cache=not args.no_cache)
 
 
 if __name__ == "__main__":
-    run_pre_commit()
+    sys.exit(main())
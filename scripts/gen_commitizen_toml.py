@@ -1,82 +1,151 @@
-from __future__ import annotations
-
-import json
-from pathlib import Path
-
-import jinja2
-
-
-current_dir = Path(__file__).parent.resolve()
-with open(current_dir / "gitmoji.json") as f:
-    commit_types: list[dict[str, str]] = json.load(f)
-
-
-def get_info_via_type(_type: str) -> str:
-    for commit in commit_types:
-        if commit["change_type"] == _type:
-            return f"{commit['emoji']} {commit['change_type']}".strip()
-    raise KeyError(f"{_type} not found in {commit_types}")
-
-
-def get_type_pattern(*args: str, exclude: list[str] | None = None) -> str:
-    if exclude is None:
-        exclude = []
-    change_types = [
-        i
-        for i in commit_types
-        if (not args or i["change_type"] in args) and (i["change_type"] not in exclude)
-    ]
-    return "|".join(i["change_type"] for i in change_types)
-
-
-def get_change_type_choices() -> str:
-    change_types = [
-        (
-            f'{{value = "{commit["emoji"]} {commit["change_type"]}", '
-            f'name = "{commit["emoji"]} {commit["change_type"]}: {commit["description"]}"}}'
-        )
-        for commit in commit_types
-    ]
-    return ",\n\t".join(change_types)
-
-
-def get_change_type_map_str(*args: str) -> str:
-    map_strs = [f'"{i}"="{i.capitalize()}"' for i in args]
-    return "{" + ", ".join(map_strs) + "}"
-
-
-def main() -> None:
-    with open(current_dir / "cz_toml.template") as _f:
-        template = jinja2.Template(_f.read())
-    pattern_type_list = [
-        "breaking",
-        "feat",
-        "fix",
-        "hotfix",
-        "docs",
-        "refactor",
-        "config",
-        "scripts",
-        "style",
-    ]
-    template = template.render(
-        release_type_str=get_info_via_type("release"),
-        feat_type_str=get_info_via_type("feat"),
-        schema_pattern_type_str=get_type_pattern(),
-        bump_pattern_type_str=get_type_pattern(*["breaking", "feat", "fix", "hotfix"]),
-        commit_parser_type_str=get_type_pattern(exclude=["release"]),
-        changelog_pattern_type_str=get_type_pattern(*pattern_type_list),
-        change_type_map_str=get_change_type_map_str(*pattern_type_list),
-        info_commit_types_str="\n".join(
-            f"- {commit['emoji']} {commit['change_type']}: {commit['description']}"
-            for commit in commit_types
-        ),
-        change_type_choices_str=get_change_type_choices(),
-    )
-
-    with open(current_dir.parent.resolve() / ".cz.toml", "w", encoding="utf-8") as _f:
-        _f.write(template + "\n")
-
-
-if __name__ == "__main__":
-    main()
+from __future__ import annotations
+
+import sys
+import json
+import hashlib
+import argparse
+import functools
+from pathlib import Path
+
+
+current_dir = Path(__file__).parent.resolve()
+GITMOJI_PATH = current_dir / "gitmoji.json"
+TEMPLATE_PATH = current_dir / "cz_toml.template"
+CZ_TOML_PATH = current_dir.parent.resolve() / ".cz.toml"
+INPUT_PATHS = (GITMOJI_PATH, TEMPLATE_PATH, Path(__file__).resolve())
+"""`.cz.toml` only changes when one of these does, this script included."""
+STAMP_PREFIX = "# gen-cz-config "
+
+
+@functools.cache
+def _load_commit_types() -> tuple[list[dict[str, str]], dict[str, dict[str, str]]]:
+    with open(GITMOJI_PATH, encoding="utf-8") as f:
+        commit_types: list[dict[str, str]] = json.load(f)
+    return commit_types, {commit["change_type"]: commit for commit in commit_types}
+
+
+def get_commit_types() -> list[dict[str, str]]:
+    return _load_commit_types()[0]
+
+
+def get_info_via_type(_type: str) -> str:
+    commit_types, by_change_type = _load_commit_types()
+    try:
+        commit = by_change_type[_type]
+    except KeyError:
+        raise KeyError(f"{_type} not found in {commit_types}") from None
+    return f"{commit['emoji']} {commit['change_type']}".strip()
+
+
+def get_type_pattern(*args: str, exclude: list[str] | None = None) -> str:
+    if exclude is None:
+        exclude = []
+    change_types = [
+        i
+        for i in get_commit_types()
+        if (not args or i["change_type"] in args) and (i["change_type"] not in exclude)
+    ]
+    return "|".join(i["change_type"] for i in change_types)
+
+
+def get_change_type_choices() -> str:
+    change_types = [
+        (
+            f'{{value = "{commit["emoji"]} {commit["change_type"]}", '
+            f'name = "{commit["emoji"]} {commit["change_type"]}: {commit["description"]}"}}'
+        )
+        for commit in get_commit_types()
+    ]
+    return ",\n    ".join(change_types)
+
+
+def get_change_type_map_str(*args: str) -> str:
+    map_strs = [f'"{i}" = "{i.capitalize()}"' for i in args]
+    return "{" + ", ".join(map_strs) + "}"
+
+
+def render() -> str:
+    import jinja2
+
+    with open(TEMPLATE_PATH, encoding="utf-8") as _f:
+        template = jinja2.Template(_f.read())
+    pattern_type_list = [
+        "breaking",
+        "feat",
+        "fix",
+        "hotfix",
+        "docs",
+        "refactor",
+        "config",
+        "scripts",
+        "style",
+    ]
+    rendered: str = template.render(
+        release_type_str=get_info_via_type("release"),
+        feat_type_str=get_info_via_type("feat"),
+        schema_pattern_type_str=get_type_pattern(),
+        bump_pattern_type_str=get_type_pattern(*["breaking", "feat", "fix", "hotfix"]),
+        commit_parser_type_str=get_type_pattern(exclude=["release"]),
+        changelog_pattern_type_str=get_type_pattern(*pattern_type_list),
+        change_type_map_str=get_change_type_map_str(*pattern_type_list),
+        info_commit_types_str="\n".join(
+            f"- {commit['emoji']} {commit['change_type']}: {commit['description']}"
+            for commit in get_commit_types()
+        ),
+        change_type_choices_str=get_change_type_choices(),
+    )
+    return rendered
+
+
+def _digest(*chunks: bytes) -> str:
+    sha = hashlib.sha256()
+    for chunk in chunks:
+        sha.update(len(chunk).to_bytes(8, "big"))
+        sha.update(chunk)
+    return sha.hexdigest()[:16]
+
+
+def inputs_digest() -> str:
+    # Line endings depend on the checkout, not on the content
+    return _digest(*(path.read_bytes().replace(b"\r\n", b"\n") for path in INPUT_PATHS))
+
+
+def make_stamp(inputs: str, body: str) -> str:
+    """First line of `.cz.toml`: the digest of the inputs and of the rest of the file."""
+    return f"{STAMP_PREFIX}inputs={inputs} output={_digest(body.encode())}\n"
+
+
+def is_up_to_date(output: Path = CZ_TOML_PATH) -> bool:
+    """Whether `output` was generated from the current inputs and not edited since."""
+    try:
+        content = output.read_text(encoding="utf-8")
+    except FileNotFoundError:
+        return False
+    stamp, _, body = content.partition("\n")
+    return f"{stamp}\n" == make_stamp(inputs_digest(), body)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Generate .cz.toml from gitmoji.json.")
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="exit with 1 when .cz.toml is out of date, without writing it",
+    )
+    parser.add_argument("--force", action="store_true", help="regenerate even if up to date")
+    parser.add_argument("--output", type=Path, default=CZ_TOML_PATH, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if not args.force and is_up_to_date(args.output):
+        return
+    if args.check:
+        print(f"{args.output} is out of date, run gen-cz-config to update it.", file=sys.stderr)
+        raise SystemExit(1)
+
+    body = render() + "\n"
+    with open(args.output, "w", encoding="utf-8") as _f:
+        _f.write(make_stamp(inputs_digest(), body) + body)
+
+
+if __name__ == "__main__":
+    main()
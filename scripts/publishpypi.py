@@ -1,20 +1,282 @@
 from __future__ import annotations
 
+import os
+import re
+import sys
+import json
+import shutil
+import hashlib
+import tomllib
+import argparse
+import tempfile
 import subprocess
+import urllib.error
+import urllib.request
+from pathlib import Path
+from html.parser import HTMLParser
+from concurrent.futures import ThreadPoolExecutor
 
 
-def publish_package() -> None:
+DIST_DIR = Path("dist")
+STAMP_NAME = ".publishpypi.json"
+PYPI_SIMPLE_URL = "https://pypi.org/simple/"
+LOCAL_REPOSITORY = "publishpypi-local"
+"""Poetry repository name given to `--repository-url`, through its environment config."""
+ALREADY_EXISTS = "HTTP Error 400: File already exists"
+
+
+def normalize(name: str) -> str:
+    """PEP 503 project name, e.g. `Foo.Bar_baz` -> `foo-bar-baz`."""
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def load_project(pyproject: Path = Path("pyproject.toml")) -> tuple[str, str]:
+    """The name and version of the package."""
+    with open(pyproject, "rb") as f:
+        data = tomllib.load(f)
+    project = data.get("tool", {}).get("poetry") or data["project"]
+    return project["name"], project["version"]
+
+
+def is_artifact(filename: str, name: str, version: str) -> bool:
+    """Whether `filename` is a sdist or wheel of `name` at `version`."""
+    stem = f"{normalize(name).replace('-', '_')}-{version}".lower()
+    # Older Poetry versions keep the dashes of the name in sdists
+    sdists = (f"{stem}.tar.gz", f"{normalize(name)}-{version}.tar.gz".lower())
+    filename = filename.lower()
+    return filename in sdists or (filename.startswith(f"{stem}-") and filename.endswith(".whl"))
+
+
+def is_released(files: set[str], name: str, version: str) -> bool:
+    """Whether `files` hold both the sdist and a wheel of `version`, what `poetry build` makes."""
+    artifacts = [f.lower() for f in files if is_artifact(f, name, version)]
+    return any(f.endswith(".tar.gz") for f in artifacts) and any(
+        f.endswith(".whl") for f in artifacts
+    )
+
+
+def source_files() -> list[str]:
+    """Tracked and untracked but not ignored files, as git sees them; `dist/` excluded."""
+    output = subprocess.run(
+        ["git", "ls-files", "--cached", "--others", "--exclude-standard", "-z"],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    dist = f"{DIST_DIR.as_posix()}/"
+    return sorted({name for name in output.split("\0") if name and not name.startswith(dist)})
+
+
+def fingerprint(version: str) -> str | None:
+    """Digest of everything a build depends on: the version, `pyproject.toml` and sources.
+
+    None outside of a git repository, where the sources are unknown and every run builds.
+    """
+    try:
+        files = source_files()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    digest = hashlib.sha256(f"{version}\0".encode())
+    for name in files:
+        path = Path(name)
+        if not path.is_file():  # deleted but still in the index
+            continue
+        digest.update(f"{name}\0".encode())
+        digest.update(hashlib.sha256(path.read_bytes()).digest())
+    return digest.hexdigest()
+
+
+def built_artifacts(current: str | None) -> list[Path] | None:
+    """The artifacts of the last build if it was made from `current`, else None."""
+    if current is None:
+        return None
+    try:
+        stamp = json.loads((DIST_DIR / STAMP_NAME).read_text())
+    except (OSError, ValueError):
+        return None
+    if not isinstance(stamp, dict) or stamp.get("fingerprint") != current:
+        return None
+    artifacts = [DIST_DIR / name for name in stamp.get("artifacts", [])]
+    if not artifacts or not all(path.is_file() for path in artifacts):
+        return None
+    return artifacts
+
+
+def build(name: str, version: str, current: str | None) -> list[Path]:
     subprocess.run(["poetry", "build", "-vvv"], check=True)
-    result = subprocess.run(["poetry", "publish"], capture_output=True, text=True)
-    if result.returncode != 0:
-        if "HTTP Error 400: File already exists" not in result.stderr:
-            print(result.stderr)
-            raise SystemExit(result.returncode)
+    artifacts = sorted(
+        path for path in DIST_DIR.iterdir() if is_artifact(path.name, name, version)
+    )
+    if current is not None:
+        stamp = {"fingerprint": current, "artifacts": [path.name for path in artifacts]}
+        (DIST_DIR / STAMP_NAME).write_text(json.dumps(stamp))
+    return artifacts
+
+
+class _LinkParser(HTMLParser):
+    def __init__(self) -> None:
+        super().__init__()
+        self.files: set[str] = set()
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        href = dict(attrs).get("href")
+        if tag == "a" and href:
+            self.files.add(href.split("#")[0].rstrip("/").rsplit("/", 1)[-1])
+
+
+def index_files(index_url: str, name: str, timeout: float = 10) -> set[str] | None:
+    """Every file of `name` on a PEP 503 simple index, None when it can't be reached."""
+    url = f"{index_url.rstrip('/')}/{normalize(name)}/"
+    request = urllib.request.Request(
+        url, headers={"Accept": "application/vnd.pypi.simple.v1+json, text/html;q=0.1"}
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            content_type = response.headers.get("Content-Type", "")
+            body = response.read().decode("utf-8", "replace")
+    except urllib.error.HTTPError as e:
+        return set() if e.code == 404 else None
+    except (OSError, ValueError):
+        return None
+    if "json" in content_type:
+        return {file["filename"] for file in json.loads(body).get("files", [])}
+    parser = _LinkParser()
+    parser.feed(body)
+    return parser.files
+
+
+def simple_index_url(upload_url: str) -> str | None:
+    """The simple index of a PyPI or TestPyPI upload URL, `.../legacy/` -> `.../simple/`.
+
+    None for other servers, whose index can't be told from the upload URL: pypiserver
+    serves `<url>/simple/`, devpi `<url>/+simple/`.
+    """
+    url = upload_url.rstrip("/")
+    if url.endswith("/legacy"):
+        return f"{url.removesuffix('/legacy')}/simple/"
+    return None
+
+
+def repository_url(repository: str) -> str | None:
+    """The upload URL Poetry has for `repository`, None when it has none."""
+    try:
+        result = subprocess.run(
+            ["poetry", "config", f"repositories.{repository}.url"],
+            capture_output=True,
+            text=True,
+        )
+    except OSError:
+        return None
+    url = result.stdout.strip()
+    return url if result.returncode == 0 and url else None
+
+
+def upload(artifact: Path, repository: str | None) -> tuple[Path, int, str]:
+    """`poetry publish` for a single artifact, a directory of its own holds it."""
+    with tempfile.TemporaryDirectory(prefix="publishpypi-") as tmp:
+        shutil.copy2(artifact, tmp)
+        command = ["poetry", "publish", "--no-interaction", "--dist-dir", tmp]
+        if repository:
+            command += ["--repository", repository]
+        result = subprocess.run(command, capture_output=True, text=True)
+    output = result.stdout + result.stderr
+    if result.returncode != 0 and ALREADY_EXISTS in output:
+        return artifact, 0, "already exists"
+    return artifact, result.returncode, output
+
+
+def publish_package(
+    repository: str | None = None,
+    index_url: str = PYPI_SIMPLE_URL,
+    dry_run: bool = False,
+    force_build: bool = False,
+    jobs: int = 4,
+) -> int:
+    """Build the package unless `dist/` is up to date, then upload what the index lacks."""
+    name, version = load_project()
+    remote = index_files(index_url, name)
+    if remote is None:
+        print(f"Could not reach {index_url}, assuming {name} {version} is not published.")
+    # A partial upload, e.g. the wheel without the sdist, is built again to finish it
+    released = remote is not None and is_released(remote, name, version)
+
+    current = fingerprint(version)
+    artifacts = None if force_build else built_artifacts(current)
+    if artifacts is not None:
+        print(f"dist/ is up to date with {name} {version}, skipping the build.")
+    elif released and not force_build:
+        print(f"\n{name} {version} already exists, so there's no need to build or publish it.")
+        return 0
+    else:
+        artifacts = build(name, version, current)
+
+    pending = [path for path in artifacts if remote is None or path.name not in remote]
+    if not pending:
+        print("\nThe version already exists, so there's no need to publish it again.")
+        return 0
+    if dry_run:
+        for path in pending:
+            print(f"Would upload {path}")
+        return 0
+
+    with ThreadPoolExecutor(max_workers=max(1, min(jobs, len(pending)))) as pool:
+        results = list(pool.map(lambda path: upload(path, repository), pending))
+    failed = 0
+    for path, returncode, output in results:
+        if returncode == 0:
+            note = " (already exists)" if output == "already exists" else ""
+            print(f"  ok    {path.name}{note}")
         else:
-            print("\nThe version already exists, so there's no need to publish it again.")
-            subprocess.run(["poetry", "version"])
-    print("\n", result.stdout)
+            failed += 1
+            print(f"  fail  {path.name}\n{output}")
+    return 1 if failed else 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Build and publish the package to PyPI.")
+    parser.add_argument("--repository", help="Poetry repository to publish to, PyPI by default")
+    parser.add_argument(
+        "--repository-url",
+        help="upload to this URL instead, e.g. a local pypiserver for testing",
+    )
+    parser.add_argument(
+        "--index-url",
+        help="simple index checked for existing files, defaults to PyPI or "
+        "<repository-url>/simple/, required for a --repository other than (Test)PyPI",
+    )
+    parser.add_argument("--dry-run", action="store_true", help="build but don't upload")
+    parser.add_argument("--force-build", action="store_true", help="build even if up to date")
+    parser.add_argument("-j", "--jobs", type=int, default=4, help="concurrent uploads")
+    args = parser.parse_args(argv)
+
+    repository, index_url = args.repository, args.index_url
+    if args.repository_url:
+        # Poetry reads repositories from POETRY_REPOSITORIES_<NAME>_URL as well
+        key = LOCAL_REPOSITORY.upper().replace("-", "_")
+        os.environ[f"POETRY_REPOSITORIES_{key}_URL"] = args.repository_url
+        repository = LOCAL_REPOSITORY
+        index_url = (
+            index_url
+            or simple_index_url(args.repository_url)
+            or f"{args.repository_url.rstrip('/')}/simple/"  # pypiserver
+        )
+    elif repository and repository != "pypi" and not index_url:
+        # Checking the wrong index would skip or repeat uploads, a 404 looks like no files
+        url = repository_url(repository)
+        index_url = simple_index_url(url) if url else None
+        if index_url is None:
+            parser.error(
+                f"can't tell the simple index of repository {repository!r} "
+                f"({url or 'no URL in the Poetry config'}), pass --index-url"
+            )
+    return publish_package(
+        repository=repository,
+        index_url=index_url or PYPI_SIMPLE_URL,
+        dry_run=args.dry_run,
+        force_build=args.force_build,
+        jobs=args.jobs,
+    )
 
 
 if __name__ == "__main__":
-    publish_package()
+    sys.exit(main())
@@ -1,11 +1,18 @@
 from __future__ import annotations
 
+import os
 import sys
 import shutil
+import threading
+import subprocess
+from typing import Any
 from pathlib import Path
+from collections.abc import Callable
 
 import pytest
+from pytest_mock import MockerFixture
 from _pytest.fixtures import FixtureRequest
+from _pytest.monkeypatch import MonkeyPatch
 
 from pyproject_creator.cli import BASE_PATH
 
@@ -20,6 +27,15 @@ def add_python_path() -> None:
     sys.path.insert(0, str(BASE_PATH.parent.resolve()))
 
 
+@pytest.fixture(scope="session", autouse=True)
+def cache_dir(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """Keep the user cache directory out of the tests, and `poetry lock` out of `pypct`."""
+    _path = tmp_path_factory.mktemp("cache")
+    os.environ["PYPCT_CACHE_DIR"] = str(_path)
+    os.environ.pop("PYPCT_REFRESH_LOCKS", None)
+    return _path
+
+
 @pytest.fixture(scope="session")
 def project_names(rootdir: Path) -> list[str]:
     _names = ["a-test-create-project", "a-test-create-project-without"]
@@ -28,3 +44,52 @@ def project_names(rootdir: Path) -> list[str]:
         if _path.exists():
             shutil.rmtree(_path.resolve())
     return _names
+
+
+@pytest.fixture
+def mock_poetry_installed(monkeypatch: MonkeyPatch) -> None:
+    run = subprocess.run
+
+    def mock_run(*args, **kwargs):  # type: ignore
+        if args[0][:2] == ["poetry", "--version"]:
+            return subprocess.CompletedProcess(args, 0, stdout="Poetry 1.1.0\n")
+        return run(*args, **kwargs)
+
+    monkeypatch.setattr(subprocess, "run", mock_run)
+
+
+Handler = Callable[[list[str]], subprocess.CompletedProcess[str]]
+
+
+class FakeRun:
+    """Stands in for `subprocess.run`: the commands of the programs given to `handle` are
+    recorded and answered by their handler, every other command runs."""
+
+    def __init__(self) -> None:
+        self.calls: list[list[str]] = []
+        self.returncode = 0
+        """Exit code of the programs handled without a handler."""
+        self._handlers: dict[str, Handler | None] = {}
+        self._run = subprocess.run
+        self._lock = threading.Lock()
+
+    def handle(self, program: str, handler: Handler | None = None) -> None:
+        self._handlers[program] = handler
+
+    def __call__(self, args: list[str], *a: Any, **kw: Any) -> subprocess.CompletedProcess[Any]:
+        if args[0] not in self._handlers:
+            return self._run(args, *a, **kw)
+        with self._lock:
+            self.calls.append(list(args))
+        handler = self._handlers[args[0]]
+        if handler is None:
+            return subprocess.CompletedProcess(args, self.returncode)
+        return handler(args)
+
+
+@pytest.fixture
+def fake_run(mocker: MockerFixture) -> FakeRun:
+    """`subprocess.run` replaced with a `FakeRun`, which handles no program yet."""
+    fake = FakeRun()
+    mocker.patch("subprocess.run", fake)
+    return fake
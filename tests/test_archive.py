@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import io
+import tarfile
+import zipfile
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from pyproject_creator import ProjectSpec, generate_project
+from pyproject_creator.cli import create_project
+from pyproject_creator.archive import write_archive
+from pyproject_creator.generator import InvalidProjectNameError, iter_project_entries
+
+
+class UnseekableStream(io.RawIOBase):
+    """A write-only stream such as a socket or a pipe."""
+
+    def __init__(self) -> None:
+        self.buffer = bytearray()
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: bytes) -> int:  # type: ignore[override]
+        self.buffer += data
+        return len(data)
+
+
+def test_iter_project_entries_match_directory(tmp_path: Path) -> None:
+    spec = ProjectSpec(name="entries", github_action=True, pypi_package=True)
+    entries = {entry.path: entry for entry in iter_project_entries(spec)}
+    result = generate_project(spec, tmp_path)
+
+    assert sorted(entries) == [file.as_posix() for file in result.files]
+    for path, entry in entries.items():
+        assert (result.project_path / path).read_bytes() == entry.data
+    assert entries["scripts/commit_with_pre_commit.py"].mode & 0o400
+
+
+@pytest.mark.parametrize("output_format", ["tar", "zip"])
+def test_write_archive(output_format: str) -> None:
+    stream = UnseekableStream()
+    spec = ProjectSpec(name="archived")
+    names = write_archive(spec, stream, output_format)  # type: ignore[arg-type]
+    assert "archived/pyproject.toml" in names
+    assert "archived/archived/logs/_default.py" in names
+
+    data = io.BytesIO(bytes(stream.buffer))
+    if output_format == "tar":
+        with tarfile.open(fileobj=data, mode="r:gz") as tar:
+            assert tar.getnames() == names
+            pyproject = tar.extractfile("archived/pyproject.toml").read()  # type: ignore[union-attr]
+    else:
+        with zipfile.ZipFile(data) as archive:
+            assert archive.namelist() == names
+            pyproject = archive.read("archived/pyproject.toml")
+    assert b'name = "archived"' in pyproject
+
+
+def test_write_archive_errors() -> None:
+    with pytest.raises(InvalidProjectNameError):
+        write_archive(ProjectSpec(name="-bad"), io.BytesIO())
+    with pytest.raises(ValueError, match="Unknown archive format"):
+        write_archive(ProjectSpec(name="good"), io.BytesIO(), "rar")
+
+
+def test_create_project_archive(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    args = ["--name", "zipped", "--description", "", "--author", "a", "--python-version", "3.11"]
+    args += ["--project-license", "", "--output-format", "zip"]
+    result = CliRunner().invoke(create_project, args, input="n\nn\nn\nn\n")
+    assert result.exit_code == 0, result.output
+    assert "zipped.zip" in result.output
+    assert not (tmp_path / "zipped").exists()
+    with zipfile.ZipFile(tmp_path / "zipped.zip") as archive:
+        assert "zipped/README.md" in archive.namelist()
+
+    result = CliRunner().invoke(create_project, args, input="n\nn\nn\nn\n")
+    assert result.exit_code == 1
+    assert "zipped.zip already exists." in result.output
+
+
+def test_create_project_archive_to_stdout(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    args = ["--output-format", "tar", "--output", "-", "--name", "streamed"]
+    result = CliRunner().invoke(create_project, args, input="\n" * 8)
+    assert result.exit_code == 0, result.output
+    # The prompts go to stderr, stdout only holds the archive
+    assert "Project description" in result.stderr
+    with tarfile.open(fileobj=io.BytesIO(result.stdout_bytes), mode="r:gz") as archive:
+        assert "streamed/README.md" in archive.getnames()
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from pyproject_creator.cli import main
+from pyproject_creator.batch import run_batch, load_manifest
+from pyproject_creator.generator import ProjectSpec
+
+
+MANIFEST = """
+[defaults]
+author = "Test Author <test@example.com>"
+python-version = "3.12"
+
+[[project]]
+name = "service-a"
+need-logs = false
+
+[[project]]
+name = "service-b"
+github_action = true
+pypi_package = true
+
+[[project]]
+name = "-invalid"
+"""
+
+
+@pytest.fixture
+def manifest(tmp_path: Path) -> Path:
+    _path = tmp_path / "manifest.toml"
+    _path.write_text(MANIFEST)
+    return _path
+
+
+def test_load_manifest(manifest: Path) -> None:
+    specs = load_manifest(manifest)
+    assert [spec.name for spec in specs] == ["service-a", "service-b", "-invalid"]
+    assert specs[0] == ProjectSpec(
+        name="service-a",
+        author="Test Author <test@example.com>",
+        python_version="3.12",
+        logs=False,
+    )
+    assert specs[1].github_action
+    assert specs[1].pypi_package
+
+
+def test_load_manifest_errors(tmp_path: Path) -> None:
+    _path = tmp_path / "manifest.toml"
+    _path.write_text('[[project]]\nname = "a"\nunknown = 1\n')
+    with pytest.raises(ValueError, match="unknown"):
+        load_manifest(_path)
+
+    _path.write_text('[[project]]\nname = "a"\n[[project]]\nname = "a"\n')
+    with pytest.raises(ValueError, match="Duplicated"):
+        load_manifest(_path)
+
+    # Values TOML types differently from the spec, which would fail late or silently
+    _path.write_text('[[project]]\nname = "a"\npython-version = 3.12\n')
+    with pytest.raises(ValueError, match="'python_version' must be a str, got float 3.12"):
+        load_manifest(_path)
+    _path.write_text('[defaults]\nlogs = "false"\n[[project]]\nname = "a"\n')
+    with pytest.raises(ValueError, match="'logs' must be a bool"):
+        load_manifest(_path)
+    result = CliRunner().invoke(main, ["batch", str(_path), "--dest", str(tmp_path)])
+    assert result.exit_code == 2
+    assert "Invalid value for MANIFEST" in result.output
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_run_batch(tmp_path: Path, manifest: Path, executor: str) -> None:
+    results = run_batch(load_manifest(manifest), tmp_path / "out", jobs=2, executor=executor)
+    assert [result.ok for result in results] == [True, True, False]
+    assert str(results[2].error).startswith("Project name should start with")
+
+    service_a = tmp_path / "out" / "service-a"
+    assert (service_a / "service_a" / "__init__.py").exists()
+    assert not (service_a / "service_a" / "logs").exists()
+    assert 'python = "^3.12"' in (service_a / "pyproject.toml").read_text()
+    assert (tmp_path / "out" / "service-b" / ".github" / "pythonpublish.yml").exists()
+    assert not (tmp_path / "out" / "-invalid").exists()
+
+    # Existing projects are reported instead of overwritten
+    results = run_batch(load_manifest(manifest)[:1], tmp_path / "out", executor=executor)
+    assert results[0].error == "service-a directory already exists."
+
+
+def test_batch_command(tmp_path: Path, manifest: Path, mock_poetry_installed: None) -> None:
+    result = CliRunner().invoke(
+        main, ["batch", str(manifest), "--dest", str(tmp_path), "--executor", "thread"]
+    )
+    assert result.exit_code == 1
+    assert "ok    service-a" in result.output
+    assert "fail  -invalid" in result.output
+    assert "2 created, 1 failed." in result.output
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import sys
+import time
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+from click.testing import CliRunner
+
+from pyproject_creator.cli import create_project
+from pyproject_creator.envcache import EnvCache
+from pyproject_creator.bootstrap import (
+    DEFAULT_STEPS,
+    StepResult,
+    BootstrapStep,
+    default_steps,
+    bootstrap_project,
+)
+
+
+def python_step(name: str, code: str, needs: tuple[str, ...] = ()) -> BootstrapStep:
+    return BootstrapStep(name, (sys.executable, "-c", code), needs)
+
+
+def test_independent_steps_run_concurrently(tmp_path: Path) -> None:
+    steps = [
+        python_step("a", "import time; time.sleep(0.4); print('a done')"),
+        python_step("b", "import time; time.sleep(0.4); print('b done')"),
+        python_step("c", "import os; print(sorted(os.listdir()))", needs=("a", "b")),
+    ]
+    (tmp_path / "marker").touch()
+    lines: list[str] = []
+    start = time.perf_counter()
+    results = bootstrap_project(tmp_path, steps, echo=lines.append)
+    elapsed = time.perf_counter() - start
+
+    assert [result.name for result in results] == ["a", "b", "c"]
+    assert all(result.ok for result in results)
+    assert all(result.duration >= 0.4 for result in results[:2])
+    assert elapsed < 0.8 + results[2].duration, "a and b should overlap"
+    # Output is prefixed with the step, and c starts after both of its dependencies
+    assert sorted(lines[:2]) == ["[a] a done", "[b] b done"]
+    assert lines[2:] == ["[c] ['marker']"]
+
+
+def test_failed_dependency_skips_dependents(tmp_path: Path) -> None:
+    steps = [
+        python_step("a", "import sys; print('boom'); sys.exit(3)"),
+        python_step("b", "print('never')", needs=("a",)),
+        BootstrapStep("missing", ("pypct-no-such-command",)),
+    ]
+    lines: list[str] = []
+    results = bootstrap_project(tmp_path, steps, echo=lines.append)
+    assert [(r.name, r.returncode) for r in results] == [("a", 3), ("b", None), ("missing", 127)]
+    assert "[b] skipped, a step it needs failed" in lines
+    assert "[b] never" not in lines
+
+
+def test_step_timeout(tmp_path: Path) -> None:
+    steps = [
+        BootstrapStep("slow", (sys.executable, "-c", "import time; time.sleep(30)"), timeout=0.2),
+        python_step("after", "", needs=("slow",)),
+    ]
+    lines: list[str] = []
+    results = bootstrap_project(tmp_path, steps, echo=lines.append)
+    assert [(r.name, r.returncode) for r in results] == [("slow", 124), ("after", None)]
+    assert results[0].duration < 5
+    assert "[slow] timed out after 0.2s, killed" in lines
+
+    # Neither can the default steps hang forever
+    for default in (DEFAULT_STEPS, default_steps(EnvCache(tmp_path / "cache"))):
+        assert all(step.timeout for step in default)
+
+
+def test_invalid_steps(tmp_path: Path) -> None:
+    with pytest.raises(ValueError, match="unknown"):
+        bootstrap_project(tmp_path, [python_step("a", "", needs=("b",))])
+    with pytest.raises(ValueError, match="a -> b -> a"):
+        bootstrap_project(
+            tmp_path, [python_step("a", "", needs=("b",)), python_step("b", "", needs=("a",))]
+        )
+
+
+@pytest.mark.usefixtures("mock_poetry_installed")
+def test_create_project_bootstrap(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, mocker: MockerFixture
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    bootstrap = mocker.patch(
+        "pyproject_creator.bootstrap.bootstrap_project",
+        return_value=[StepResult("git", 0, 0.01), StepResult("pre-commit", None, 0.0)],
+    )
+    options = ["--name", "boot", "--description", "", "--author", "A", "--python-version", "3.11"]
+    options += ["--project-license", "", "--bootstrap"]
+    # The remaining prompts take their defaults
+    result = CliRunner().invoke(create_project, options, input="\n" * 4)
+    bootstrap.assert_called_once()
+    assert bootstrap.call_args.args[0] == tmp_path / "boot"
+    assert "ok    git" in result.output
+    assert "skip  pre-commit" in result.output
+    assert "Bootstrap failed: pre-commit" in result.output
+    assert result.exit_code == 1
+
+    result = CliRunner().invoke(create_project, [*options, "--output-format", "zip"], "\n" * 4)
+    assert result.exit_code == 2
+    assert "can't bootstrap an archive" in result.output
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import sys
+import runpy
+import subprocess
+from typing import TYPE_CHECKING
+from pathlib import Path
+
+import pytest
+
+from scripts import commit_with_pre_commit as hook
+
+
+if TYPE_CHECKING:
+    from tests.conftest import FakeRun
+
+
+@pytest.fixture
+def repo(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    monkeypatch.chdir(tmp_path)
+    subprocess.run(["git", "init", "-q"], check=True)
+    (tmp_path / ".pre-commit-config.yaml").write_text("repos: []\n")
+    (tmp_path / "a.py").write_text("a = 1\n")
+    (tmp_path / "b.py").write_text("b = 1\n")
+    (tmp_path / "untracked.py").write_text("")
+    subprocess.run(["git", "add", ".pre-commit-config.yaml", "a.py", "b.py"], check=True)
+    return tmp_path
+
+
+@pytest.fixture
+def pre_commit(fake_run: FakeRun) -> FakeRun:
+    fake_run.handle("pre-commit")
+    return fake_run
+
+
+@pytest.mark.usefixtures("repo")
+def test_only_staged_files(pre_commit: FakeRun) -> None:
+    assert hook.main(["COMMIT_EDITMSG"]) == 0
+    assert pre_commit.calls == [
+        ["pre-commit", "run", "-vvv", "--files", ".pre-commit-config.yaml", "a.py", "b.py"]
+    ]
+
+    assert hook.main(["--all-files"]) == 0
+    assert pre_commit.calls[-1] == ["pre-commit", "run", "--all-files", "-vvv"]
+
+
+def test_passed_files_are_cached(repo: Path, pre_commit: FakeRun) -> None:
+    hook.main([])
+    hook.main([])
+    assert len(pre_commit.calls) == 1, "everything passed already"
+
+    (repo / "a.py").write_text("a = 2\n")
+    subprocess.run(["git", "add", "a.py"], check=True)
+    hook.main([])
+    assert pre_commit.calls[-1][-1:] == ["a.py"]
+
+    hook.main(["--no-cache"])
+    assert len(pre_commit.calls[-1]) == 7
+
+    # Another hook configuration invalidates every result
+    (repo / ".pre-commit-config.yaml").write_text("repos: []\nfail_fast: true\n")
+    subprocess.run(["git", "add", ".pre-commit-config.yaml"], check=True)
+    hook.main([])
+    assert pre_commit.calls[-1][4:] == [".pre-commit-config.yaml", "a.py", "b.py"]
+
+
+def test_deleted_files_are_skipped(repo: Path, pre_commit: FakeRun) -> None:
+    (repo / "a.py").unlink()
+    assert hook.main([]) == 0
+    assert pre_commit.calls[-1][4:] == [".pre-commit-config.yaml", "b.py"]
+
+
+@pytest.mark.usefixtures("repo")
+def test_failures_are_not_cached(pre_commit: FakeRun) -> None:
+    pre_commit.returncode = 1
+    assert hook.main([]) == 1
+    pre_commit.returncode = 0
+    assert hook.main([]) == 0
+    assert len(pre_commit.calls) == 2
+
+
+@pytest.mark.usefixtures("repo")
+def test_exit_status(pre_commit: FakeRun, monkeypatch: pytest.MonkeyPatch) -> None:
+    pre_commit.returncode = 1
+    monkeypatch.setattr(sys, "argv", [hook.__file__])
+    with pytest.raises(SystemExit) as exc_info:
+        runpy.run_path(hook.__file__, run_name="__main__")
+    assert exc_info.value.code == 1
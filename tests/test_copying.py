@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+
+from pyproject_creator import ProjectSpec, generate_project
+from pyproject_creator.copying import copy_file
+
+
+@pytest.fixture
+def source(tmp_path: Path) -> Path:
+    _path = tmp_path / "source.py"
+    _path.write_bytes(b"print('hello')\n" * 100)
+    _path.chmod(0o755)
+    return _path
+
+
+@pytest.mark.parametrize("strategy", ["copy", "reflink", "hardlink"])
+def test_copy_file(tmp_path: Path, source: Path, strategy: str) -> None:
+    target = tmp_path / "target.py"
+    used = copy_file(source, target, strategy)
+    assert used in (strategy, "copy")
+    assert target.read_bytes() == source.read_bytes()
+    assert target.stat().st_mode == source.stat().st_mode
+    if used == "hardlink":
+        assert os.path.samefile(source, target)
+    else:
+        assert not os.path.samefile(source, target)
+
+
+def test_copy_file_fallback(tmp_path: Path, source: Path, mocker: MockerFixture) -> None:
+    mocker.patch("os.link", side_effect=OSError(18, "Invalid cross-device link"))
+    assert copy_file(source, tmp_path / "target.py", "hardlink") == "copy"
+    assert (tmp_path / "target.py").read_bytes() == source.read_bytes()
+
+    with pytest.raises(ValueError, match="Unknown copy strategy"):
+        copy_file(source, tmp_path / "other.py", "symlink")
+
+
+@pytest.mark.parametrize("strategy", ["reflink", "hardlink"])
+def test_generate_project_copy_strategy(tmp_path: Path, strategy: str) -> None:
+    result = generate_project(ProjectSpec(name="linked"), tmp_path, copy_strategy=strategy)
+    assert (result.project_path / "scripts" / "commit_with_pre_commit.py").is_file()
+    assert 'name = "linked"' in (result.project_path / "pyproject.toml").read_text()
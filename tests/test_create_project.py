@@ -1,13 +1,13 @@
 from __future__ import annotations
 
 import os
+import sys
 import subprocess
 from pathlib import Path
 
 import click
 import pytest
 from click.testing import CliRunner
-from _pytest.monkeypatch import MonkeyPatch
 
 from pyproject_creator.cli import run_command, create_project, check_poetry_installed
 
@@ -17,16 +17,6 @@ def runner() -> CliRunner:
     return CliRunner()
 
 
-@pytest.fixture
-def mock_poetry_installed(monkeypatch: MonkeyPatch) -> None:
-    def mock_run(*args, **kwargs):  # type: ignore
-        if args[0][:2] == ["poetry", "--version"]:
-            return subprocess.CompletedProcess(args, 0, stdout="Poetry 1.1.0\n")
-        return subprocess.run(*args, **kwargs)
-
-    monkeypatch.setattr(subprocess, "run", mock_run)
-
-
 def test_validate_project_name() -> None:
     from pyproject_creator.cli import validate_project_name
 
@@ -50,7 +40,8 @@ def test_validate_project_name() -> None:
         validate_project_name("invalid_project_name_")
 
 
-def test_check_poetry_installed(mocker):  # type: ignore
+def test_check_poetry_installed(mocker, monkeypatch):  # type: ignore
+    monkeypatch.setenv("PYPCT_POETRY_CHECK_TTL", "0")
     mock_run = mocker.patch("subprocess.run")
 
     # Test Poetry installed
@@ -68,25 +59,18 @@ def test_check_poetry_installed(mocker):  # type: ignore
         check_poetry_installed()
 
 
-def test_run_command(mocker):  # type: ignore
-    mock_run = mocker.patch("subprocess.run")
-    command = "echo test"
+def test_run_command(capsys):  # type: ignore
+    # Test successful command execution, the output is streamed as it comes
+    result = run_command("echo test")
+    assert result.ok
+    assert result.tail == ("test",)
+    assert capsys.readouterr().out == "test\n"
 
-    # Test successful command execution
-    mock_run.return_value.stdout = "test output"
-    run_command(command)
-    mock_run.assert_called_once_with(
-        command,
-        shell=True,
-        check=True,
-        capture_output=True,
-        text=True,
-    )
-
-    # Test command failure
-    mock_run.side_effect = subprocess.CalledProcessError(1, command)
-    with pytest.raises(SystemExit):
-        run_command(command)
+    # Test command failure, reported instead of exiting; the command works in sh and cmd.exe
+    result = run_command(f'"{sys.executable}" -c "import sys; sys.exit(\'error\')"')
+    assert not result.ok
+    assert result.returncode == 1
+    assert result.output == "error"
 
 
 def test_create_project(runner, mock_poetry_installed, monkeypatch, rootdir, project_names):  # type: ignore
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+from pyproject_creator import envcache
+from pyproject_creator.envcache import EnvCache, dependency_digest, install_environment
+from pyproject_creator.generator import ProjectSpec, generate_project
+
+
+pytestmark = pytest.mark.skipif(os.name != "posix", reason="environments are relocated on POSIX")
+
+
+def make_venv(path: Path, size: int = 10) -> Path:
+    """A stand-in for a virtual environment, with the absolute paths a real one has."""
+    site_packages = path / "lib" / "python3" / "site-packages"
+    site_packages.mkdir(parents=True)
+    (site_packages / "pkg.py").write_text("x" * size)
+    (path / "lib64").symlink_to("lib")
+    (path / "bin").mkdir()
+    (path / "bin" / "python").symlink_to(sys.executable)
+    script = path / "bin" / "black"
+    script.write_text(f"#!{path.resolve()}/bin/python\nimport black\n")
+    script.chmod(0o755)
+    (path / "pyvenv.cfg").write_text(
+        f"home = /usr/bin\ncommand = python -m venv {path.resolve()}\n"
+    )
+    return path
+
+
+def make_lock(path: Path) -> Path:
+    path.write_text("# lock\n")
+    return path
+
+
+def test_dependency_digest(tmp_path: Path) -> None:
+    for spec in (
+        ProjectSpec("one"),
+        ProjectSpec("two", description="x"),
+        ProjectSpec("three", tests=False),
+    ):
+        generate_project(spec, tmp_path)
+    one, two, three = (
+        dependency_digest(tmp_path / name / "pyproject.toml") for name in ("one", "two", "three")
+    )
+    assert one == two
+    assert one != three
+
+
+@pytest.mark.parametrize("strategy", ["copy", "hardlink"])
+def test_store_and_restore(tmp_path: Path, strategy: str) -> None:
+    cache = EnvCache(tmp_path / "cache")
+    origin = make_venv(tmp_path / "a" / ".venv")
+    assert cache.store("k", origin, make_lock(tmp_path / "a" / "poetry.lock"))
+    assert not cache.store("k", origin, tmp_path / "a" / "poetry.lock"), "already stored"
+
+    venv = tmp_path / "b" / ".venv"
+    venv.parent.mkdir()
+    assert not cache.restore("missing", venv, tmp_path / "b" / "poetry.lock")
+    assert not venv.exists()
+    assert cache.restore("k", venv, tmp_path / "b" / "poetry.lock", strategy)
+
+    assert (tmp_path / "b" / "poetry.lock").read_text() == "# lock\n"
+    assert (venv / "lib64").readlink() == Path("lib")
+    assert (venv / "bin" / "python").readlink() == Path(sys.executable)
+    assert (venv / "lib" / "python3" / "site-packages" / "pkg.py").read_text() == "x" * 10
+    script = venv / "bin" / "black"
+    assert script.read_text() == f"#!{venv.resolve()}/bin/python\nimport black\n"
+    assert os.access(script, os.X_OK)
+    assert str(venv.resolve()) in (venv / "pyvenv.cfg").read_text()
+    # The relocated files are new files, the cached ones are untouched
+    cached = cache.root / "k" / "venv"
+    assert str(origin.resolve()) in (cached / "bin" / "black").read_text()
+
+    assert not cache.restore("k", venv, tmp_path / "b" / "poetry.lock"), "venv exists"
+
+
+def test_evict_least_recently_used(tmp_path: Path) -> None:
+    cache = EnvCache(tmp_path / "cache", max_bytes=10**9)
+    for key in ("old", "used", "new"):
+        venv = make_venv(tmp_path / key / ".venv", size=1000)
+        cache.store(key, venv, make_lock(tmp_path / key / "poetry.lock"))
+    cache.restore("used", tmp_path / "restored" / ".venv", tmp_path / "restored.lock")
+    assert [entry.key for entry in cache.entries()] == ["old", "new", "used"]
+
+    _, new, used = cache.entries()
+    assert cache.evict(max_bytes=new.size + used.size) == ["old"]
+    assert cache.evict(max_bytes=used.size) == ["new"]
+    assert [entry.key for entry in cache.entries()] == ["used"]
+
+    # Entries with an incomplete meta.json, e.g. written by another version, are skipped
+    (cache.root / "used" / "meta.json").write_text('{"last_used": 0}')
+    assert cache.entries() == []
+    assert not cache.restore("used", tmp_path / "again" / ".venv", tmp_path / "again.lock")
+
+
+def test_install_environment(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    commands: list[list[str]] = []
+
+    def fake_run(
+        command: list[str], cwd: Path, echo: envcache.Echo, timeout: float | None = None
+    ) -> int:
+        commands.append(command[1:] if command[0] == sys.executable else command)
+        if command[1:3] == ["-m", "venv"]:
+            make_venv(Path(command[3]))
+        elif command[:3] == ["poetry", "install", "--no-root"]:
+            make_lock(cwd / "poetry.lock")
+        return 0
+
+    monkeypatch.setattr(envcache, "_run", fake_run)
+    cache = EnvCache(tmp_path / "cache")
+    first = generate_project(ProjectSpec("first", pypi_package=True), tmp_path).project_path
+    messages: list[str] = []
+    assert install_environment(first, messages.append, cache) == 0
+    assert commands == [
+        ["-m", "venv", str(first / ".venv")],
+        ["poetry", "install", "--no-root"],
+        ["poetry", "install", "--only-root"],
+    ]
+    assert "not cached" in messages[0]
+    assert len(cache.entries()) == 1
+
+    commands.clear()
+    second = generate_project(ProjectSpec("second", pypi_package=True), tmp_path).project_path
+    assert install_environment(second, messages.append, cache) == 0
+    assert commands == [["poetry", "install", "--only-root"]]
+    assert "restored from the cache" in messages[-1]
+    assert (second / ".venv" / "bin" / "black").read_text().startswith(f"#!{second / '.venv'}")
+    assert (second / "poetry.lock").exists()
+
+    # Without package mode there is no project to install
+    commands.clear()
+    third = generate_project(ProjectSpec("third"), tmp_path).project_path
+    assert install_environment(third, messages.append, cache) == 0
+    assert commands == []
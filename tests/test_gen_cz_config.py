@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+
+from scripts import gen_commitizen_toml as gen
+
+
+def test_get_info_via_type() -> None:
+    assert gen.get_info_via_type("feat") == "✨ feat"
+    with pytest.raises(KeyError, match="unknown"):
+        gen.get_info_via_type("unknown")
+
+
+def test_repository_cz_toml_is_up_to_date(rootdir: Path) -> None:
+    assert gen.is_up_to_date(rootdir / ".cz.toml"), "run gen-cz-config"
+
+
+def test_regenerate_only_when_stale(tmp_path: Path, mocker: MockerFixture) -> None:
+    output = tmp_path / ".cz.toml"
+    gen.main(["--output", str(output)])
+    content = output.read_text(encoding="utf-8")
+    assert content.startswith(gen.STAMP_PREFIX)
+    assert "[tool.commitizen]" in content
+    gen.main(["--check", "--output", str(output)])
+
+    render = mocker.spy(gen, "render")
+    gen.main(["--output", str(output)])
+    render.assert_not_called()
+
+    # A hand edit makes it stale as well
+    output.write_text(content.replace("cz_customize", "cz_edited"), encoding="utf-8")
+    with pytest.raises(SystemExit) as excinfo:
+        gen.main(["--check", "--output", str(output)])
+    assert excinfo.value.code == 1
+    gen.main(["--output", str(output)])
+    assert output.read_text(encoding="utf-8") == content
+
+
+def test_check_missing_and_changed_inputs(tmp_path: Path, mocker: MockerFixture) -> None:
+    output = tmp_path / ".cz.toml"
+    with pytest.raises(SystemExit):
+        gen.main(["--check", "--output", str(output)])
+    assert not output.exists()
+
+    gen.main(["--output", str(output)])
+    mocker.patch.object(gen, "inputs_digest", return_value="0" * 16)
+    assert not gen.is_up_to_date(output)
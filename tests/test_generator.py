@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from pytest_mock import MockerFixture
+
+from pyproject_creator import (
+    ProjectSpec,
+    ProjectExistsError,
+    InvalidProjectNameError,
+    generate_project,
+)
+from pyproject_creator.generator import get_environment, iter_template_files
+
+
+def test_generate_project(tmp_path: Path) -> None:
+    cwd = os.getcwd()
+    spec = ProjectSpec(name="my-project", description="demo", github_action=True)
+    result = generate_project(spec, tmp_path)
+
+    assert os.getcwd() == cwd
+    assert result.spec is spec
+    assert result.project_path == tmp_path.resolve() / "my-project"
+    assert Path("pyproject.toml") in result.files
+    assert Path("my_project") / "logs" / "_default.py" in result.files
+    assert Path(".github") / "test.yml" in result.files
+    assert all((result.project_path / file).is_file() for file in result.files)
+    assert 'description = "demo"' in (result.project_path / "pyproject.toml").read_text()
+
+
+def test_generate_project_errors(tmp_path: Path) -> None:
+    with pytest.raises(InvalidProjectNameError):
+        generate_project(ProjectSpec(name="bad name"), tmp_path)
+    with pytest.raises(InvalidProjectNameError):
+        generate_project(ProjectSpec(name="bad-"), tmp_path)
+    assert not any(tmp_path.iterdir())
+
+    generate_project(ProjectSpec(name="exists"), tmp_path)
+    with pytest.raises(ProjectExistsError, match="exists directory already exists."):
+        generate_project(ProjectSpec(name="exists"), tmp_path)
+
+
+def test_generate_project_thread_safe(tmp_path: Path) -> None:
+    cwd = os.getcwd()
+    specs = [ProjectSpec(name=f"project-{i}", tests=i % 2 == 0) for i in range(16)]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda spec: generate_project(spec, tmp_path), specs))
+
+    assert os.getcwd() == cwd
+    assert sorted(path.name for path in tmp_path.iterdir()) == sorted(s.name for s in specs)
+    for spec, result in zip(specs, results):
+        assert (result.project_path / "tests").exists() is spec.tests
+        assert f'name = "{spec.name}"' in (result.project_path / "pyproject.toml").read_text()
+
+    # Racing on the same directory: exactly one call wins
+    def _generate(_: int) -> bool:
+        try:
+            generate_project(ProjectSpec(name="contended"), tmp_path)
+        except ProjectExistsError:
+            return False
+        return True
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        assert sum(pool.map(_generate, range(8))) == 1
+    assert not list(tmp_path.glob(".*.tmp"))
+
+
+def test_generate_project_rollback(tmp_path: Path, mocker: MockerFixture) -> None:
+    mocker.patch("shutil.copy", side_effect=OSError(28, "No space left on device"))
+    with pytest.raises(OSError, match="No space left"):
+        generate_project(ProjectSpec(name="rollback"), tmp_path)
+    assert list(tmp_path.iterdir()) == []
+
+    # Nothing is left behind, so a retry just works
+    mocker.stopall()
+    assert generate_project(ProjectSpec(name="rollback"), tmp_path).files
+
+
+def test_environment_bytecode_cache(tmp_path: Path, cache_dir: Path) -> None:
+    assert get_environment() is get_environment()
+    generate_project(ProjectSpec(name="cached"), tmp_path)
+    assert list((cache_dir / "jinja2").glob("__jinja2_*.cache"))
+
+
+def test_iter_template_files() -> None:
+    spec = ProjectSpec(name="demo", logs=False, github_action=True)
+    files = dict(iter_template_files(spec))
+    assert files["pyproject.toml.j2"] == "pyproject.toml"
+    assert files["README.md.j2"] == "README.md"
+    assert files["github_action/workflows/test.yml"] == ".github/test.yml"
+    assert "github_action/workflows/pythonpublish.yml.j2" not in files
+    assert "scripts/publishpypi.py" not in files
+    assert not any(source.startswith("logs/") for source in files)
+    assert not any("__pycache__" in source for source in files)
+
+    files = dict(iter_template_files(ProjectSpec(name="demo-app")))
+    assert files["logs/_default.py"] == "demo_app/logs/_default.py"
+
+
+def test_render_templates(tmp_path: Path, rootdir: Path) -> None:
+    spec = ProjectSpec(name="rendered", description="demo", github_action=True, pypi_package=True)
+    project_path = generate_project(spec, tmp_path).project_path
+    assert (project_path / "README.md").read_text() == "# rendered\n\ndemo\n"
+    workflow = (project_path / ".github" / "pythonpublish.yml").read_text()
+    assert "url: https://pypi.org/project/rendered/" in workflow
+    assert "${{ secrets.PYPI_TOKEN }}" in workflow
+    assert "./scripts/publishpypi.py" in workflow
+    assert (project_path / "scripts" / "publishpypi.py").read_bytes() == (
+        rootdir / "scripts" / "publishpypi.py"
+    ).read_bytes()
+    assert (project_path / "pyproject.toml").read_text().endswith("\n")
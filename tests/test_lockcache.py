@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+from click.testing import CliRunner
+
+from pyproject_creator.cli import main, create_project
+from pyproject_creator.generator import ProjectSpec, generate_project
+from pyproject_creator.lockcache import LockCache
+
+
+pytestmark = pytest.mark.skipif(os.name != "posix", reason="the fake poetry is a script")
+
+FAKE_POETRY = """\
+import sys, hashlib, pathlib
+if len(sys.argv) < 2 or sys.argv[1] != "lock":
+    sys.exit(2)
+pyproject = pathlib.Path("pyproject.toml").read_bytes()
+if b"no-such-package" in pyproject:
+    print("Because the project depends on no-such-package which doesn't match any versions")
+    sys.exit(1)
+with open({calls!r}, "a") as calls:
+    calls.write("lock\\n")
+pathlib.Path("poetry.lock").write_text("# " + hashlib.sha256(pyproject).hexdigest() + "\\n")
+"""
+
+
+@pytest.fixture
+def poetry_calls(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """A `poetry` on `PATH` that writes a lock, the file counts its runs."""
+    calls = tmp_path / "poetry-calls"
+    calls.touch()
+    poetry = tmp_path / "bin" / "poetry"
+    poetry.parent.mkdir()
+    poetry.write_text(f"#!{sys.executable}\n" + FAKE_POETRY.format(calls=str(calls)))
+    poetry.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{poetry.parent}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.delenv("PYPCT_LOCK_CACHE_TTL", raising=False)
+    return calls
+
+
+def test_miss_then_hit(tmp_path: Path, poetry_calls: Path) -> None:
+    cache = LockCache(tmp_path / "locks")
+    first = generate_project(ProjectSpec("first"), tmp_path, lock_cache=cache)
+    assert first.lock == "miss"
+    assert not (first.project_path / "poetry.lock").exists()
+    [entry] = cache.entries()
+    assert entry.resolved_at is None
+
+    lines: list[str] = []
+    assert cache.refresh(echo=lines.append) == [(entry.key, 0)]
+    assert poetry_calls.read_text() == "lock\n"
+    assert cache.refresh() == [], "nothing is stale"
+
+    second = generate_project(ProjectSpec("second", description="x"), tmp_path, lock_cache=cache)
+    assert second.lock == "hit"
+    assert Path("poetry.lock") in second.files
+    assert (second.project_path / "poetry.lock").read_text().startswith("# ")
+
+    # Another dependency matrix is another entry
+    third = generate_project(ProjectSpec("third", logs=False), tmp_path, lock_cache=cache)
+    assert third.lock == "miss"
+    assert len(cache.entries()) == 2
+
+
+def test_unusable_cache_is_a_miss(tmp_path: Path) -> None:
+    (tmp_path / "notadir").touch()
+    cache = LockCache(tmp_path / "notadir" / "locks")
+    result = generate_project(ProjectSpec("demo"), tmp_path, lock_cache=cache)
+    assert result.lock == "miss"
+    assert (result.project_path / "pyproject.toml").exists()
+    assert not (result.project_path / "poetry.lock").exists()
+
+
+def test_stale_entries_are_served_and_refreshed(
+    tmp_path: Path, poetry_calls: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    cache = LockCache(tmp_path / "locks")
+    generate_project(ProjectSpec("first"), tmp_path, lock_cache=cache)
+    cache.refresh()
+    monkeypatch.setenv("PYPCT_LOCK_CACHE_TTL", "-1")
+    second = generate_project(ProjectSpec("second"), tmp_path, lock_cache=cache)
+    assert second.lock == "stale"
+    assert (second.project_path / "poetry.lock").exists()
+    assert len(cache.refresh() or []) == 1
+    assert poetry_calls.read_text() == "lock\n" * 2
+
+    monkeypatch.delenv("PYPCT_LOCK_CACHE_TTL")
+    assert cache.refresh() == []
+    assert len(cache.refresh(everything=True) or []) == 1
+
+
+def test_refresh_failure_and_concurrency(tmp_path: Path, poetry_calls: Path) -> None:
+    cache = LockCache(tmp_path / "locks")
+    entry = cache.register("broken", '[tool.poetry.dependencies]\nno-such-package = "*"\n')
+    lines: list[str] = []
+    assert cache.refresh(echo=lines.append) == [("broken", 1)]
+    assert "no-such-package" in lines[-1]
+    assert not entry.lock_file.exists()
+    assert cache.get("broken") == entry
+
+    (cache.root / ".refresh").touch()
+    assert cache.refresh() is None, "another refresh holds the cache"
+
+
+@pytest.mark.usefixtures("mock_poetry_installed")
+def test_cli(
+    tmp_path: Path,
+    poetry_calls: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    mocker: MockerFixture,
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    # Other tests of the session add locks to the shared cache
+    monkeypatch.setenv("PYPCT_CACHE_DIR", str(tmp_path / "cache"))
+    refresh = mocker.patch("pyproject_creator.lockcache.start_background_refresh")
+    options = ["--description", "", "--author", "A", "--python-version", "3.11"]
+    options += ["--project-license", "", "--lock-cache"]
+    result = CliRunner().invoke(create_project, ["--name", "cached", *options], "\n" * 4)
+    assert result.exit_code == 0, result.output
+    # The background refresh is opt-in
+    refresh.assert_not_called()
+
+    options.append("--refresh-locks")
+    result = CliRunner().invoke(create_project, ["--name", "cached-1", *options], "\n" * 4)
+    assert result.exit_code == 0, result.output
+    refresh.assert_called_once_with()
+
+    runner = CliRunner()
+    result = runner.invoke(main, ["cache", "list"])
+    assert "unresolved" in result.output
+    result = runner.invoke(main, ["cache", "refresh"])
+    assert result.exit_code == 0
+    assert result.output.startswith("  ok    ")
+    result = runner.invoke(main, ["cache", "list"])
+    assert "  lock  " in result.output
+    assert "resolved 2" in result.output
+
+    result = CliRunner().invoke(create_project, ["--name", "cached-2", *options], "\n" * 4)
+    assert result.exit_code == 0, result.output
+    assert (tmp_path / "cached-2" / "poetry.lock").exists()
+    refresh.assert_called_once_with()
+
+    result = runner.invoke(main, ["cache", "clear"])
+    assert result.output == "Removed 1 locks and 0 environments.\n"
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from collections.abc import Iterator
+
+import pytest
+
+from pyproject_creator.template.logs import _default, benchmark
+from pyproject_creator.template.logs._config import LogConfig
+from pyproject_creator.template.logs._default import setup_logging
+
+
+@pytest.fixture
+def restore_logging() -> Iterator[None]:
+    yield
+    setup_logging(LogConfig())
+
+
+def _results(**cases: float) -> dict[str, object]:
+    return {"version": benchmark.BASELINE_VERSION, "cases": cases}
+
+
+def test_make_message() -> None:
+    assert len(benchmark.make_message(512, hit=True)) == 512
+    assert "'key0'" in benchmark.make_message(64, hit=True)
+    assert "key0" not in benchmark.make_message(4096, hit=False)
+
+
+@pytest.mark.usefixtures("restore_logging")
+def test_run_suite(tmp_path: Path) -> None:
+    config = LogConfig(stdout=False, json_file=str(tmp_path / "app.jsonl"))
+    results = benchmark.run_suite(config, number=5, repeat=1, only="/emitted")
+    assert list(results["cases"]) == ["default_filter/emitted", "logger/emitted"]
+    assert all(value > 0 for value in results["cases"].values())
+    # The project's own log file is left alone and its configuration restored
+    assert (tmp_path / "app.jsonl").read_text() == ""
+    assert _default._config is config
+
+    cases = benchmark.run_suite(config, number=1, repeat=1)["cases"]
+    assert "desensitize_data/4096B/32kw/miss" in cases
+    assert "logger/suppressed" in cases
+
+
+def test_compare_results() -> None:
+    baseline = _results(a=100.0, b=100.0, c=100.0, removed=1.0)
+    current = _results(a=109.0, b=125.0, c=50.0, added=1.0)
+    assert benchmark.compare_results(baseline, current) == [
+        benchmark.Regression("b", 100.0, 125.0)
+    ]
+    assert [r.case for r in benchmark.compare_results(baseline, current, 0.05)] == ["a", "b"]
+    assert benchmark.compare_results(baseline, current, 0.3) == []
+
+
+def test_compare_command(tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    baseline, current = tmp_path / "baseline.json", tmp_path / "current.json"
+    baseline.write_text(json.dumps(_results(a=100.0)))
+    current.write_text(json.dumps(_results(a=150.0)))
+
+    assert benchmark.main(["compare", str(baseline), str(current)]) == 1
+    out, err = capsys.readouterr()
+    assert "+50.0%" in out
+    assert "REGRESSION a" in err
+    assert benchmark.main(["compare", str(baseline), str(current), "--threshold", "0.6"]) == 0
+
+    current.write_text(json.dumps({"cases": {}}))
+    with pytest.raises(SystemExit, match="baseline"):
+        benchmark.main(["compare", str(baseline), str(current)])
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import json
+import tomllib
+from pathlib import Path
+from collections.abc import Iterator
+
+import pytest
+
+from pyproject_creator import ProjectSpec, generate_project
+from pyproject_creator.template.logs import logger, _default
+from pyproject_creator.template.logs._config import LogConfig, load_config
+from pyproject_creator.template.logs._default import setup_logging
+
+
+@pytest.fixture
+def restore_logging() -> Iterator[None]:
+    yield
+    setup_logging(LogConfig())
+
+
+def test_load_config(tmp_path: Path) -> None:
+    pyproject = tmp_path / "pyproject.toml"
+    pyproject.write_text(
+        "[tool.pypct.logs]\n"
+        'project-name = "demo"\n'
+        'level = "WARNING"\n'
+        'sensitive-keys = ["token"]\n'
+    )
+    assert load_config(tmp_path / "missing.toml", environ={}) == LogConfig()
+
+    config = load_config(pyproject, environ={})
+    assert config == LogConfig(project_name="demo", level="WARNING", sensitive_keys=("token",))
+
+    environ = {
+        "PYPROJECT_CREATOR_LOG_LEVEL": "10",
+        "PYPROJECT_CREATOR_LOG_SENSITIVE_KEYS": "token, Cookie",
+        "PYPROJECT_CREATOR_LOG_ASYNC_STDOUT": "true",
+    }
+    config = load_config(pyproject, environ=environ)
+    assert config.level == 10
+    assert config.sensitive_keys == ("token", "Cookie")
+    assert config.async_stdout is True
+    assert config.project_name == "demo"
+
+    pyproject.write_text('[tool.pypct.logs]\nlevl = "DEBUG"\n')
+    with pytest.raises(ValueError, match="levl"):
+        load_config(pyproject, environ={})
+
+
+def test_load_generated_config(tmp_path: Path) -> None:
+    # A package named after a tool doesn't write into that tool's table
+    result = generate_project(ProjectSpec(name="black"), tmp_path)
+    pyproject = result.project_path / "pyproject.toml"
+    assert "logs" not in tomllib.loads(pyproject.read_text())["tool"]["black"]
+    assert load_config(pyproject, environ={}).project_name == "black"
+
+
+@pytest.mark.usefixtures("restore_logging")
+def test_setup_logging(tmp_path: Path) -> None:
+    messages: list[str] = []
+    user_handler_id = logger.add(messages.append, format="{message}")
+
+    path = tmp_path / "app.jsonl"
+    config = LogConfig(
+        level="WARNING", sensitive_keys=("token",), stdout=False, json_file=str(path)
+    )
+    assert setup_logging(config) is config
+    logger.info("dropped")
+    logger.warning("'token': 1234567890")
+
+    # Reconfiguring removes the previous handlers, but not the user's
+    setup_logging(LogConfig(stdout=False))
+    logger.warning("not in the file")
+    logger.remove(user_handler_id)
+
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [record["message"] for record in records] == ["'token': 123*****890"]
+    assert messages[-1] == "not in the file\n"
+    assert _default._handler_ids == []
@@ -1,14 +1,21 @@
 from __future__ import annotations
 
+from pathlib import Path
 from collections.abc import Iterator
 
 import pytest
 from _pytest.logging import LogCaptureFixture
 
+from pyproject_creator.template.logs import _default
+from pyproject_creator.template.logs._config import LogConfig
 from pyproject_creator.template.logs._default import (
     logger,
+    set_level,
+    _Desensitizer,
+    setup_logging,
     default_filter,
     desensitize_data,
+    _compile_keywords,
     desensitize_value,
 )
 
@@ -58,6 +65,38 @@ def test_desensitize_data():  # type: ignore
     assert desensitize_data(message, ["key1", "key2"]) == expected
 
 
+def test_desensitize_data_compiled_once():  # type: ignore
+    _compile_keywords.cache_clear()
+    keywords = ["key1", "key2"]
+    for _ in range(3):
+        assert desensitize_data("'key1': 1234567890", keywords) == "'key1': 123*****890"
+    assert _compile_keywords.cache_info().misses == 1
+
+    keywords.append("key3")
+    assert desensitize_data("'KEY3': 1234567890", keywords) == "'KEY3': 123*****890"
+    assert _compile_keywords.cache_info().misses == 2
+
+
+def test_desensitize_data_prefilter(mocker):  # type: ignore
+    pattern = mocker.Mock()
+    mocker.patch(
+        "pyproject_creator.template.logs._default._compile_keywords",
+        return_value=_Desensitizer(pattern, ("key1", "key2")),
+    )
+    message = "nothing sensitive in here: 1234567890"
+    assert desensitize_data(message, ["key1", "key2"]) == message
+    pattern.sub.assert_not_called()
+    desensitize_data("'KEY2': 1234567890", ["key1", "key2"])
+    pattern.sub.assert_called_once()
+
+
+def test_desensitize_data_regex_keywords():  # type: ignore
+    # Keywords that are regular expressions can't be prefiltered
+    assert _compile_keywords(("key[0-9]",)).literals is None
+    assert desensitize_data("'key7': 1234567890", ["key[0-9]"]) == "'key7': 123*****890"
+    assert desensitize_data("'key7': 1234567890", []) == "'key7': 1234567890"
+
+
 def test_log_level(caplog):  # type: ignore
     # 设置记录器捕获日志
     with caplog.at_level("DEBUG"):
@@ -80,5 +119,37 @@ def test_default_filter():  # type: ignore
     assert default_filter(record) is True, "Filter should pass INFO level logs"
 
 
+def test_set_level(mocker):  # type: ignore
+    desensitize = mocker.patch("pyproject_creator.template.logs._default.desensitize_data")
+    debug = {"message": "'Cookie': 1234567890", "level": logger.level("DEBUG")}
+    assert default_filter(debug) is False
+    desensitize.assert_not_called()
+
+    set_level("DEBUG")
+    try:
+        assert default_filter(debug) is True
+        desensitize.assert_called_once()
+        set_level(logger.level("ERROR").no)
+        assert default_filter({"message": "", "level": logger.level("WARNING")}) is False
+    finally:
+        set_level("INFO")
+
+
+def test_handlers_drop_records_below_the_level(tmp_path: Path) -> None:
+    def levels() -> set[int]:
+        # loguru skips building records below the level of every handler
+        handlers = logger._core.handlers  # type: ignore[attr-defined, unused-ignore]
+        return {handlers[i].levelno for i in _default._handler_ids}
+
+    setup_logging(LogConfig(level="WARNING", json_file=str(tmp_path / "app.jsonl")))
+    try:
+        assert levels() == {logger.level("WARNING").no}
+        set_level("ERROR")
+        assert levels() == {logger.level("ERROR").no}
+        assert len(_default._handler_ids) == 2
+    finally:
+        setup_logging(LogConfig())
+
+
 if __name__ == "__main__":
     pytest.main()
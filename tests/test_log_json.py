@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import json
+import time
+from pathlib import Path
+
+import pytest
+
+from pyproject_creator.template.logs import _json
+from pyproject_creator.template.logs._json import add_json_sink
+from pyproject_creator.template.logs._default import logger, default_filter, desensitize_extra
+
+
+def _read_lines(path: Path) -> list[dict]:  # type: ignore[type-arg]
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_json_sink(tmp_path: Path) -> None:
+    path = tmp_path / "app.jsonl"
+    handler_id = add_json_sink(path, filter=default_filter)
+    try:
+        logger.bind(user="bob", Cookie="session=1234567890").info("hello 'Cookie': 1234567890")
+        logger.debug("suppressed")
+        try:
+            1 / 0
+        except ZeroDivisionError:
+            logger.exception("failed")
+    finally:
+        logger.remove(handler_id)
+
+    first, second = _read_lines(path)
+    assert first["level"] == "INFO"
+    assert first["message"] == "hello 'Cookie': 123*****890"
+    assert first["extra"] == {"user": "bob", "Cookie": "ses*****890"}
+    assert first["function"] == "test_json_sink"
+    assert second["level"] == "ERROR"
+    assert "ZeroDivisionError" in second["exception"]
+
+
+@pytest.mark.parametrize("encoder", ["stdlib", "default"])
+def test_json_encoder(encoder: str, monkeypatch: pytest.MonkeyPatch) -> None:
+    if encoder == "stdlib":
+        monkeypatch.setattr(_json, "dumps", _json._stdlib_dumps)
+    line = _json.dumps({"message": "中文", "when": Path("x")})
+    assert json.loads(line) == {"message": "中文", "when": "x"}
+
+
+def test_desensitize_extra() -> None:
+    nested = {"Cookie": "abcdefghij"}
+    extra = {"token": 1234567890, "nested": nested, "note": "'token': abcdefghij"}
+    desensitize_extra(extra, ["token", "cookie"])
+    assert extra == {
+        "token": "123*****890",
+        "nested": {"Cookie": "abc*****hij"},
+        "note": "'token': abc*****hij",
+    }
+    assert nested == {"Cookie": "abcdefghij"}, "the caller's dict is copied"
+
+
+def test_logging_leaves_the_callers_dicts_alone(tmp_path: Path) -> None:
+    path = tmp_path / "app.jsonl"
+    headers = {"Cookie": "session=abcdef", "Accept": "*/*"}
+    handler_id = add_json_sink(path, filter=default_filter)
+    try:
+        logger.bind(headers=headers).info("request")
+        logger.info("request {headers}", headers=headers)
+    finally:
+        logger.remove(handler_id)
+
+    assert headers == {"Cookie": "session=abcdef", "Accept": "*/*"}
+    for record in _read_lines(path):
+        assert record["extra"]["headers"] == {"Cookie": "ses*****def", "Accept": "*/*"}
+
+
+def test_json_sink_rotation(tmp_path: Path) -> None:
+    path = tmp_path / "app.jsonl"
+    handler_id = add_json_sink(path, rotation="500 B", retention=None)
+    try:
+        for i in range(20):
+            logger.info(f"record {i}")
+    finally:
+        logger.remove(handler_id)
+
+    deadline = time.monotonic() + 5
+    while list(tmp_path.glob("app.*.jsonl")) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    archives = list(tmp_path.glob("app.*.jsonl.gz"))
+    assert archives
+    assert not list(tmp_path.glob("app.*.jsonl"))
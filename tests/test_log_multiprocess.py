@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import os
+import json
+from pathlib import Path
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from pyproject_creator.template.logs import LogListener, logger
+from pyproject_creator.template.logs._config import LogConfig
+from pyproject_creator.template.logs._default import setup_logging
+
+
+LINES = 50
+
+
+@pytest.fixture
+def restore_logging() -> Iterator[None]:
+    yield
+    setup_logging(LogConfig())
+
+
+def log_task(task: int) -> int:
+    for line in range(LINES):
+        logger.info(f"task {task} line {line}")
+    logger.debug("below the level")
+    logger.bind(task=task).warning("'Cookie': 1234567890")
+    try:
+        raise ValueError(f"task {task} failed")
+    except ValueError:
+        logger.exception("caught")
+    return os.getpid()
+
+
+@pytest.mark.usefixtures("restore_logging")
+def test_process_pool_logging(tmp_path: Path) -> None:
+    path = tmp_path / "app.jsonl"
+    setup_logging(LogConfig(stdout=False, json_file=str(path)))
+    with LogListener() as listener:
+        with ProcessPoolExecutor(max_workers=2, **listener.pool_options()) as pool:
+            pids = set(pool.map(log_task, range(4)))
+    assert os.getpid() not in pids
+
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert len(records) == 4 * (LINES + 2)
+    for task in range(4):
+        lines = [r["message"] for r in records if r["message"].startswith(f"task {task} ")]
+        # Every record of a process arrives, in the order it was logged
+        assert lines == [f"task {task} line {line}" for line in range(LINES)]
+
+    warnings = [r for r in records if r["level"] == "WARNING"]
+    assert {r["extra"]["task"] for r in warnings} == {0, 1, 2, 3}
+    assert all(r["message"] == "'Cookie': 123*****890" for r in warnings)
+    assert all(r["function"] == "log_task" for r in records)
+    errors = [r for r in records if r["level"] == "ERROR"]
+    assert all("ValueError: task" in r["message"] and "Traceback" in r["message"] for r in errors)
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from collections.abc import Iterator
+
+import pytest
+
+from pyproject_creator.template.logs import logger
+from pyproject_creator.template.logs._config import LogConfig
+from pyproject_creator.template.logs._default import setup_logging
+from pyproject_creator.template.logs._sampling import EVICTED_KEY, RateLimiter
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _record(line: int = 1, **extra: object) -> dict[str, object]:
+    return {"name": "app", "line": line, "extra": extra}
+
+
+@pytest.fixture
+def restore_logging() -> Iterator[None]:
+    yield
+    setup_logging(LogConfig())
+
+
+def test_sampling() -> None:
+    limiter = RateLimiter(sample_every=3)
+    assert [limiter.allow(_record()) for _ in range(7)] == [True, False, False] * 2 + [True]
+    # Call sites and user-supplied keys are sampled independently
+    assert limiter.allow(_record(line=2))
+    assert limiter.allow(_record(log_key="poll"))
+    assert not limiter.allow(_record(line=3, log_key="poll"))
+    assert limiter.take_suppressed() == {("app", 1): 4, "poll": 1}
+    assert limiter.take_suppressed() == {}
+
+
+def test_rate_limit() -> None:
+    clock = FakeClock()
+    limiter = RateLimiter(rate=1.0, burst=2, clock=clock)
+    assert [limiter.allow(_record()) for _ in range(3)] == [True, True, False]
+    clock.now = 1.5
+    assert [limiter.allow(_record()) for _ in range(2)] == [True, False]
+    clock.now = 100
+    assert [limiter.allow(_record()) for _ in range(3)] == [True, True, False]
+    assert limiter.summary() == ("3 log records suppressed by sampling or rate limiting: app:1 x3")
+    assert limiter.summary() is None
+
+
+def test_decision_is_shared_by_handlers() -> None:
+    limiter = RateLimiter(sample_every=2)
+    first, second = _record(), _record()
+    assert limiter.allow(first)
+    assert limiter.allow(first)
+    assert not limiter.allow(second)
+    assert not limiter.allow(second)
+    assert limiter.take_suppressed() == {("app", 1): 1}
+
+
+def test_keys_are_bounded() -> None:
+    limiter = RateLimiter(sample_every=2, max_keys=2)
+    for key in ("b", "b", "a", "c", "a", "d"):
+        limiter.allow(_record(log_key=key))
+    # The least recently used key goes first, its suppressed count is kept
+    assert list(limiter._states) == ["a", "d"]
+    assert limiter.take_suppressed() == {"a": 1, EVICTED_KEY: 1}
+
+
+@pytest.mark.usefixtures("restore_logging")
+def test_sampling_with_logger(tmp_path: Path) -> None:
+    path = tmp_path / "app.jsonl"
+    setup_logging(
+        LogConfig(stdout=False, json_file=str(path), sample_every=10, summary_interval=3600)
+    )
+    for i in range(25):
+        logger.info(f"hot loop {i}")
+    # Reconfiguring flushes the last summary into the previous handlers
+    setup_logging(LogConfig(stdout=False))
+
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [record["message"] for record in records[:-1]] == [
+        "hot loop 0",
+        "hot loop 10",
+        "hot loop 20",
+    ]
+    assert records[-1]["level"] == "WARNING"
+    assert records[-1]["message"].startswith("22 log records suppressed")
+    assert "_sampled" not in records[0].get("extra", {})
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import io
+import threading
+
+import pytest
+
+from pyproject_creator.template.logs._async import BatchingSink
+from pyproject_creator.template.logs._default import logger
+
+
+class RecordingStream(io.StringIO):
+    """Counts the writes and can hold them back until `release` is set."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.writes = 0
+        self.entered = threading.Event()
+        self.release = threading.Event()
+        self.release.set()
+
+    def write(self, s: str) -> int:
+        self.entered.set()
+        self.release.wait(5)
+        self.writes += 1
+        return super().write(s)
+
+
+def _blocked_sink(overflow: str) -> tuple[RecordingStream, BatchingSink]:
+    """A sink whose writer thread is stuck in a write and whose queue holds 2 records."""
+    stream = RecordingStream()
+    stream.release.clear()
+    sink = BatchingSink(stream, max_queue=2, batch_size=1, flush_interval=0, overflow=overflow)
+    sink.write("0\n")
+    assert stream.entered.wait(5)
+    return stream, sink
+
+
+def test_batching_sink_batches() -> None:
+    stream = RecordingStream()
+    sink = BatchingSink(stream, batch_size=50, flush_interval=10)
+    for i in range(100):
+        sink.write(f"{i}\n")
+    assert sink.wait_flushed(timeout=5)
+    assert stream.getvalue() == "".join(f"{i}\n" for i in range(100))
+    assert stream.writes <= 3
+    sink.stop()
+
+
+@pytest.mark.parametrize(
+    ("overflow", "expected"), [("drop-new", "0\n1\n2\n"), ("drop-oldest", "0\n3\n4\n")]
+)
+def test_batching_sink_drop(overflow: str, expected: str) -> None:
+    stream, sink = _blocked_sink(overflow)
+    for i in range(1, 5):
+        sink.write(f"{i}\n")
+    assert sink.dropped == 2
+    stream.release.set()
+    sink.stop()
+    assert stream.getvalue() == expected + "2 log records dropped, the log queue was full\n"
+
+
+def test_batching_sink_block() -> None:
+    stream, sink = _blocked_sink("block")
+    sink.write("1\n")
+    sink.write("2\n")
+    writer = threading.Thread(target=sink.write, args=("3\n",))
+    writer.start()
+    writer.join(0.2)
+    assert writer.is_alive(), "a full queue should block the caller"
+    stream.release.set()
+    writer.join(5)
+    sink.stop()
+    assert stream.getvalue() == "0\n1\n2\n3\n"
+    assert sink.dropped == 0
+
+
+def test_batching_sink_stop() -> None:
+    stream = RecordingStream()
+    sink = BatchingSink(stream, flush_interval=10)
+    sink.write("queued\n")
+    sink.stop()
+    assert stream.getvalue() == "queued\n"
+    sink.write("after stop\n")
+    assert stream.getvalue() == "queued\nafter stop\n"
+    sink.stop()
+
+    with pytest.raises(ValueError, match="overflow"):
+        BatchingSink(stream, overflow="ignore")
+
+
+def test_batching_sink_with_loguru() -> None:
+    stream = RecordingStream()
+    handler_id = logger.add(BatchingSink(stream), format="{message}", colorize=False)
+    logger.info("through the queue")
+    logger.remove(handler_id)
+    assert stream.getvalue() == "through the queue\n"
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+
+from pyproject_creator import poetry_check
+from pyproject_creator.poetry_check import start_poetry_check, is_poetry_installed
+
+
+@pytest.fixture
+def fake_poetry(tmp_path: Path, mocker: MockerFixture, monkeypatch: pytest.MonkeyPatch) -> Path:
+    executable = tmp_path / "bin" / "poetry"
+    executable.parent.mkdir()
+    executable.touch()
+    monkeypatch.setenv("PYPCT_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.delenv("PYPCT_POETRY_CHECK_TTL", raising=False)
+    mocker.patch("shutil.which", return_value=str(executable))
+    return executable
+
+
+def test_is_poetry_installed_cached(fake_poetry: Path, mocker: MockerFixture) -> None:
+    mock_run = mocker.patch("subprocess.run")
+    assert is_poetry_installed()
+    assert is_poetry_installed()
+    mock_run.assert_called_once_with(["poetry", "--version"], check=True, capture_output=True)
+
+
+def test_is_poetry_installed_invalidated(
+    fake_poetry: Path, mocker: MockerFixture, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    mock_run = mocker.patch("subprocess.run")
+    assert is_poetry_installed()
+
+    monkeypatch.setenv("PATH", "/somewhere/else")
+    assert is_poetry_installed()
+    assert mock_run.call_count == 2
+
+    monkeypatch.setattr(poetry_check, "POETRY_CHECK_TTL", -1.0)
+    assert is_poetry_installed()
+    assert mock_run.call_count == 3
+
+
+def test_is_poetry_installed_failure_not_cached(fake_poetry: Path, mocker: MockerFixture) -> None:
+    mock_run = mocker.patch("subprocess.run", side_effect=FileNotFoundError("poetry"))
+    assert not is_poetry_installed()
+    assert not is_poetry_installed()
+    assert mock_run.call_count == 2
+
+
+def test_start_poetry_check(fake_poetry: Path, mocker: MockerFixture) -> None:
+    mocker.patch("subprocess.run")
+    assert start_poetry_check().result(timeout=5) is True
+
+
+def test_commands_without_poetry_dont_probe(mocker: MockerFixture) -> None:
+    from click.testing import CliRunner
+
+    from pyproject_creator.cli import main
+
+    start = mocker.patch("pyproject_creator.poetry_check.start_poetry_check")
+    result = CliRunner().invoke(main, ["cache", "list"])
+    assert result.exit_code == 0, result.output
+    start.assert_not_called()
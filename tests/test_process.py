@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from pyproject_creator import process
+from pyproject_creator.process import run_command
+
+
+def python(code: str) -> list[str]:
+    return [sys.executable, "-c", code]
+
+
+def test_streams_both_pipes_as_they_come() -> None:
+    code = "import sys, time\nprint('out', flush=True)\ntime.sleep(0.3)\nsys.exit('err')"
+    lines: list[tuple[float, str]] = []
+    start = time.perf_counter()
+    result = run_command(python(code), echo=lambda line: lines.append((time.perf_counter(), line)))
+    assert [line for _, line in lines] == ["out", "err"]
+    assert lines[0][0] - start < result.duration - 0.2, "streamed before the command exited"
+    assert result.returncode == 1
+    assert result.tail == ("out", "err")
+    assert not result.ok
+
+
+def test_tail_is_bounded() -> None:
+    # Far more than a pipe buffer on both pipes, which would block a sequential reader
+    code = "import sys\nfor i in range(20000):\n print(i)\n print(i, file=sys.stderr)"
+    count = 0
+
+    def echo(line: str) -> None:
+        nonlocal count
+        count += 1
+
+    result = run_command(python(code), echo=echo, tail_lines=10)
+    assert result.ok
+    assert count == 40000
+    assert len(result.tail) == 10
+    assert "19999" in result.tail
+
+
+def test_shell_and_cwd(tmp_path: Path) -> None:
+    (tmp_path / "marker").touch()
+    # A command sh and cmd.exe both run
+    command = f'"{sys.executable}" -c "import os; print(*os.listdir())"'
+    result = run_command(command, cwd=tmp_path)
+    assert result.command == command
+    assert result.tail == ("marker",)
+
+
+def test_missing_command() -> None:
+    result = run_command(["pypct-no-such-command"])
+    assert result.returncode == 127
+    assert "pypct-no-such-command" in result.output
+
+
+@pytest.mark.skipif(os.name != "posix", reason="process groups")
+def test_timeout_kills_the_process_group(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(process, "KILL_GRACE", 1.0)
+    pid_file = tmp_path / "pid"
+    # The shell ignores SIGTERM, its child doesn't outlive the group either
+    command = f"trap '' TERM; sleep 30 & echo $! > {pid_file}; echo started; wait"
+    start = time.perf_counter()
+    result = run_command(command, timeout=0.5)
+    assert time.perf_counter() - start < 5
+    assert result.timed_out
+    assert not result.ok
+    assert result.tail == ("started",)
+    pid = int(pid_file.read_text())
+    for _ in range(50):
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            break
+        time.sleep(0.05)
+    else:
+        pytest.fail(f"process {pid} outlived the timeout")
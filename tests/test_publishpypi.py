@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import os
+import threading
+import subprocess
+from typing import TYPE_CHECKING
+from pathlib import Path
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from collections.abc import Iterator
+
+import pytest
+from pytest_mock import MockerFixture
+
+from scripts import publishpypi
+
+
+if TYPE_CHECKING:
+    from tests.conftest import FakeRun
+
+
+PYPROJECT = '[tool.poetry]\nname = "Demo.Pkg"\nversion = "0.1.0"\n'
+ARTIFACTS = ("demo_pkg-0.1.0.tar.gz", "demo_pkg-0.1.0-py3-none-any.whl")
+
+
+@pytest.fixture
+def project(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    monkeypatch.chdir(tmp_path)
+    subprocess.run(["git", "init", "-q"], check=True)
+    (tmp_path / "pyproject.toml").write_text(PYPROJECT)
+    (tmp_path / "demo_pkg").mkdir()
+    (tmp_path / "demo_pkg" / "__init__.py").write_text("")
+    subprocess.run(["git", "add", "."], check=True)
+    return tmp_path
+
+
+class FakePoetry:
+    """Builds fake artifacts and records what each `poetry publish` finds to upload."""
+
+    def __init__(self) -> None:
+        self.builds = 0
+        self.uploads: list[tuple[list[str], list[str]]] = []
+        self.publish_output = ""
+        self.repositories: dict[str, str] = {}
+
+    def __call__(self, args: list[str]) -> subprocess.CompletedProcess[str]:
+        if args[1] == "build":
+            self.builds += 1
+            Path("dist").mkdir(exist_ok=True)
+            for name in (*ARTIFACTS, "demo_pkg-0.0.9.tar.gz"):
+                Path("dist", name).write_text(str(self.builds))
+            return subprocess.CompletedProcess(args, 0)
+        if args[1] == "publish":
+            dist_dir = args[args.index("--dist-dir") + 1]
+            self.uploads.append((args, sorted(os.listdir(dist_dir))))
+            returncode = 1 if self.publish_output else 0
+            return subprocess.CompletedProcess(args, returncode, "", self.publish_output)
+        assert args[1] == "config", args
+        url = self.repositories.get(args[2].removeprefix("repositories.").removesuffix(".url"))
+        return subprocess.CompletedProcess(args, 0 if url else 1, url or "", "")
+
+
+@pytest.fixture
+def poetry(fake_run: FakeRun) -> FakePoetry:
+    fake = FakePoetry()
+    fake_run.handle("poetry", fake)
+    return fake
+
+
+@pytest.fixture
+def index(mocker: MockerFixture) -> set[str]:
+    files: set[str] = set()
+    mocker.patch.object(publishpypi, "index_files", return_value=files)
+    return files
+
+
+def test_is_artifact() -> None:
+    assert publishpypi.is_artifact("demo_pkg-0.1.0.tar.gz", "Demo.Pkg", "0.1.0")
+    assert publishpypi.is_artifact("demo-pkg-0.1.0.tar.gz", "Demo.Pkg", "0.1.0")
+    assert publishpypi.is_artifact("Demo_Pkg-0.1.0-py3-none-any.whl", "demo-pkg", "0.1.0")
+    assert not publishpypi.is_artifact("demo_pkg-0.1.0.1.tar.gz", "demo-pkg", "0.1.0")
+    assert not publishpypi.is_artifact("demo_pkg-0.1.01-py3-none-any.whl", "demo-pkg", "0.1.0")
+    assert not publishpypi.is_artifact("demo_pkg_extra-0.1.0.tar.gz", "demo-pkg", "0.1.0")
+
+
+@pytest.mark.usefixtures("project")
+def test_build_is_skipped_when_up_to_date(poetry: FakePoetry, index: set[str]) -> None:
+    assert publishpypi.main([]) == 0
+    assert poetry.builds == 1
+    assert sorted(files for _, [files] in poetry.uploads) == sorted(ARTIFACTS)
+    assert all(args[-1] != "--repository" for args, _ in poetry.uploads)
+
+    # Nothing changed and the index has the files: no build, no upload
+    index.update(ARTIFACTS)
+    assert publishpypi.main([]) == 0
+    assert poetry.builds == 1
+    assert len(poetry.uploads) == 2
+
+    # Only the missing file of a partial upload is uploaded again
+    index.discard(ARTIFACTS[1])
+    assert publishpypi.main([]) == 0
+    assert poetry.builds == 1
+    assert poetry.uploads[-1][1] == [ARTIFACTS[1]]
+
+
+def test_sources_and_version_invalidate_the_build(
+    project: Path, poetry: FakePoetry, index: set[str]
+) -> None:
+    assert publishpypi.main(["--dry-run"]) == 0
+    assert publishpypi.main(["--dry-run"]) == 0
+    assert poetry.builds == 1
+    assert poetry.uploads == []
+
+    (project / "demo_pkg" / "new.py").write_text("")  # untracked files count too
+    assert publishpypi.main(["--dry-run"]) == 0
+    assert poetry.builds == 2
+
+    # A released version is neither rebuilt nor uploaded
+    index.update(ARTIFACTS)
+    (project / "demo_pkg" / "new.py").write_text("x = 1")
+    assert publishpypi.main([]) == 0
+    assert poetry.builds == 2
+    assert poetry.uploads == []
+
+    # A partial upload with stale artifacts is rebuilt to upload the missing file
+    index.discard(ARTIFACTS[0])
+    assert publishpypi.main([]) == 0
+    assert poetry.builds == 3
+    assert [files for _, files in poetry.uploads] == [[ARTIFACTS[0]]]
+
+    (project / "pyproject.toml").write_text(PYPROJECT.replace("0.1.0", "0.2.0"))
+    assert publishpypi.main(["--dry-run"]) == 0
+    assert poetry.builds == 4
+
+
+@pytest.mark.usefixtures("project")
+def test_upload_results(
+    poetry: FakePoetry, index: set[str], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # Restored once the test is over
+    monkeypatch.setenv("POETRY_REPOSITORIES_PUBLISHPYPI_LOCAL_URL", "")
+    poetry.publish_output = publishpypi.ALREADY_EXISTS
+    assert publishpypi.main([]) == 0
+
+    poetry.publish_output = "HTTP Error 403: Forbidden"
+    assert publishpypi.main(["--force-build", "--repository-url", "http://localhost:1/"]) == 1
+    assert poetry.builds == 2
+    args, _ = poetry.uploads[-1]
+    assert args[-2:] == ["--repository", publishpypi.LOCAL_REPOSITORY]
+    assert os.environ["POETRY_REPOSITORIES_PUBLISHPYPI_LOCAL_URL"] == "http://localhost:1/"
+
+
+@pytest.mark.usefixtures("project")
+def test_repository_index(
+    poetry: FakePoetry, mocker: MockerFixture, capsys: pytest.CaptureFixture[str]
+) -> None:
+    publish = mocker.patch.object(publishpypi, "publish_package", return_value=0)
+    poetry.repositories["testpypi"] = "https://test.pypi.org/legacy/"
+    assert publishpypi.main(["--repository", "testpypi"]) == 0
+    assert publish.call_args.kwargs["index_url"] == "https://test.pypi.org/simple/"
+    assert publishpypi.main(["--repository-url", "http://localhost:8080"]) == 0
+    assert publish.call_args.kwargs["index_url"] == "http://localhost:8080/simple/"
+
+    poetry.repositories["private"] = "https://devpi.example.com/user/dev/"
+
+    assert publishpypi.main(["--repository", "private", "--index-url", "http://x/simple/"]) == 0
+    assert publish.call_args.kwargs["index_url"] == "http://x/simple/"
+    assert publishpypi.main(["--repository", "pypi"]) == 0
+    assert publish.call_args.kwargs["index_url"] == publishpypi.PYPI_SIMPLE_URL
+
+    # Guessing the index of an unknown server or checking PyPI instead would be wrong
+    for repository in ("private", "unknown"):
+        with pytest.raises(SystemExit):
+            publishpypi.main(["--repository", repository])
+        assert "pass --index-url" in capsys.readouterr().err
+    assert publish.call_count == 4
+
+
+def test_simple_index_url() -> None:
+    assert publishpypi.simple_index_url("https://upload.pypi.org/legacy/") == (
+        "https://upload.pypi.org/simple/"
+    )
+    assert publishpypi.simple_index_url("https://test.pypi.org/legacy") == (
+        "https://test.pypi.org/simple/"
+    )
+    assert publishpypi.simple_index_url("https://devpi.example.com/user/dev/") is None
+
+
+class SimpleIndex(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        if self.path != "/simple/demo-pkg/":
+            self.send_error(404)
+            return
+        links = "".join(f'<a href="../../files/{name}#sha256=00">{name}</a>' for name in ARTIFACTS)
+        body = f"<html><body>{links}</body></html>".encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args: object) -> None:
+        pass
+
+
+@pytest.fixture
+def index_url() -> Iterator[str]:
+    server = HTTPServer(("127.0.0.1", 0), SimpleIndex)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/simple/"
+    server.shutdown()
+    server.server_close()
+
+
+def test_index_files(index_url: str) -> None:
+    assert publishpypi.index_files(index_url, "Demo.Pkg") == set(ARTIFACTS)
+    assert publishpypi.index_files(index_url, "other") == set()
+    assert publishpypi.index_files("http://127.0.0.1:1/simple/", "demo-pkg", timeout=1) is None
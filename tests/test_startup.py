@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import os
+import sys
+import subprocess
+
+import pytest
+
+
+STARTUP_BUDGET = float(os.environ.get("PYPCT_STARTUP_BUDGET", "0.6"))
+"""Import time of `pyproject_creator.cli` once click is imported, as a fraction of the import
+time of click itself measured in the same run, which scales with the machine and platform."""
+HEAVY_MODULES = [
+    "asyncio",
+    "jinja2",
+    "json",
+    "shutil",
+    "tomllib",
+    "subprocess",
+    "concurrent.futures",
+    "pyproject_creator.batch",
+    "pyproject_creator.generator",
+]
+
+
+def import_times(module: str, preload: str = "") -> dict[str, int]:
+    """Cumulative import time of every module imported by `module`, in microseconds.
+
+    Modules imported by `preload` first are not counted again.
+    """
+    code = f"import {preload}; import {module}" if preload else f"import {module}"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    times: dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def best_import_time(module: str, preload: str = "") -> int:
+    # Best of a few runs, to keep a busy machine from failing the budget
+    return min(import_times(module, preload)[module] for _ in range(3))
+
+
+@pytest.fixture(scope="module")
+def budget_us() -> float:
+    return STARTUP_BUDGET * best_import_time("click")
+
+
+def test_cli_imports_are_lazy() -> None:
+    times = import_times("pyproject_creator.cli")
+    assert "pyproject_creator.cli" in times
+    assert [module for module in HEAVY_MODULES if module in times] == []
+
+
+@pytest.mark.parametrize("module", ["pyproject_creator.cli", "pyproject_creator"])
+def test_startup_budget(module: str, budget_us: float) -> None:
+    cost = best_import_time(module, preload="click")
+    assert cost < budget_us, f"{module} import takes {cost} us, over {budget_us:.0f} us"
+
+
+def test_generated_logs_import_is_lazy(budget_us: float) -> None:
+    # Importing the logger neither imports loguru nor configures any handler
+    times = import_times("pyproject_creator.template.logs", preload="pyproject_creator.template")
+    assert "loguru" not in times
+    assert times["pyproject_creator.template.logs"] < budget_us
+
+    code = (
+        "import sys; from pyproject_creator.template.logs import logger; "
+        "assert 'loguru' not in sys.modules; logger.info('configured on first use')"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], check=True, capture_output=True, text=True
+    )
+    assert "configured on first use" in result.stdout
+    assert result.stderr == ""
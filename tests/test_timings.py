@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from pyproject_creator import Timings, ProjectSpec, generate_project
+from pyproject_creator.cli import create_project
+
+
+def test_timings_accumulate() -> None:
+    events: list[tuple[str, float]] = []
+    timings = Timings(callback=lambda name, seconds: events.append((name, seconds)))
+    for _ in range(3):
+        with timings.stage("render"):
+            pass
+    with pytest.raises(RuntimeError), timings.stage("copy"):
+        raise RuntimeError
+
+    assert list(timings.stages) == ["render", "copy"]
+    assert [name for name, _ in events] == ["render", "render", "render", "copy"]
+    assert timings.stages["render"] == pytest.approx(sum(s for n, s in events if n == "render"))
+    assert json.loads(timings.to_json())["total"] == pytest.approx(timings.total)
+    assert timings.format_table().splitlines()[-1].startswith("total")
+
+
+def test_generate_project_timings(tmp_path: Path) -> None:
+    timings = Timings()
+    generate_project(ProjectSpec(name="timed"), tmp_path, timings=timings)
+    assert list(timings.stages) == ["validate", "mkdir", "copy", "render", "publish"]
+
+
+@pytest.mark.parametrize("timings", ["json", "table"])
+def test_create_project_timings(
+    tmp_path: Path, mock_poetry_installed: None, monkeypatch: pytest.MonkeyPatch, timings: str
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    args = ["--name", "timed", "--description", "", "--author", "a", "--python-version", "3.11"]
+    args += ["--project-license", "", f"--timings={timings}"]
+    result = CliRunner().invoke(create_project, args, input="n\nn\nn\nn\n")
+    assert result.exit_code == 0, result.output
+    if timings == "json":
+        line = next(line for line in result.output.splitlines() if line.startswith("{"))
+        assert set(json.loads(line)["stages"]) >= {"validate", "render", "poetry_check"}
+    else:
+        assert "poetry_check" in result.output